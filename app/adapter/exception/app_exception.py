@@ -70,3 +70,18 @@ class InspectNetworkError(AppError):
 
 class AnalyseMustBeDoneFirstError(AppError):
     pass
+
+
+# Analysis service
+
+
+class AnalysisServiceError(AppError):
+    pass
+
+
+class JobNotFoundError(AnalysisServiceError):
+    pass
+
+
+class ServiceBusyError(AnalysisServiceError):
+    pass
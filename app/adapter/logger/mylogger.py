@@ -5,9 +5,23 @@ Module to define custom logger and formatter
 :date: 2024
 """
 
+import copy
 import datetime as dt
 import json
 import logging
+import logging.handlers
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    # Optional: about ten times faster than the json module
+    import orjson
+except ImportError:
+    orjson = None
 
 LOG_RECORD_BUILTIN_ATTRS = {
     "args",
@@ -36,6 +50,29 @@ LOG_RECORD_BUILTIN_ATTRS = {
 }
 
 
+_log_context: ContextVar[dict | None] = ContextVar("log_context", default=None)
+
+
+def get_log_context() -> dict:
+    """Fields of the current context, added to every record logged in it."""
+    return _log_context.get() or {}
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """
+    Add fields (url, job id...) to the records logged inside the block.
+
+    Being a context variable, each asyncio task sees only its own fields, even
+    with hundreds of analyses interleaving in the same thread.
+    """
+    token = _log_context.set({**get_log_context(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
 class MyJSONFormatter(logging.Formatter):
     """
     MyJSONFormatter is a custom formatter for logging messages in JSON format.
@@ -48,40 +85,72 @@ class MyJSONFormatter(logging.Formatter):
     ):
         super().__init__()
         self.fmt_keys = fmt_keys if fmt_keys is not None else {}
+        self._fmt_items = tuple(self.fmt_keys.items())
+        # Same output as orjson: compact, non ASCII characters kept
+        self._encoder = json.JSONEncoder(
+            default=str, ensure_ascii=False, separators=(",", ":")
+        )
+        self._timestamp_cache: tuple[int, str] = (-1, "")
 
     def format(self, record: logging.LogRecord) -> str:
         message = self._prepare_log_dict(record)
-        return json.dumps(message, default=str)
+        if orjson is not None:
+            try:
+                return orjson.dumps(message, default=str).decode("utf-8")
+            except TypeError:
+                # e.g. an integer over 64 bits, which the json module encodes
+                pass
+        return self._encoder.encode(message)
 
     def _prepare_log_dict(self, record: logging.LogRecord):
         always_fields = {
             "message": record.getMessage(),
-            "timestamp": dt.datetime.fromtimestamp(
-                record.created, tz=dt.timezone.utc
-            ).isoformat(),
+            "timestamp": self._format_timestamp(record.created),
         }
         if record.exc_info is not None:
             always_fields["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Already rendered before going through a queue
+            always_fields["exc_info"] = record.exc_text
 
         if record.stack_info is not None:
             always_fields["stack_info"] = self.formatStack(record.stack_info)
 
         message = {
             key: (
-                msg_val
-                if (msg_val := always_fields.pop(val, None)) is not None
-                else getattr(record, val)
+                always_fields.pop(val)
+                if val in always_fields
+                else getattr(record, val, None)
             )
-            for key, val in self.fmt_keys.items()
+            for key, val in self._fmt_items
         }
         message.update(always_fields)
 
-        for key, val in record.__dict__.items():
-            if key not in LOG_RECORD_BUILTIN_ATTRS:
-                message[key] = val
+        for key in record.__dict__.keys() - LOG_RECORD_BUILTIN_ATTRS:
+            message[key] = record.__dict__[key]
+
+        for key, val in get_log_context().items():
+            message.setdefault(key, val)
 
         return message
 
+    def _format_timestamp(self, created: float) -> str:
+        """ISO 8601 UTC timestamp, the date part being computed once per second."""
+        second = int(created)
+        microsecond = round((created - second) * 1_000_000)
+        if microsecond in (0, 1_000_000):
+            return dt.datetime.fromtimestamp(created, tz=dt.timezone.utc).isoformat()
+
+        # (second, date part) swapped as a whole, safe across threads
+        cached_second, prefix = self._timestamp_cache
+        if second != cached_second:
+            prefix = dt.datetime.fromtimestamp(second, tz=dt.timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S"
+            )
+            self._timestamp_cache = (second, prefix)
+
+        return f"{prefix}.{microsecond:06d}+00:00"
+
 
 class NonErrorFilter(logging.Filter):
     """
@@ -90,3 +159,99 @@ class NonErrorFilter(logging.Filter):
 
     def filter(self, record: logging.LogRecord) -> bool | logging.LogRecord:
         return record.levelno <= logging.INFO
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    RateLimitFilter lets through at most `rate` records per `interval` seconds
+    from a same call site, and counts the others.
+
+    The first record let through after a window with dropped records carries
+    their count in a `suppressed` field. Records above `max_level` (errors by
+    default) are never dropped.
+    """
+
+    def __init__(
+        self,
+        rate: int = 10,
+        interval: float = 60,
+        max_level: int | str = logging.WARNING,
+        max_sites: int = 1000,
+    ):
+        super().__init__()
+        self.rate = rate
+        self.interval = interval
+        self.max_level = (
+            max_level if isinstance(max_level, int) else logging.getLevelName(max_level)
+        )
+        self.max_sites = max_sites
+        # call site -> [window start, records let through, records dropped]
+        self._sites: OrderedDict[tuple, list] = OrderedDict()
+        self._lock = threading.Lock()
+        # A filter declared once in the config is shared by the handlers using
+        # it: a record must be counted once, whatever the number of handlers
+        self._last_decision: tuple[logging.LogRecord | None, bool] = (None, True)
+
+    def filter(self, record: logging.LogRecord) -> bool | logging.LogRecord:
+        if record.levelno > self.max_level:
+            return True
+
+        last_record, decision = self._last_decision
+        if record is last_record:
+            return decision
+
+        decision = self._count(record)
+        self._last_decision = (record, decision)
+
+        return decision
+
+    def _count(self, record: logging.LogRecord) -> bool:
+        site = (record.name, record.levelno, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            counters = self._sites.get(site)
+            if counters is None:
+                counters = self._sites[site] = [now, 0, 0]
+                if len(self._sites) > self.max_sites:
+                    self._sites.popitem(last=False)
+            else:
+                self._sites.move_to_end(site)
+
+            if now - counters[0] >= self.interval:
+                counters[0], counters[1] = now, 0
+
+            if counters[1] >= self.rate:
+                counters[2] += 1
+                return False
+
+            counters[1] += 1
+            suppressed, counters[2] = counters[2], 0
+
+        if suppressed:
+            record.suppressed = suppressed
+
+        return True
+
+
+class LightQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler doing the least work on the logging thread.
+
+    The default prepare formats the whole record; only the message and the
+    traceback need to be resolved before the record leaves the thread, the
+    listener handlers format the rest.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # The listener thread does not see the context of the logging task
+        for key, val in get_log_context().items():
+            record.__dict__.setdefault(key, val)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
@@ -5,29 +5,67 @@ Module to setup logging for the application.
 :date: 2024
 """
 
+import atexit
 import json
 import logging.config
 import logging.handlers
+import queue
 from pathlib import Path
 
+from app.adapter.logger.mylogger import LightQueueHandler
 from app.core.constants import LOGGER_NAME, LOGGING_CONFIG_PATH
 
 logger = logging.getLogger(LOGGER_NAME)
 
 
-def setup_logging(config_file_path: Path | str):
+def setup_logging(config_file_path: Path | str, use_queue: bool = True):
     """Setup logging configuration from a JSON file.
 
     Parameters
     ----------
     config_file_path : Path | str
         Path to the JSON file containing the logging configuration.
+    use_queue : bool
+        Move the handlers of the root logger behind a queue, so that
+        formatting and I/O happen in a listener thread.
     """
     with open(config_file_path, encoding="utf-8") as f_in:
         config = json.load(f_in)
 
     logging.config.dictConfig(config)
 
+    if use_queue:
+        listener = start_queue_listener(logging.getLogger())
+        atexit.register(listener.stop)
+
+
+def start_queue_listener(target: logging.Logger) -> logging.handlers.QueueListener:
+    """Replace the handlers of target by a queue feeding them from a thread.
+
+    Parameters
+    ----------
+    target : logging.Logger
+        Logger whose handlers are moved behind the queue.
+
+    Returns
+    -------
+    logging.handlers.QueueListener
+        The started listener, to stop to flush the queue.
+    """
+    handlers = list(target.handlers)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    for handler in handlers:
+        target.removeHandler(handler)
+    target.addHandler(LightQueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+
+    return listener
+
 
 def init_logger():
     """Initialize the logger with the default configuration."""
@@ -0,0 +1,184 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from app.core.asset_cache.schemas import CachedAsset
+from app.core.constants import LOGGER_NAME
+from app.core.eco_index import Response, Route
+
+logger = logging.getLogger(LOGGER_NAME)
+
+CACHEABLE_RESOURCE_TYPES = frozenset({"script", "stylesheet", "font", "image"})
+
+# Headers describing the encoded body, wrong once the body is served decoded
+ENCODING_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+
+def is_storable(status: int, headers: dict[str, str]) -> bool:
+    cache_control = headers.get("cache-control", "").lower()
+
+    return status == 200 and "no-store" not in cache_control
+
+
+class AssetCache:
+    """
+    Disk cache of the static assets (js, css, fonts, images) shared by the
+    pages of a crawl.
+
+    Each entry keeps the transfer size of its first download, so that a page
+    served from the cache is still measured as a visitor without cache would
+    load it.
+    """
+
+    def __init__(self, folder: Path | str, max_age: float = 24 * 3600) -> None:
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.saved_bytes = 0
+
+    def open_session(self) -> "AssetCacheSession":
+        return AssetCacheSession(self)
+
+    def get_paths(self, url: str) -> tuple[Path, Path]:
+        """Paths of the metadata and of the body of the entry of url."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = self.folder / key[:2] / key
+
+        return base.with_suffix(".json"), base.with_suffix(".body")
+
+    def load(self, url: str) -> tuple[CachedAsset, bytes] | None:
+        meta_path, body_path = self.get_paths(url)
+        try:
+            asset = CachedAsset.model_validate_json(meta_path.read_bytes())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+
+        if asset.url != url or time.time() - asset.stored_at > self.max_age:
+            return None
+
+        return asset, body
+
+    def store(self, asset: CachedAsset, body: bytes) -> None:
+        meta_path, body_path = self.get_paths(asset.url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        # Body first: an entry is visible only once complete
+        for path, data in (
+            (body_path, body),
+            (meta_path, asset.model_dump_json().encode("utf-8")),
+        ):
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+
+    def store_all(self, assets: Iterable[tuple[CachedAsset, bytes]]) -> None:
+        for asset, body in assets:
+            self.store(asset, body)
+
+
+class AssetCacheSession:
+    """
+    Routing of the requests of one browser context through an AssetCache.
+
+    An asset of the cache is served from the disk, and measured at the transfer
+    size of its first download instead of the size of the routed response in
+    the HAR. An asset missing from the cache is downloaded by the browser, as
+    without cache: its response is kept until `get_transfer_size` reads its
+    transfer size in the HAR, and stored with it by `store_new_assets`, in a
+    thread, once the HAR is read. A page is thus measured the same with or
+    without the cache.
+    """
+
+    def __init__(self, cache: AssetCache) -> None:
+        self.cache = cache
+        # Cold transfer size of the assets served from the cache
+        self.transfer_sizes: dict[str, int] = {}
+        self._misses: set[str] = set()
+        # url -> status, decoded headers and body of the downloaded assets
+        self._downloads: dict[str, tuple[int, dict[str, str], bytes]] = {}
+        # Downloaded assets whose transfer size is known, waiting to be stored
+        self._new_assets: list[tuple[CachedAsset, bytes]] = []
+
+    async def handle_route(self, route: Route) -> None:
+        request = route.request
+        if (
+            request.method != "GET"
+            or request.resource_type not in CACHEABLE_RESOURCE_TYPES
+        ):
+            await route.continue_()
+            return
+
+        cached = await asyncio.to_thread(self.cache.load, request.url)
+        if cached is not None:
+            asset, body = cached
+            self.cache.hits += 1
+            self.cache.saved_bytes += asset.transfer_size
+            self.transfer_sizes[request.url] = asset.transfer_size
+            await route.fulfill(status=asset.status, headers=asset.headers, body=body)
+            return
+
+        self.cache.misses += 1
+        self._misses.add(request.url)
+        await route.continue_()
+
+    async def handle_response(self, response: Response) -> None:
+        """Keep the response of an asset missing from the cache, to store it."""
+        if response.url not in self._misses:
+            return
+        self._misses.discard(response.url)
+
+        headers = {name.lower(): value for name, value in response.headers.items()}
+        if not is_storable(response.status, headers):
+            return
+        try:
+            body = await response.body()
+        except Exception as e:
+            logger.debug("Asset %s not cached: %s", response.url, e)
+            return
+
+        # The body is decoded, it is served without its encoding headers
+        decoded_headers = {
+            name: value
+            for name, value in headers.items()
+            if name not in ENCODING_HEADERS
+        }
+        self._downloads[response.url] = (response.status, decoded_headers, body)
+
+    def get_transfer_size(self, url: str, har_size: int) -> int:
+        """
+        Transfer size to count for url: the one of its first download if it was
+        served from the cache, otherwise har_size, kept with the asset when it
+        was downloaded for this page until store_new_assets writes it.
+        """
+        if url in self.transfer_sizes:
+            return self.transfer_sizes[url]
+
+        download = self._downloads.pop(url, None)
+        if download is not None:
+            status, headers, body = download
+            asset = CachedAsset(
+                url=url,
+                status=status,
+                headers=headers,
+                transfer_size=har_size,
+                stored_at=time.time(),
+            )
+            self._new_assets.append((asset, body))
+
+        return har_size
+
+    async def store_new_assets(self) -> None:
+        """Write the assets downloaded by the page at once, off the event loop."""
+        if not self._new_assets:
+            return
+
+        assets, self._new_assets = self._new_assets, []
+        await asyncio.to_thread(self.cache.store_all, assets)
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+
+class CachedAsset(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Url of the asset
+    status : int
+        Http status of the response
+    headers : dict[str, str]
+        Headers of the response, without the encoding ones: the body is stored
+        decoded
+    transfer_size : int
+        Bytes a visitor without cache downloads for this asset (headers and
+        encoded body). Unit : B
+    stored_at : float
+        Timestamp of the download
+    """
+
+    url: str
+    status: int
+    headers: dict[str, str]
+    transfer_size: int
+    stored_at: float
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from app.core.browser import processes
+from app.core.browser.profiles import DEFAULT_LAUNCH_PROFILE, launch_browser
+from app.core.browser.schemas import PoolStats, RecyclePolicy, RecycleReason
+from app.core.constants import LOGGER_NAME
+from app.core.eco_index import Browser, Playwright, async_playwright
+from app.core.instrumentation.tracing import span
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def has_memory_for_page(available_kb: int, policy: RecyclePolicy) -> bool:
+    return available_kb >= policy.page_memory_kb + policy.memory_reserve_kb
+
+
+def get_recycle_reason(
+    is_connected: bool, pages: int, rss_kb: int | None, policy: RecyclePolicy
+) -> RecycleReason | None:
+    """Why a browser released after pages pages must be replaced, if it must."""
+    if not is_connected:
+        return "disconnected"
+    if policy.max_rss_kb is not None and rss_kb is not None:
+        if rss_kb >= policy.max_rss_kb:
+            return "memory"
+    if policy.max_pages is not None and pages >= policy.max_pages:
+        return "pages"
+
+    return None
+
+
+class BrowserPool:
+    """
+    Keep `size` chromium browsers launched and lend them one at a time.
+
+    A browser is held exclusively between acquire and release, so `size` is also
+    the largest number of pages analysed at once. On Linux, the memory of the
+    chromium processes of each browser is followed (see RecyclePolicy): a page
+    only starts when the system has memory for it, a browser is replaced after
+    too many pages or when it grew too big, and killed if it blows up while a
+    page runs.
+
+    A browser which cannot be replaced leaves an empty slot (None) in the idle
+    queue, the next acquire launching it again, so that the pool never shrinks.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        headless: bool = True,
+        policy: RecyclePolicy | None = None,
+        launch_profile: str = DEFAULT_LAUNCH_PROFILE,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+
+        self.size = size
+        self.headless = headless
+        self.launch_profile = launch_profile
+        self.policy = policy or RecyclePolicy()
+        self.stats = PoolStats()
+        self._playwright: Playwright | None = None
+        self._idle: asyncio.Queue[Browser | None] = asyncio.Queue()
+        self._browsers: list[Browser] = []
+        # Main chromium process and pages analysed of each browser
+        self._pids: dict[Browser, int | None] = {}
+        self._pages: dict[Browser, int] = {}
+        self._in_use: set[Browser] = set()
+        self._killed: set[Browser] = set()
+        self._launch_lock = asyncio.Lock()
+        self._watchdog: asyncio.Task | None = None
+        self._follows_memory = processes.is_supported()
+
+    async def start(self) -> None:
+        self._playwright = await async_playwright().start()
+        for _ in range(self.size):
+            browser = await self._launch()
+            self._browsers.append(browser)
+            self._idle.put_nowait(browser)
+        if self._follows_memory and self.policy.kill_rss_kb is not None:
+            self._watchdog = asyncio.create_task(self._watch_memory())
+        logger.info("Browser pool started with %s browsers", self.size)
+
+    async def stop(self) -> None:
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            await asyncio.gather(self._watchdog, return_exceptions=True)
+            self._watchdog = None
+        for browser in self._browsers:
+            await self._close(browser)
+        self._browsers.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("Browser pool stopped")
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Browser]:
+        with span("browser_wait", category="wait"):
+            browser = await self._idle.get()
+            try:
+                await self._wait_for_memory()
+                if browser is None:
+                    browser = await self._relaunch()
+                    if browser is None:
+                        raise RuntimeError("No browser could be launched")
+            except BaseException:
+                # The slot goes back to the pool, the wait being cancelled or
+                # the launch failing
+                self._idle.put_nowait(browser)
+                raise
+        self._in_use.add(browser)
+        try:
+            yield browser
+        finally:
+            self._in_use.discard(browser)
+            slot = None
+            try:
+                slot = await self._release(browser)
+            finally:
+                if slot is None and browser in self._browsers:
+                    slot = browser
+                self._idle.put_nowait(slot)
+
+    def get_rss_kb(self, browser: Browser) -> int | None:
+        """Memory of the chromium processes of browser. Unit : KB"""
+        pid = self._pids.get(browser)
+        if pid is None:
+            return None
+
+        return processes.get_tree_rss_kb(pid)
+
+    async def _launch(self) -> Browser:
+        if self._playwright is None:
+            raise RuntimeError("BrowserPool must be started first")
+
+        if not self._follows_memory:
+            return await launch_browser(
+                self._playwright, self.launch_profile, self.headless
+            )
+
+        # Launches are serialized so that the new chromium process is this
+        # browser's one
+        async with self._launch_lock:
+            pid = os.getpid()
+            before = await asyncio.to_thread(processes.get_chromium_roots, pid)
+            browser = await launch_browser(
+                self._playwright, self.launch_profile, self.headless
+            )
+            after = await asyncio.to_thread(processes.get_chromium_roots, pid)
+
+        new_roots = after - before
+        self._pids[browser] = new_roots.pop() if len(new_roots) == 1 else None
+
+        return browser
+
+    async def _close(self, browser: Browser) -> None:
+        pid = self._pids.pop(browser, None)
+        self._pages.pop(browser, None)
+        self._killed.discard(browser)
+        if not browser.is_connected():
+            return
+
+        try:
+            await asyncio.wait_for(browser.close(), self.policy.close_timeout)
+        except Exception as e:
+            logger.warning("Browser not closed (%s), killing it", e)
+            if pid is not None:
+                processes.kill_tree(pid)
+
+    async def _wait_for_memory(self) -> None:
+        """Wait until the system has memory for one more page."""
+        if not self._follows_memory:
+            return
+
+        waiting = False
+        # A page always runs when no other one does, or the pool would stall
+        while self._in_use:
+            available_kb = await asyncio.to_thread(processes.get_available_memory_kb)
+            if has_memory_for_page(available_kb, self.policy):
+                return
+            if not waiting:
+                waiting = True
+                self.stats.memory_waits += 1
+                logger.info(
+                    "%s KB available, waiting for one of the %s pages in progress"
+                    " (%s waits)",
+                    available_kb,
+                    len(self._in_use),
+                    self.stats.memory_waits,
+                )
+            await asyncio.sleep(self.policy.watch_interval)
+
+    async def _relaunch(self) -> Browser | None:
+        """Launch a browser for an empty slot, None if every attempt failed."""
+        delay = self.policy.launch_retry_delay
+        for attempt in range(1, self.policy.launch_attempts + 1):
+            try:
+                browser = await self._launch()
+            except Exception as e:
+                logger.error(
+                    "Browser launch failed (attempt %s of %s): %s",
+                    attempt,
+                    self.policy.launch_attempts,
+                    e,
+                )
+                if attempt < self.policy.launch_attempts:
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                continue
+            self._browsers.append(browser)
+            return browser
+
+        return None
+
+    async def _release(self, browser: Browser) -> Browser | None:
+        self.stats.pages += 1
+        pages = self._pages[browser] = self._pages.get(browser, 0) + 1
+
+        rss_kb = None
+        if browser.is_connected() and self.policy.max_rss_kb is not None:
+            rss_kb = await asyncio.to_thread(self.get_rss_kb, browser)
+
+        if browser in self._killed:
+            reason: RecycleReason | None = "killed"
+        else:
+            reason = get_recycle_reason(
+                browser.is_connected(), pages, rss_kb, self.policy
+            )
+        if reason is None:
+            return browser
+
+        self.stats.recycled[reason] = self.stats.recycled.get(reason, 0) + 1
+        logger.log(
+            logging.INFO if reason == "pages" else logging.WARNING,
+            "Browser replaced (%s) after %s pages, %s KB: %s pages, recycled %s",
+            reason,
+            pages,
+            rss_kb,
+            self.stats.pages,
+            self.stats.recycled,
+        )
+        await self._close(browser)
+        self._browsers.remove(browser)
+
+        return await self._relaunch()
+
+    async def _watch_memory(self) -> None:
+        """Kill the browsers growing past kill_rss_kb during a page, until cancelled."""
+        while True:
+            await asyncio.sleep(self.policy.watch_interval)
+            for browser in list(self._in_use - self._killed):
+                rss_kb = await asyncio.to_thread(self.get_rss_kb, browser)
+                if rss_kb is None or rss_kb < self.policy.kill_rss_kb:
+                    continue
+                logger.error(
+                    "Browser using %s KB (limit %s KB), killed with its page",
+                    rss_kb,
+                    self.policy.kill_rss_kb,
+                )
+                self._killed.add(browser)
+                processes.kill_tree(self._pids[browser])
@@ -0,0 +1,115 @@
+"""
+Memory and processes of the chromium browsers, read from /proc (Linux only).
+"""
+
+import os
+import signal
+from pathlib import Path
+
+PROC = Path("/proc")
+
+PAGE_SIZE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+
+CHROMIUM_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+def is_supported() -> bool:
+    return (PROC / "self" / "statm").exists()
+
+
+def is_chromium(name: str) -> bool:
+    return any(chromium in name.lower() for chromium in CHROMIUM_NAMES)
+
+
+def read_rss_kb(pid: int | str) -> int:
+    # Second field of statm : resident pages
+    with open(PROC / str(pid) / "statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE_KB
+
+
+def get_processes() -> dict[int, tuple[int, str]]:
+    """pid -> (parent pid, name) of every running process."""
+    processes = {}
+    for entry in PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The name may hold spaces and parentheses: it ends at the last ")"
+        name = stat[stat.index("(") + 1 : stat.rindex(")")]
+        ppid = int(stat[stat.rindex(")") + 2 :].split()[1])
+        processes[int(entry.name)] = (ppid, name)
+
+    return processes
+
+
+def get_descendants(
+    pid: int, processes: dict[int, tuple[int, str]] | None = None
+) -> dict[int, str]:
+    """pid -> name of every process descending from pid."""
+    if processes is None:
+        processes = get_processes()
+    children: dict[int, list[int]] = {}
+    for child, (ppid, _) in processes.items():
+        children.setdefault(ppid, []).append(child)
+
+    descendants = {}
+    stack = list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        descendants[child] = processes[child][1]
+        stack.extend(children.get(child, []))
+
+    return descendants
+
+
+def get_chromium_roots(pid: int) -> set[int]:
+    """
+    Main processes of the browsers launched by pid: chromium processes whose
+    parent is not a chromium process (renderers and GPU process are children
+    of the main one).
+    """
+    processes = get_processes()
+    return {
+        child
+        for child, name in get_descendants(pid, processes).items()
+        if is_chromium(name) and not is_chromium(processes[processes[child][0]][1])
+    }
+
+
+def get_tree_rss_kb(pid: int) -> int:
+    """Resident memory of pid and of its descendants. Unit : KB"""
+    rss_kb = 0
+    for process in [pid, *get_descendants(pid)]:
+        try:
+            rss_kb += read_rss_kb(process)
+        except OSError:
+            continue
+
+    return rss_kb
+
+
+def get_chromium_rss_kb(pid: int) -> int:
+    """Resident memory of the browsers launched by pid. Unit : KB"""
+    return sum(get_tree_rss_kb(root) for root in get_chromium_roots(pid))
+
+
+def get_available_memory_kb() -> int:
+    """Memory available for new processes without swapping. Unit : KB"""
+    with open(PROC / "meminfo") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1])
+
+    raise OSError("MemAvailable missing from /proc/meminfo")
+
+
+def kill_tree(pid: int) -> None:
+    """Kill pid and its descendants, leaving no orphan renderer behind."""
+    for process in [*get_descendants(pid), pid]:
+        try:
+            os.kill(process, signal.SIGKILL)
+        except OSError:
+            continue
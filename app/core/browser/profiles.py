@@ -0,0 +1,110 @@
+"""
+Named chromium launch profiles.
+
+- default : playwright launch arguments, as every analysis used until now
+- lean : everything not needed to measure a page is switched off (GPU, audio,
+  crash reporter, translation, background features...), and the browser is
+  warmed up after launch
+- faithful : rendering as close as possible to a desktop chromium, GPU
+  rasterization, extensions and background networking included
+
+`python -m benchmarks.run --only startup` compares their launch and first
+navigation time, their memory, and the ecoindex they measure.
+"""
+
+from playwright.sync_api import Browser as SyncBrowser
+from playwright.sync_api import Playwright as SyncPlaywright
+
+from app.core.browser.schemas import LaunchProfile
+from app.core.eco_index import Browser, Playwright
+
+DEFAULT_LAUNCH_PROFILE = "default"
+
+LAUNCH_PROFILES = {
+    profile.name: profile
+    for profile in (
+        LaunchProfile(name="default"),
+        LaunchProfile(
+            name="lean",
+            gpu=False,
+            warm_up=True,
+            args=[
+                "--mute-audio",
+                "--disable-breakpad",
+                "--disable-domain-reliability",
+                "--disable-notifications",
+                "--no-pings",
+                "--disable-features=Translate,OptimizationHints,MediaRouter,"
+                "AutofillServerCommunication,CertificateTransparencyComponentUpdater",
+            ],
+        ),
+        LaunchProfile(
+            name="faithful",
+            extensions=True,
+            background_networking=True,
+            args=["--ignore-gpu-blocklist", "--enable-gpu-rasterization"],
+        ),
+    )
+}
+
+
+def get_launch_profile(name: str) -> LaunchProfile:
+    try:
+        return LAUNCH_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown launch profile {name}, expected one of {list(LAUNCH_PROFILES)}"
+        ) from None
+
+
+def get_launch_options(profile: LaunchProfile, headless: bool = True) -> dict:
+    """Keyword arguments of chromium.launch for the profile."""
+    args = list(profile.args)
+    if not profile.gpu:
+        args.append("--disable-gpu")
+
+    # Switches playwright adds by default, removed to enable the feature
+    ignore_default_args = []
+    if profile.extensions:
+        ignore_default_args.append("--disable-extensions")
+    if profile.background_networking:
+        ignore_default_args.append("--disable-background-networking")
+
+    options: dict = {"headless": headless, "args": args}
+    if ignore_default_args:
+        options["ignore_default_args"] = ignore_default_args
+
+    return options
+
+
+async def launch_browser(
+    playwright: Playwright,
+    profile: str = DEFAULT_LAUNCH_PROFILE,
+    headless: bool = True,
+) -> Browser:
+    launch_profile = get_launch_profile(profile)
+    browser = await playwright.chromium.launch(
+        **get_launch_options(launch_profile, headless)
+    )
+    if launch_profile.warm_up:
+        page = await browser.new_page()
+        await page.goto("about:blank")
+        await page.close()
+
+    return browser
+
+
+def launch_sync_browser(
+    playwright: SyncPlaywright,
+    profile: str = DEFAULT_LAUNCH_PROFILE,
+    headless: bool = True,
+) -> SyncBrowser:
+    """Same as launch_browser, warm-up included, with the sync playwright API."""
+    launch_profile = get_launch_profile(profile)
+    browser = playwright.chromium.launch(**get_launch_options(launch_profile, headless))
+    if launch_profile.warm_up:
+        page = browser.new_page()
+        page.goto("about:blank")
+        page.close()
+
+    return browser
@@ -0,0 +1,90 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+RecycleReason = Literal["pages", "memory", "disconnected", "killed"]
+
+
+class RecyclePolicy(BaseModel):
+    """
+    Attributes
+    ----------
+    max_pages : int | None
+        A browser is replaced after this many pages, None to keep it forever
+    max_rss_kb : int | None
+        A browser whose processes use more memory when released is replaced.
+        Unit : KB
+    kill_rss_kb : int | None
+        A browser whose processes use more memory while a page runs is killed,
+        failing the page, before it takes the whole worker down. Unit : KB
+    page_memory_kb : int
+        Memory a page may take: a new page only starts when this much memory
+        plus memory_reserve_kb is available. Unit : KB
+    memory_reserve_kb : int
+        Memory always left to the system and the python process. Unit : KB
+    watch_interval : float
+        Seconds between two checks of the memory. Unit : s
+    close_timeout : float
+        A browser not closed after this delay is killed. Unit : s
+    launch_attempts : int
+        Launches tried to replace a browser before leaving its slot empty, to
+        be launched again by the next acquire
+    launch_retry_delay : float
+        Delay before the second launch, doubled before each of the next ones.
+        Unit : s
+    """
+
+    max_pages: int | None = 200
+    max_rss_kb: int | None = 1_500_000
+    kill_rss_kb: int | None = 3_000_000
+    page_memory_kb: int = 300_000
+    memory_reserve_kb: int = 500_000
+    watch_interval: float = 1
+    close_timeout: float = 10
+    launch_attempts: int = 3
+    launch_retry_delay: float = 1
+
+
+class PoolStats(BaseModel):
+    """
+    Attributes
+    ----------
+    pages : int
+        Pages analysed by the browsers of the pool
+    recycled : dict[RecycleReason, int]
+        Browsers replaced, by reason
+    memory_waits : int
+        Pages which waited for memory to be available before starting
+    """
+
+    pages: int = 0
+    recycled: dict[RecycleReason, int] = {}
+    memory_waits: int = 0
+
+
+class LaunchProfile(BaseModel):
+    """
+    Attributes
+    ----------
+    name : str
+        Name of the profile
+    gpu : bool
+        Use the GPU rasterization instead of the software one
+    extensions : bool
+        Let chromium load its component extensions (disabled by playwright)
+    background_networking : bool
+        Let chromium fetch updates, safe browsing lists... in the background
+        (disabled by playwright)
+    warm_up : bool
+        Open and close a blank page right after the launch, so that the first
+        analysed page does not pay the first renderer start
+    args : list[str]
+        Other chromium command line switches
+    """
+
+    name: str
+    gpu: bool = True
+    extensions: bool = False
+    background_networking: bool = False
+    warm_up: bool = False
+    args: list[str] = []
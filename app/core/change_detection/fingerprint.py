@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+
+import requests
+
+from app.core.change_detection.schemas import ChangeCheck, PageFingerprint
+from app.core.constants import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Unit : s
+REQUEST_TIMEOUT = 10
+
+# Attributes whose value changes on every render of an unchanged page
+VOLATILE_ATTRIBUTES = frozenset({"nonce", "csrf-token", "data-csrf", "data-nonce"})
+
+# Form fields and meta tags holding a per request token
+TOKEN_NAME = re.compile(r"csrf|xsrf|token|nonce", re.IGNORECASE)
+
+# Dates and times rendered in the page: "2024-05-02", "02/05/2024", "10:05:12"
+VOLATILE_TEXT = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+    r"|\d{1,2}/\d{1,2}/\d{2,4}"
+    r"|\d{1,2}[:h]\d{2}(?::\d{2})?"
+)
+
+
+class NormalizingParser(HTMLParser):
+    """
+    Rebuild the tags, attributes, text, inline scripts and styles of a page,
+    without comments, with whitespace collapsed and the volatile values (nonces,
+    CSRF tokens, dates and times) replaced by a placeholder.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.tokens: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        values = dict(attrs)
+        is_token = TOKEN_NAME.search(values.get("name") or "") is not None
+        normalized = []
+        for name, value in sorted(attrs, key=lambda attr: attr[0]):
+            if name in VOLATILE_ATTRIBUTES or (
+                is_token and name in ("value", "content")
+            ):
+                value = "*"
+            elif value is not None:
+                value = VOLATILE_TEXT.sub("*", value)
+            normalized.append(f"{name}={value}")
+        self.tokens.append(f"<{tag} {' '.join(normalized)}>")
+
+    def handle_endtag(self, tag: str) -> None:
+        self.tokens.append(f"</{tag}>")
+
+    def handle_data(self, data: str) -> None:
+        text = " ".join(data.split())
+        if text:
+            self.tokens.append(VOLATILE_TEXT.sub("*", text))
+
+
+def get_content_hash(html: str) -> str:
+    """
+    Hash of the HTML of a page, normalized by NormalizingParser.
+
+    Any change of the markup, of the text or of an inline script or style
+    changes the hash, but not a nonce, a CSRF token or a date rendered in the
+    page, which would make every check a change.
+    """
+    parser = NormalizingParser()
+    parser.feed(html)
+    parser.close()
+
+    return hashlib.sha256("\n".join(parser.tokens).encode("utf-8")).hexdigest()
+
+
+def check_page(
+    session: requests.Session,
+    url: str,
+    previous: PageFingerprint | None = None,
+    timeout: float = REQUEST_TIMEOUT,
+) -> ChangeCheck:
+    """
+    Tell whether url changed since its previous fingerprint.
+
+    The page is requested conditionally (If-None-Match, If-Modified-Since): a
+    304 is enough, otherwise the hash of the downloaded HTML is compared.
+    """
+    headers = {}
+    if previous is not None and previous.etag:
+        headers["If-None-Match"] = previous.etag
+    if previous is not None and previous.last_modified:
+        headers["If-Modified-Since"] = previous.last_modified
+
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        logger.warning("Vérification de la page %s impossible : %s", url, e)
+        return ChangeCheck(url=url, reason="unreachable")
+
+    checked_at = datetime.now()
+    if response.status_code == 304 and previous is not None:
+        fingerprint = previous.model_copy(
+            update={
+                "etag": response.headers.get("ETag", previous.etag),
+                "checked_at": checked_at,
+            }
+        )
+        return ChangeCheck(url=url, reason="not_modified", fingerprint=fingerprint)
+
+    if response.status_code != 200:
+        return ChangeCheck(url=url, reason="unreachable")
+
+    if "html" in response.headers.get("Content-Type", ""):
+        content_hash = get_content_hash(response.text)
+    else:
+        content_hash = hashlib.sha256(response.content).hexdigest()
+
+    fingerprint = PageFingerprint(
+        url=url,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+        content_hash=content_hash,
+        checked_at=checked_at,
+    )
+    if previous is None:
+        reason = "new"
+    elif previous.content_hash == content_hash:
+        reason = "same_content"
+    else:
+        reason = "changed"
+
+    return ChangeCheck(url=url, reason=reason, fingerprint=fingerprint)
@@ -0,0 +1,79 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+ChangeReason = Literal["new", "not_modified", "same_content", "changed", "unreachable"]
+
+UNCHANGED_REASONS = frozenset({"not_modified", "same_content"})
+
+
+class PageFingerprint(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Url of the page
+    etag : str | None
+        ETag header of the page, sent back as If-None-Match
+    last_modified : str | None
+        Last-Modified header of the page, sent back as If-Modified-Since
+    content_hash : str | None
+        Hash of the whole HTML of the page, normalized (comments, whitespace
+        and volatile values such as nonces or dates left out). The urls of
+        the assets are part of it, their content is not: an asset changed
+        behind the same url leaves the hash unchanged
+    checked_at : datetime
+        Date of the check
+    """
+
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    content_hash: str | None = None
+    checked_at: datetime
+
+
+class ChangeCheck(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Checked url
+    reason : ChangeReason
+        "not_modified" (HTTP 304) or "same_content" when the page did not
+        change, "new", "changed" or "unreachable" otherwise
+    fingerprint : PageFingerprint | None
+        Fingerprint of the page, None when it could not be fetched
+    """
+
+    url: str
+    reason: ChangeReason
+    fingerprint: PageFingerprint | None = None
+
+    @property
+    def is_changed(self) -> bool:
+        return self.reason not in UNCHANGED_REASONS
+
+
+class StoredResult(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Analysed url
+    kind : str
+        Analysis made on the url
+    fingerprint : PageFingerprint
+        Fingerprint of the page when it was last checked
+    result : dict
+        Result of the last analysis
+    analysed_at : datetime
+        Date of the last analysis
+    """
+
+    url: str
+    kind: str
+    fingerprint: PageFingerprint
+    result: dict
+    analysed_at: datetime
@@ -0,0 +1,92 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from app.core.change_detection.schemas import PageFingerprint, StoredResult
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    url TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    result TEXT NOT NULL,
+    analysed_at TEXT NOT NULL,
+    PRIMARY KEY (url, kind)
+) WITHOUT ROWID;
+"""
+
+
+class ResultStore:
+    """
+    Last result of each (url, kind) analysis, with the fingerprint of the page
+    it was made on, in an sqlite file.
+
+    The fingerprint is kept per kind: a page analysed by another kind of
+    analysis since must not hide a change to this one.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Used from worker threads, one at a time under the lock
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def get(self, url: str, kind: str) -> StoredResult | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fingerprint, result, analysed_at FROM results"
+                " WHERE url = ? AND kind = ?",
+                (url, kind),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return StoredResult(
+            url=url,
+            kind=kind,
+            fingerprint=PageFingerprint.model_validate_json(row[0]),
+            result=json.loads(row[1]),
+            analysed_at=datetime.fromisoformat(row[2]),
+        )
+
+    def save(
+        self,
+        fingerprint: PageFingerprint,
+        kind: str,
+        result: dict,
+        analysed_at: datetime | None = None,
+    ) -> None:
+        analysed_at = analysed_at or datetime.now()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (
+                    fingerprint.url,
+                    kind,
+                    fingerprint.model_dump_json(),
+                    json.dumps(result, default=str),
+                    analysed_at.isoformat(),
+                ),
+            )
+
+    def update_fingerprint(self, fingerprint: PageFingerprint, kind: str) -> None:
+        """Record a new check of a page whose result is still valid."""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE results SET fingerprint = ? WHERE url = ? AND kind = ?",
+                (fingerprint.model_dump_json(), fingerprint.url, kind),
+            )
@@ -22,3 +22,9 @@ CORE_DIR = APP_DIR / "core"
 LOGGING_CONFIG_PATH = ADAPTERS_DIR / "logger" / "config_log.json"
 
 LOGGER_NAME = "eco_design_logger"
+
+# analysis service
+
+SERVICE_HOST = "127.0.0.1"
+
+SERVICE_PORT = 8765
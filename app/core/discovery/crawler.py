@@ -0,0 +1,126 @@
+import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urldefrag, urljoin
+
+import requests
+
+from app.core.constants import LOGGER_NAME
+from app.core.discovery.urls import canonicalize_url, is_same_origin
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Unit : s
+REQUEST_TIMEOUT = 10
+
+
+class LinkParser(HTMLParser):
+    """Collect the href of <a> tags, honouring the <base> tag."""
+
+    def __init__(self, page_url: str) -> None:
+        super().__init__()
+        self.base_url = page_url
+        self.links: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag not in ("a", "base"):
+            return
+
+        href = dict(attrs).get("href")
+        if not href:
+            return
+
+        if tag == "base":
+            # Not canonicalized: the trailing slash matters to resolve links
+            self.base_url = urljoin(self.base_url, href)
+        else:
+            self.links.append(href)
+
+    def get_urls(self) -> list[str]:
+        """Absolute http(s) urls of the links, as written but the fragment."""
+        urls = (urldefrag(urljoin(self.base_url, link)).url for link in self.links)
+
+        return [url for url in urls if canonicalize_url(url) is not None]
+
+
+def extract_links(page_url: str, html: str) -> list[str]:
+    parser = LinkParser(page_url)
+    parser.feed(html)
+
+    return parser.get_urls()
+
+
+class LinkCrawler:
+    """
+    Breadth first crawl of the same origin pages of a site.
+
+    Each depth level is fetched with `concurrency` threads, and the crawl stops
+    after `max_depth` levels or `max_urls` discovered urls. Urls are deduped on
+    their canonical form but fetched and yielded as linked.
+    """
+
+    def __init__(
+        self,
+        root_url: str,
+        max_depth: int = 2,
+        max_urls: int = 1000,
+        concurrency: int = 8,
+    ) -> None:
+        root = canonicalize_url(root_url)
+        if root is None:
+            raise ValueError(f"{root_url} is not an http(s) url")
+
+        self.root_url = root_url.strip()
+        self._root = root
+        self.max_depth = max_depth
+        self.max_urls = max_urls
+        self.concurrency = concurrency
+        self.session = requests.Session()
+        self.session.mount(
+            "http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+        )
+        self.session.mount(
+            "https://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+        )
+
+    def crawl(self) -> Iterator[str]:
+        seen = {self._root}
+        level = [self.root_url]
+        yield self.root_url
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            for _ in range(self.max_depth):
+                next_level = []
+                for links in executor.map(self.get_page_links, level):
+                    for url in links:
+                        key = canonicalize_url(url)
+                        if key in seen or not is_same_origin(key, self._root):
+                            continue
+                        if len(seen) >= self.max_urls:
+                            return
+                        seen.add(key)
+                        next_level.append(url)
+                        yield url
+
+                if not next_level:
+                    return
+                level = next_level
+        finally:
+            # Do not fetch the rest of a level once max_urls is reached
+            executor.shutdown(cancel_futures=True)
+
+    def get_page_links(self, page_url: str) -> list[str]:
+        try:
+            response = self.session.get(page_url, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Page %s inaccessible : %s", page_url, e)
+            return []
+
+        content_type = response.headers.get("Content-Type", "")
+        if response.status_code != 200 or "text/html" not in content_type:
+            return []
+
+        # Redirections may land on another path, links are relative to it
+        return extract_links(response.url, response.text)
@@ -0,0 +1,52 @@
+from collections.abc import Iterator
+
+from app.core.discovery.crawler import LinkCrawler
+from app.core.discovery.sitemap import get_sitemaps_from_robots, iter_sitemap_urls
+from app.core.discovery.urls import canonicalize_url, is_same_origin
+
+
+def discover_urls(
+    root_url: str,
+    *,
+    use_sitemap: bool = True,
+    use_crawl: bool = False,
+    max_depth: int = 2,
+    max_urls: int = 10000,
+    concurrency: int = 8,
+) -> Iterator[str]:
+    """
+    Expand a site root into its deduplicated, same origin urls.
+
+    Urls come first from the sitemaps (the ones of robots.txt, or /sitemap.xml),
+    then from a link crawl of the site when use_crawl is set. They are deduped
+    on their canonical form but yielded as found, to be fetched as such.
+    """
+    root = canonicalize_url(root_url)
+    if root is None:
+        raise ValueError(f"{root_url} is not an http(s) url")
+
+    seen: set[str] = set()
+
+    def sources() -> Iterator[str]:
+        if use_sitemap:
+            sitemaps = get_sitemaps_from_robots(root) or [
+                canonicalize_url("/sitemap.xml", root)
+            ]
+            yield from iter_sitemap_urls(sitemaps)
+        if use_crawl:
+            crawler = LinkCrawler(
+                root_url,
+                max_depth=max_depth,
+                max_urls=max_urls,
+                concurrency=concurrency,
+            )
+            yield from crawler.crawl()
+
+    for url in sources():
+        key = canonicalize_url(url)
+        if key is None or key in seen or not is_same_origin(key, root):
+            continue
+        seen.add(key)
+        yield url
+        if len(seen) >= max_urls:
+            return
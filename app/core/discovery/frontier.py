@@ -0,0 +1,207 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+
+from pydantic import ValidationError
+
+from app.core.discovery.urls import canonicalize_url
+from app.core.eco_index.schemas import WebPage
+
+# Urls read at once by feed, in a thread
+FEED_CHUNK_SIZE = 100
+
+# feed stops reading while this many urls wait to be handed out
+FEED_MAX_WAITING = 10_000
+
+
+def normalize_url(url: str) -> tuple[str, str, str] | None:
+    """
+    Validate an url as a WebPage and return its (url, canonical url, host), or
+    None if it is not a valid http(s) url.
+
+    The canonical url is only a dedupe key: the url itself is the one fetched,
+    a site redirecting /page to /page/ costing no extra request.
+    """
+    try:
+        page = WebPage(url=url.strip())
+    except ValidationError:
+        return None
+
+    canonical_url = canonicalize_url(page.url)
+    if canonical_url is None:
+        return None
+
+    return page.url, canonical_url, page.get_url_host()
+
+
+class UrlFrontier:
+    """
+    Deduplicated urls to analyse, handed out host by host, as they were added:
+    the canonical form of an url is only its dedupe key.
+
+    Hosts are served in round robin, each with at most `per_host_concurrency`
+    urls in flight and `per_host_delay` seconds between two starts, so that a
+    site with many urls does not starve the others nor get hammered.
+
+    Urls are either all added before the run (add, extend), or streamed from a
+    source by `feed` while they are handed out.
+    """
+
+    def __init__(
+        self,
+        per_host_concurrency: int = 2,
+        per_host_delay: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if per_host_concurrency < 1:
+            raise ValueError("per_host_concurrency must be at least 1")
+
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = per_host_delay
+        self._clock = clock
+        self._seen: set[str] = set()
+        self._queues: dict[str, deque[str]] = {}
+        self._hosts: deque[str] = deque()
+        self._hosts_of_urls: dict[str, str] = {}
+        self._active: dict[str, int] = {}
+        self._next_start: dict[str, float] = {}
+        self._changed = asyncio.Event()
+        # Set when an url is handed out, for a feed waiting for room
+        self._taken = asyncio.Event()
+        self._waiting = 0
+        self._feeding = 0
+        self.duplicates = 0
+        self.invalids = 0
+
+    def __len__(self) -> int:
+        """Number of urls waiting to be handed out."""
+        return self._waiting
+
+    def add(self, url: str) -> bool:
+        """Queue an url, return False if it is invalid or already seen."""
+        normalized = normalize_url(url)
+        if normalized is None:
+            self.invalids += 1
+            return False
+
+        url, canonical_url, host = normalized
+        if canonical_url in self._seen:
+            self.duplicates += 1
+            return False
+
+        self._seen.add(canonical_url)
+        if host not in self._queues:
+            self._queues[host] = deque()
+            self._hosts.append(host)
+        self._queues[host].append(url)
+        self._waiting += 1
+        self._changed.set()
+
+        return True
+
+    def extend(self, urls: Iterable[str]) -> int:
+        return sum(self.add(url) for url in urls)
+
+    def feed(
+        self,
+        urls: Iterable[str],
+        chunk_size: int = FEED_CHUNK_SIZE,
+        max_waiting: int = FEED_MAX_WAITING,
+    ) -> asyncio.Task:
+        """
+        Add the urls of a source read chunk by chunk in a thread (a file, or
+        stdin which may never end), reading only while fewer than max_waiting
+        urls wait. Until the source is exhausted, get waits for more urls.
+
+        The returned task must be awaited, for the errors of the source, or
+        cancelled.
+        """
+        if chunk_size < 1 or max_waiting < 1:
+            raise ValueError("chunk_size and max_waiting must be at least 1")
+
+        self._feeding += 1
+        return asyncio.create_task(self._feed(iter(urls), chunk_size, max_waiting))
+
+    def get_nowait(self) -> tuple[str | None, float | None]:
+        """
+        Hand out the next url allowed by the politeness rules.
+
+        Returns (url, None) when an url is available, or (None, wait) where wait
+        is the time before a host delay expires, None if no url can become
+        available before a release.
+        """
+        now = self._clock()
+        wait = None
+
+        for _ in range(len(self._hosts)):
+            host = self._hosts[0]
+            self._hosts.rotate(-1)
+
+            if self._active.get(host, 0) >= self.per_host_concurrency:
+                continue
+
+            host_wait = self._next_start.get(host, now) - now
+            if host_wait > 0:
+                wait = host_wait if wait is None else min(wait, host_wait)
+                continue
+
+            return self._pop(host, now), None
+
+        return None, wait
+
+    async def get(self) -> str | None:
+        """
+        Wait for the next url, None once every url has been handed out and the
+        feeds are exhausted.
+        """
+        while self._hosts or self._feeding:
+            url, wait = self.get_nowait()
+            if url is not None:
+                return url
+
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+        return None
+
+    def release(self, url: str) -> None:
+        """Tell the frontier an url handed out by get is finished."""
+        host = self._hosts_of_urls.pop(url)
+        self._active[host] -= 1
+        self._changed.set()
+
+    async def _feed(
+        self, urls: Iterator[str], chunk_size: int, max_waiting: int
+    ) -> None:
+        try:
+            while True:
+                while self._waiting >= max_waiting:
+                    self._taken.clear()
+                    await self._taken.wait()
+                chunk = await asyncio.to_thread(list, islice(urls, chunk_size))
+                if not chunk:
+                    break
+                self.extend(chunk)
+        finally:
+            self._feeding -= 1
+            self._changed.set()
+
+    def _pop(self, host: str, now: float) -> str:
+        queue = self._queues[host]
+        url = queue.popleft()
+        self._waiting -= 1
+        self._taken.set()
+        if not queue:
+            del self._queues[host]
+            self._hosts.remove(host)
+
+        self._hosts_of_urls[url] = host
+        self._active[host] = self._active.get(host, 0) + 1
+        self._next_start[host] = now + self.per_host_delay
+
+        return url
@@ -0,0 +1,129 @@
+import logging
+import xml.etree.ElementTree as ET
+import zlib
+from collections.abc import Iterable, Iterator
+
+import requests
+
+from app.core.constants import LOGGER_NAME
+from app.core.discovery.urls import canonicalize_url
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Unit : s
+REQUEST_TIMEOUT = 10
+
+# Unit : bytes
+CHUNK_SIZE = 64 * 1024
+
+# Sitemaps may be gzipped files (e.g. sitemap.xml.gz) rather than gzip encoded
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(chunks: Iterable[bytes]) -> Iterator[tuple[str, str]]:
+    """
+    Stream the <loc> of a sitemap, without loading the whole document.
+
+    Chunks may be gzipped (e.g. sitemap.xml.gz files). Yields (kind, loc)
+    tuples, kind being "sitemap" for the children of a sitemap index and "url"
+    for the pages of a urlset.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    decompressor = None
+    root: list[ET.Element] = []
+
+    for chunk in chunks:
+        if decompressor is None and chunk[:2] == GZIP_MAGIC_NUMBER:
+            decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+        yield from _read_locs(parser, root)
+
+    parser.close()
+    yield from _read_locs(parser, root)
+
+
+def _read_locs(
+    parser: ET.XMLPullParser, root: list[ET.Element]
+) -> Iterator[tuple[str, str]]:
+    """Read the parsed <loc>, root holding the document element once seen."""
+    for event, element in parser.read_events():
+        if event == "start":
+            if not root:
+                root.append(element)
+            continue
+
+        name = _local_name(element.tag)
+        if name not in ("url", "sitemap"):
+            continue
+
+        loc = next(
+            (child.text for child in element if _local_name(child.tag) == "loc"),
+            None,
+        )
+        if loc:
+            yield name, loc.strip()
+
+        # Keep memory flat on sitemaps of tens of thousands of urls: the read
+        # elements are dropped from the document, not only emptied
+        root[0].clear()
+
+
+def get_sitemaps_from_robots(root_url: str) -> list[str]:
+    """Return the sitemaps declared in the robots.txt of the site."""
+    try:
+        response = requests.get(
+            canonicalize_url("/robots.txt", root_url), timeout=REQUEST_TIMEOUT
+        )
+    except requests.exceptions.RequestException as e:
+        logger.warning("robots.txt de %s inaccessible : %s", root_url, e)
+        return []
+
+    if response.status_code != 200:
+        return []
+
+    return [
+        line.split(":", 1)[1].strip()
+        for line in response.text.splitlines()
+        if line.lower().startswith("sitemap:")
+    ]
+
+
+def iter_sitemap_urls(sitemap_urls: list[str]) -> Iterator[str]:
+    """
+    Yield the http(s) page urls of sitemaps, following sitemap indexes.
+
+    Every sitemap is fetched once and streamed, gzipped sitemaps included.
+    """
+    to_visit = list(sitemap_urls)
+    visited: set[str] = set()
+
+    while to_visit:
+        sitemap_url = to_visit.pop()
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+
+        try:
+            with requests.get(
+                sitemap_url, stream=True, timeout=REQUEST_TIMEOUT
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning(
+                        "Sitemap %s ignoré : statut %s",
+                        sitemap_url,
+                        response.status_code,
+                    )
+                    continue
+
+                chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+                for kind, loc in parse_sitemap(chunks):
+                    if kind == "sitemap":
+                        to_visit.append(loc)
+                    elif canonicalize_url(loc) is not None:
+                        yield loc
+        except (requests.exceptions.RequestException, ET.ParseError, zlib.error) as e:
+            logger.warning("Sitemap %s illisible : %s", sitemap_url, e)
@@ -0,0 +1,51 @@
+import re
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Urls already in canonical form: lower case scheme and host, no port, no
+# fragment, no empty segment or trailing slash but the root one. Most urls are,
+# once written by a batch, and are returned as is without being parsed.
+CANONICAL_URL = re.compile(r"https?://[a-z0-9.-]+(?:/|(?:/[^/?#\s]+)+)(?:\?[^#\s]+)?")
+
+
+def canonicalize_url(url: str, base: str | None = None) -> str | None:
+    """
+    Return the canonical form of an http(s) url, or None if it is not one.
+
+    The url is resolved against base, the fragment is dropped, scheme and host
+    are lowercased, default ports and trailing slashes (except the root one) are
+    removed, so that equivalent urls compare equal.
+    """
+    if base is not None:
+        url = urljoin(base, url)
+    if CANONICAL_URL.fullmatch(url):
+        return url
+
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    netloc = parts.hostname.lower()
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+
+    path = parts.path.rstrip("/") or "/"
+
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+
+def get_origin(url: str) -> str:
+    parts = urlsplit(url)
+
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def is_same_origin(url: str, other_url: str) -> bool:
+    return get_origin(url) == get_origin(other_url)
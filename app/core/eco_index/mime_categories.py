@@ -0,0 +1,140 @@
+"""
+Category (field of MimetypeAggregation) of the resources of a page, from their
+mime type and, when the server sent a generic one, from the extension of their
+url.
+
+The tables are built once at import: classifying a resource is a dict lookup,
+memoized per distinct mime type.
+"""
+
+from functools import lru_cache
+
+DEFAULT_CATEGORY = "other"
+
+MIME_CATEGORIES = {
+    "text/html": "html",
+    "application/xhtml+xml": "html",
+    "text/css": "css",
+    "text/javascript": "javascript",
+    "application/javascript": "javascript",
+    "application/x-javascript": "javascript",
+    "application/ecmascript": "javascript",
+    "text/ecmascript": "javascript",
+    "application/wasm": "javascript",
+    "image/svg+xml": "image",
+    "application/font-woff": "font",
+    "application/font-woff2": "font",
+    "application/font-sfnt": "font",
+    "application/x-font-ttf": "font",
+    "application/x-font-otf": "font",
+    "application/x-font-woff": "font",
+    "application/vnd.ms-fontobject": "font",
+    "application/vnd.apple.mpegurl": "video",
+    "application/x-mpegurl": "video",
+    "application/dash+xml": "video",
+    "application/ogg": "audio",
+}
+
+# Top level types, checked after the exact table
+PREFIX_CATEGORIES = (
+    ("image/", "image"),
+    ("font/", "font"),
+    ("audio/", "audio"),
+    ("video/", "video"),
+)
+
+# Mime types telling nothing about the content (or commonly wrong, like scripts
+# and fonts served as text/plain): the url extension decides
+GENERIC_MIME_TYPES = frozenset(
+    (
+        "",
+        "application/octet-stream",
+        "binary/octet-stream",
+        "application/unknown",
+        "application/force-download",
+        "text/plain",
+    )
+)
+
+EXTENSION_CATEGORIES = {
+    "html": "html",
+    "htm": "html",
+    "css": "css",
+    "js": "javascript",
+    "mjs": "javascript",
+    "wasm": "javascript",
+    "woff": "font",
+    "woff2": "font",
+    "ttf": "font",
+    "otf": "font",
+    "eot": "font",
+    "png": "image",
+    "jpg": "image",
+    "jpeg": "image",
+    "gif": "image",
+    "webp": "image",
+    "avif": "image",
+    "svg": "image",
+    "ico": "image",
+    "mp4": "video",
+    "webm": "video",
+    "m3u8": "video",
+    "ts": "video",
+    "mp3": "audio",
+    "ogg": "audio",
+    "wav": "audio",
+    "m4a": "audio",
+}
+
+
+def normalize_mime_type(mime_type: str) -> str:
+    """'Text/HTML; charset=UTF-8' -> 'text/html'"""
+    return mime_type.partition(";")[0].strip().lower()
+
+
+@lru_cache(maxsize=1024)
+def get_mime_category(mime_type: str) -> str:
+    """Category of a mime type, as sent in a Content-Type header."""
+    mime_type = normalize_mime_type(mime_type)
+
+    category = MIME_CATEGORIES.get(mime_type)
+    if category is not None:
+        return category
+
+    for prefix, category in PREFIX_CATEGORIES:
+        if mime_type.startswith(prefix):
+            return category
+
+    # Unlisted vendor types (application/x-font-xxx, text/x-javascript...)
+    subtype = mime_type.partition("/")[2]
+    for keyword, category in (("javascript", "javascript"), ("font", "font")):
+        if keyword in subtype:
+            return category
+
+    return DEFAULT_CATEGORY
+
+
+def get_extension_category(url: str) -> str:
+    """Category of a resource from the extension of its url path."""
+    path = url.partition("?")[0].partition("#")[0]
+    name = path.rpartition("/")[2]
+    if "." not in name:
+        return DEFAULT_CATEGORY
+
+    return EXTENSION_CATEGORIES.get(name.rpartition(".")[2].lower(), DEFAULT_CATEGORY)
+
+
+def get_resource_category(mime_type: str, url: str | None = None) -> str:
+    """
+    Category of a resource, falling back on the extension of its url when its
+    mime type is generic (a font served as application/octet-stream...).
+    """
+    category = get_mime_category(mime_type)
+    if (
+        url is not None
+        and category == DEFAULT_CATEGORY
+        and normalize_mime_type(mime_type) in GENERIC_MIME_TYPES
+    ):
+        return get_extension_category(url)
+
+    return category
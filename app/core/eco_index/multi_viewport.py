@@ -0,0 +1,135 @@
+import asyncio
+
+from app.core.browser.profiles import launch_browser
+from app.core.eco_index import async_playwright
+from app.core.eco_index.computation import compute_ecoindex
+from app.core.eco_index.schemas import PageMetrics, Result, WebPage, WindowSize
+from app.core.eco_index.scraper import EcoindexScraper
+from app.core.instrumentation.timings import timed_phase
+
+# Assets the browser picks according to the viewport: a page holding one of
+# them is loaded again at each viewport
+RESPONSIVE_ASSETS_SELECTOR = ", ".join(
+    [
+        "img[srcset]",
+        "source[srcset]",
+        "source[media]",
+        "link[rel='stylesheet'][media]:not([media='all']):not([media='screen'])",
+    ]
+)
+
+SCROLL_TO_BOTTOM = (
+    "window.scrollTo({ top: document.body.scrollHeight, behavior: 'smooth' })"
+)
+
+
+class MultiViewportScraper(EcoindexScraper):
+    """
+    Analyse a page at several viewports with a single browser.
+
+    The page is loaded at the first viewport, then resized to the next ones
+    and measured again, the size and requests of the first load being shared.
+    From the first viewport where responsive assets (srcset, media queries) or
+    new requests after the resize show that the downloaded resources depend on
+    the viewport, the page is loaded again once (in a new context of the same
+    browser) and resized to the next viewports the same way. A page with
+    responsive assets is thus loaded once per viewport.
+
+    The requests made by the resizes are left out of the first load.
+    """
+
+    def __init__(self, url: str, window_sizes: list[WindowSize], **kwargs) -> None:
+        if not window_sizes:
+            raise ValueError("window_sizes must not be empty")
+
+        super().__init__(url, window_size=window_sizes[0], **kwargs)
+        self.window_sizes = window_sizes
+        self.web_pages = [
+            WebPage(url=url, **window_size.model_dump()) for window_size in window_sizes
+        ]
+        self.scraper_options = kwargs
+        # Index of the viewports measured on the first load -> nodes count
+        self.resized_nodes: dict[int, int] = {}
+
+    def get_context_options(self) -> dict:
+        # Each viewport is what is measured: the page starts at the first one,
+        # not at the default viewport of playwright
+        return {
+            **super().get_context_options(),
+            "viewport": self.window_size.model_dump(),
+        }
+
+    async def get_page_analyses(self) -> list[Result]:
+        """One Result per viewport, in the order of window_sizes."""
+        if self.browser is not None:
+            return await self._analyse_viewports()
+
+        async with async_playwright() as p:
+            with timed_phase("eco_index.browser_launch"):
+                self.browser = await launch_browser(
+                    p, self.launch_profile, self.headless
+                )
+            try:
+                return await self._analyse_viewports()
+            finally:
+                with timed_phase("eco_index.browser_close"):
+                    await self.browser.close()
+                self.browser = None
+
+    async def _analyse_viewports(self) -> list[Result]:
+        first = await self.get_page_analysis()
+        results = [first]
+
+        for i in range(1, len(self.window_sizes)):
+            if i in self.resized_nodes:
+                results.append(await self._get_resized_result(first, i))
+                continue
+
+            options = {
+                key: value
+                for key, value in self.scraper_options.items()
+                if key not in ("screenshot", "browser")
+            }
+            scraper = type(self)(
+                self.url, self.window_sizes[i:], browser=self.browser, **options
+            )
+            return results + await scraper._analyse_viewports()
+
+        return results
+
+    async def _get_resized_result(self, first: Result, i: int) -> Result:
+        page_metrics = PageMetrics(
+            size=first.size, nodes=self.resized_nodes[i], requests=first.requests
+        )
+        ecoindex = await compute_ecoindex(
+            nodes=page_metrics.nodes,
+            size=page_metrics.size,
+            requests=page_metrics.requests,
+        )
+
+        return Result.from_analysis(self.web_pages[i], page_metrics, ecoindex, self.now)
+
+    async def on_page_measured(self) -> None:
+        if len(self.window_sizes) == 1:
+            return
+
+        if await self.page.locator(RESPONSIVE_ASSETS_SELECTOR).count():
+            return
+
+        def on_request(request) -> None:
+            self.late_requests[request.url] += 1
+
+        # Left on until the page closes: every request from now on is the
+        # resizes' one
+        self.page.on("request", on_request)
+        for i, window_size in enumerate(self.window_sizes[1:], start=1):
+            with timed_phase("eco_index.resize"):
+                await self.page.set_viewport_size(window_size.model_dump())
+                await self.page.evaluate(SCROLL_TO_BOTTOM)
+                await asyncio.sleep(self.wait_after_scroll)
+            if self.late_requests:
+                # Resources depend on the viewport (lazy loading, scripts
+                # reading matchMedia...): load again from this one on
+                break
+            with timed_phase("eco_index.nodes_count"):
+                self.resized_nodes[i] = await self.get_nodes_count()
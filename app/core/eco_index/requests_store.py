@@ -0,0 +1,111 @@
+"""
+Compact storage of the requests of a page.
+
+A page makes up to thousands of requests, and many pages are analysed at once:
+instead of one RequestItem per request, the requests are stored by columns.
+Mime types are stored once per page and referenced by index, categories by
+their index in CATEGORIES, sizes and statuses in typed arrays. RequestItem
+objects are only built when asked for.
+"""
+
+from array import array
+from typing import Literal
+
+from app.core.eco_index.schemas import MimetypeAggregation, RequestItem
+
+CATEGORIES = tuple(MimetypeAggregation.model_fields)
+
+_CATEGORY_INDEXES = {category: i for i, category in enumerate(CATEGORIES)}
+
+# all : every request with its url
+# no_urls : every request, without its url (the biggest part of a request)
+# summary : only the totals by category
+RequestsMode = Literal["all", "no_urls", "summary"]
+
+
+class Requests:
+    __slots__ = (
+        "mode",
+        "total_count",
+        "total_size",
+        "_category_counts",
+        "_category_sizes",
+        "_mime_types",
+        "_mime_type_indexes",
+        "_categories",
+        "_mime_type_ids",
+        "_sizes",
+        "_statuses",
+        "_urls",
+    )
+
+    def __init__(self, mode: RequestsMode = "all") -> None:
+        self.mode = mode
+        self.total_count = 0
+        self.total_size = 0.0
+        self._category_counts = [0] * len(CATEGORIES)
+        self._category_sizes = [0.0] * len(CATEGORIES)
+        # Distinct mime types of the page, and their index in this list
+        self._mime_types: list[str] = []
+        self._mime_type_indexes: dict[str, int] = {}
+        # One value per request
+        self._categories = array("B")
+        self._mime_type_ids = array("H")
+        self._sizes = array("d")
+        self._statuses = array("h")
+        self._urls: list[str] = []
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    def add(
+        self, url: str, mime_type: str, category: str, status: int, size: float
+    ) -> None:
+        category_index = _CATEGORY_INDEXES[category]
+        self._category_counts[category_index] += 1
+        self._category_sizes[category_index] += size
+        self.total_count += 1
+        self.total_size += size
+        if self.mode == "summary":
+            return
+
+        mime_type_id = self._mime_type_indexes.get(mime_type)
+        if mime_type_id is None:
+            mime_type_id = self._mime_type_indexes[mime_type] = len(self._mime_types)
+            self._mime_types.append(mime_type)
+        self._categories.append(category_index)
+        self._mime_type_ids.append(mime_type_id)
+        self._sizes.append(size)
+        self._statuses.append(status)
+        if self.mode == "all":
+            self._urls.append(url)
+
+    @property
+    def aggregation(self) -> MimetypeAggregation:
+        return MimetypeAggregation(
+            **{
+                category: {"total_count": count, "total_size": size}
+                for category, count, size in zip(
+                    CATEGORIES, self._category_counts, self._category_sizes, strict=True
+                )
+            }
+        )
+
+    @property
+    def items(self) -> list[RequestItem]:
+        """
+        The stored requests, empty in summary mode. Their url is empty when urls
+        are not kept.
+        """
+        has_urls = self.mode == "all"
+
+        return [
+            RequestItem(
+                url=self._urls[i] if has_urls else "",
+                mime_type=self._mime_types[self._mime_type_ids[i]],
+                status=self._statuses[i],
+                size=self._sizes[i],
+                category=CATEGORIES[self._categories[i]],
+            )
+            for i in range(len(self._sizes))
+        ]
@@ -1,9 +1,12 @@
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic import AnyHttpUrl, BaseModel, Field, field_validator
 
+from app.core.eco_index.mime_categories import get_resource_category
+
 
 class Grade(str, Enum):
     A = "A"
@@ -109,21 +112,10 @@ class MimetypeAggregation(BaseModel):
     video: MimetypeMetrics = MimetypeMetrics()
 
     @classmethod
-    async def get_category_of_resource(cls, mimetype: str) -> str:
-        mimetypes = [type for type in cls.model_fields.keys()]
-
-        for type in mimetypes:
-            if type in mimetype:
-                return type
-
-        return "other"
-
-
-class Requests(BaseModel):
-    aggregation: MimetypeAggregation = MimetypeAggregation()
-    items: list[RequestItem] = []
-    total_count: int = 0
-    total_size: float = 0
+    async def get_category_of_resource(
+        cls, mimetype: str, url: str | None = None
+    ) -> str:
+        return get_resource_category(mimetype, url)
 
 
 class PageMetrics(BaseModel):
@@ -150,6 +142,12 @@ class PageMetrics(BaseModel):
     )
 
 
+@lru_cache(maxsize=4096)
+def parse_url(url: str) -> AnyHttpUrl:
+    """Parse an url once: results of a same page share its parsed components."""
+    return AnyHttpUrl(url=url)
+
+
 class WebPage(BaseModel):
     width: int | None = Field(
         default=1920,
@@ -175,20 +173,16 @@ class WebPage(BaseModel):
     @field_validator("url")
     @classmethod
     def url_as_http_url(cls, v: str) -> str:
-        url_object = AnyHttpUrl(url=v)
+        url_object = parse_url(v)
         assert url_object.scheme in {"http", "https"}, "scheme must be http or https"
 
         return url_object.unicode_string()
 
     def get_url_host(self) -> str:
-        url_object = AnyHttpUrl(url=self.url)
-
-        return str(url_object.host)
+        return str(parse_url(self.url).host)
 
     def get_url_path(self) -> str:
-        url_obect = AnyHttpUrl(url=self.url)
-
-        return str(url_obect.path)
+        return str(parse_url(self.url).path)
 
 
 PageType = str
@@ -204,6 +198,25 @@ class Result(Ecoindex, PageMetrics, WebPage):
         description="Is the type of the page, based ton the [opengraph type tag](https://ogp.me/#types)",
     )
 
+    @classmethod
+    def from_analysis(
+        cls,
+        page: WebPage,
+        page_metrics: PageMetrics,
+        ecoindex: Ecoindex,
+        date: datetime | None = None,
+    ) -> "Result":
+        """
+        Assemble the result of an analysis from its validated parts.
+
+        Their fields are passed as is, without dumping each part to a dict, and
+        the url validation hits the parse_url cache. This is faster than
+        model_construct, which is implemented in python.
+        """
+        return cls(
+            **page.__dict__, **page_metrics.__dict__, **ecoindex.__dict__, date=date
+        )
+
 
 quantiles_dom = [
     0,
@@ -1,26 +1,34 @@
+import asyncio
 import json
 import os
+from collections import Counter
 from datetime import datetime
-from time import sleep
 from uuid import uuid4
 
 from app.adapter.exception.app_exception import EcoindexScraperStatusError
-from app.core.eco_index import async_playwright
+from app.core.asset_cache.cache import AssetCache, AssetCacheSession
+from app.core.browser.profiles import DEFAULT_LAUNCH_PROFILE, launch_browser
+from app.core.eco_index import Browser, async_playwright
 from app.core.eco_index.computation import compute_ecoindex
+from app.core.eco_index.mime_categories import get_resource_category
+from app.core.eco_index.requests_store import Requests, RequestsMode
 from app.core.eco_index.schemas import (
     MimetypeAggregation,
     PageMetrics,
     RequestItem,
-    Requests,
     Result,
     ScreenShot,
+    WebPage,
     WindowSize,
 )
 from app.core.eco_index.screenshots import (
-    convert_screenshot_to_webp,
+    SCREENSHOT_JPEG_QUALITY,
+    get_screenshot_webp,
+    save_screenshot_as_webp,
     set_screenshot_rights,
 )
-from app.core.eco_index.stealth import stealth_async
+from app.core.eco_index.stealth import stealth_context_async
+from app.core.instrumentation.timings import timed_phase
 
 
 class EcoindexScraper:
@@ -35,34 +43,56 @@ class EcoindexScraper:
         screenshot_gid: int | None = None,
         page_load_timeout: int = 20,
         headless: bool = True,
+        browser: Browser | None = None,
+        asset_cache: AssetCache | None = None,
+        launch_profile: str = DEFAULT_LAUNCH_PROFILE,
+        requests_mode: RequestsMode = "all",
+        keep_screenshot: bool = False,
     ):
         self.url = url
         self.window_size = window_size or WindowSize(width=1920, height=1080)
+        # The url and window size are validated once, here, the result being
+        # assembled from validated parts
+        self.web_page = WebPage(url=url, **self.window_size.model_dump())
         self.wait_before_scroll = wait_before_scroll
         self.wait_after_scroll = wait_after_scroll
         self.screenshot = screenshot
         self.screenshot_uid = screenshot_uid
         self.screenshot_gid = screenshot_gid
+        # Without a screenshot folder, the capture may be kept in memory as
+        # WebP bytes, e.g. to go straight into a ScreenshotStore
+        self.keep_screenshot = keep_screenshot
+        self.screenshot_webp: bytes | None = None
         self.page_load_timeout = page_load_timeout
-        self.all_requests = Requests()
+        # "no_urls" or "summary" keep less of each request, see Requests
+        self.all_requests = Requests(requests_mode)
         self.now = datetime.now()
         self.har_temp_file_path = (
             f"/tmp/ecoindex-{self.now.strftime('%Y-%m-%d-%H-%M-%S-%f')}-{uuid4()}.har"
         )
         self.headless = headless
+        self.launch_profile = launch_profile
+        # An already launched browser (e.g. a warm one from a BrowserPool) is
+        # reused and left open, otherwise a browser is launched for this page.
+        self.browser = browser
+        # Opt-in: static assets served from a disk cache shared across pages,
+        # measured with the transfer size of their first download
+        self.asset_cache = asset_cache
+        self.asset_cache_session: AssetCacheSession | None = None
+        # Urls of the requests made after the page was measured (e.g. by a
+        # resize), still recorded in the HAR but not part of the page
+        self.late_requests: Counter[str] = Counter()
 
     async def get_page_analysis(self) -> Result:
         page_metrics = await self.scrap_page()
-        ecoindex = await compute_ecoindex(**page_metrics.model_dump())
-
-        return Result(
-            **ecoindex.model_dump(),
-            **self.window_size.model_dump(),
-            **page_metrics.model_dump(),
-            date=self.now,
-            url=self.url,
+        ecoindex = await compute_ecoindex(
+            nodes=page_metrics.nodes,
+            size=page_metrics.size,
+            requests=page_metrics.requests,
         )
 
+        return Result.from_analysis(self.web_page, page_metrics, ecoindex, self.now)
+
     async def get_all_requests(self) -> list[RequestItem]:
         return self.all_requests.items
 
@@ -70,30 +100,27 @@ class EcoindexScraper:
         return self.all_requests.aggregation
 
     async def scrap_page(self) -> PageMetrics:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless)
-            self.page = await browser.new_page(
-                record_har_path=self.har_temp_file_path,
-                screen=self.window_size.model_dump(),
-                ignore_https_errors=True,
-            )
-            await stealth_async(self.page)
-            response = await self.page.goto(self.url)
-            await self.check_page_response(response)
-
-            await self.page.wait_for_load_state()
-            sleep(self.wait_before_scroll)
-            await self.generate_screenshot()
-            await self.page.keyboard.press("ArrowDown")
-            await self.page.evaluate(
-                "window.scrollTo({ top: document.body.scrollHeight, behavior: 'smooth' })"
-            )
-            sleep(self.wait_after_scroll)
-            total_nodes = await self.get_nodes_count()
-            await self.page.close()
-            await browser.close()
+        try:
+            if self.browser is not None:
+                total_nodes = await self.scrap_page_with_browser(self.browser)
+            else:
+                async with async_playwright() as p:
+                    with timed_phase("eco_index.browser_launch"):
+                        browser = await launch_browser(
+                            p, self.launch_profile, self.headless
+                        )
+                    try:
+                        total_nodes = await self.scrap_page_with_browser(browser)
+                    finally:
+                        with timed_phase("eco_index.browser_close"):
+                            await browser.close()
 
-        await self.get_requests_from_har_file()
+            with timed_phase("eco_index.har_parsing"):
+                await self.get_requests_from_har_file()
+        finally:
+            # The HAR file is written as soon as the context closes, even when
+            # the page fails: never leave it behind in /tmp
+            self.remove_har_file()
 
         return PageMetrics(
             size=self.all_requests.total_size / 1000,
@@ -101,41 +128,113 @@ class EcoindexScraper:
             requests=self.all_requests.total_count,
         )
 
+    async def scrap_page_with_browser(self, browser: Browser) -> int:
+        with timed_phase("eco_index.page_setup"):
+            context = await browser.new_context(**self.get_context_options())
+        try:
+            with timed_phase("eco_index.page_setup"):
+                await stealth_context_async(context)
+                if self.asset_cache is not None:
+                    self.asset_cache_session = self.asset_cache.open_session()
+                    await context.route("**/*", self.asset_cache_session.handle_route)
+                    context.on("response", self.asset_cache_session.handle_response)
+                self.page = await context.new_page()
+            with timed_phase("eco_index.goto"):
+                response = await self.page.goto(self.url)
+            await self.check_page_response(response)
+
+            with timed_phase("eco_index.load_state"):
+                await self.page.wait_for_load_state()
+            with timed_phase("eco_index.wait_before_scroll"):
+                await asyncio.sleep(self.wait_before_scroll)
+            await self.generate_screenshot()
+            with timed_phase("eco_index.scroll"):
+                await self.page.keyboard.press("ArrowDown")
+                await self.page.evaluate(
+                    "window.scrollTo({ top: document.body.scrollHeight, behavior: 'smooth' })"
+                )
+            with timed_phase("eco_index.wait_after_scroll"):
+                await asyncio.sleep(self.wait_after_scroll)
+            with timed_phase("eco_index.nodes_count"):
+                total_nodes = await self.get_nodes_count()
+            await self.on_page_measured()
+            await self.page.close()
+        finally:
+            # Closing the context also flushes the HAR file
+            with timed_phase("eco_index.page_teardown"):
+                await context.close()
+
+        return total_nodes
+
+    def get_context_options(self) -> dict:
+        return {
+            "record_har_path": self.har_temp_file_path,
+            "screen": self.window_size.model_dump(),
+            "ignore_https_errors": True,
+        }
+
+    async def on_page_measured(self) -> None:
+        """Hook for subclasses, called while the measured page is still open."""
+
     async def generate_screenshot(self) -> None:
-        if self.screenshot and self.screenshot.folder and self.screenshot.id:
-            await self.page.screenshot(path=self.screenshot.get_png())
-            await convert_screenshot_to_webp(self.screenshot)
-            await set_screenshot_rights(
-                screenshot=self.screenshot,
-                uid=self.screenshot_uid,
-                gid=self.screenshot_gid,
+        to_file = bool(
+            self.screenshot and self.screenshot.folder and self.screenshot.id
+        )
+        if not to_file and not self.keep_screenshot:
+            return
+
+        # Captured in memory as a JPEG, cheaper to decode than a PNG, and
+        # converted once to WebP, written to the screenshot file or kept
+        with timed_phase("eco_index.screenshot"):
+            data = await self.page.screenshot(
+                type="jpeg", quality=SCREENSHOT_JPEG_QUALITY
             )
+        with timed_phase("eco_index.webp_conversion"):
+            if not to_file:
+                self.screenshot_webp = await get_screenshot_webp(data)
+                return
+            await save_screenshot_as_webp(data, self.screenshot)
+        await set_screenshot_rights(
+            screenshot=self.screenshot,
+            uid=self.screenshot_uid,
+            gid=self.screenshot_gid,
+        )
 
     async def get_requests_from_har_file(self):
         with open(self.har_temp_file_path, "r", encoding="utf-8") as f:
             trace = json.load(f)
-            aggregation = self.all_requests.aggregation.model_dump()
-
-            for entry in trace["log"]["entries"]:
-                url = entry["request"]["url"]
-                mime_type = entry["response"]["content"]["mimeType"]
-                category = await MimetypeAggregation.get_category_of_resource(mime_type)
-                aggregation[category]["total_count"] += 1
-                size = self.get_request_size(entry)
-                aggregation[category]["total_size"] += size
-                self.all_requests.total_count += 1
-                self.all_requests.total_size += size
-                self.all_requests.items.append(
-                    RequestItem(
-                        url=url,
-                        mime_type=mime_type,
-                        status=entry["response"]["status"],
-                        size=size,
-                        category=category,
-                    )
-                )
-            self.all_requests.aggregation = MimetypeAggregation(**aggregation)
-        os.remove(self.har_temp_file_path)
+
+        entries = trace["log"]["entries"]
+        if self.late_requests:
+            # The late requests of an url are its last entries
+            late = self.late_requests.copy()
+            kept = []
+            for entry in reversed(entries):
+                if late[entry["request"]["url"]] > 0:
+                    late[entry["request"]["url"]] -= 1
+                else:
+                    kept.append(entry)
+            entries = kept[::-1]
+
+        for entry in entries:
+            url = entry["request"]["url"]
+            mime_type = entry["response"]["content"]["mimeType"]
+            size = self.get_request_size(entry)
+            if self.asset_cache_session is not None:
+                size = self.asset_cache_session.get_transfer_size(url, size)
+            self.all_requests.add(
+                url=url,
+                mime_type=mime_type,
+                category=get_resource_category(mime_type, url),
+                status=entry["response"]["status"],
+                size=size,
+            )
+        if self.asset_cache_session is not None:
+            await self.asset_cache_session.store_new_assets()
+
+    def remove_har_file(self) -> None:
+        if os.path.exists(self.har_temp_file_path):
+            os.remove(self.har_temp_file_path)
 
     async def get_nodes_count(self) -> int:
         nodes = await self.page.locator("*").all()
@@ -166,8 +265,7 @@ class EcoindexScraper:
                 {
                     "mimetype": content_type,
                     "message": (
-                        "This resource is not "
-                        "a standard page with mimeType 'text/html'"
+                        "This resource is not a standard page with mimeType 'text/html'"
                     ),
                 }
             )
@@ -1,19 +1,81 @@
+import asyncio
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO
 
 from PIL import Image
 
 from app.core.eco_index.schemas import ScreenShot
 
+# Quality of the in memory capture, re-encoded in WebP afterwards
+SCREENSHOT_JPEG_QUALITY = 90
 
-async def convert_screenshot_to_webp(screenshot: ScreenShot) -> None:
-    image = Image.open(rf"{screenshot.get_png()}")
-    width, height = image.size
+# WebP encoder effort (0 fastest - 6 smallest): 2 is about twice as fast as the
+# default 4 for files a few percent bigger
+WEBP_METHOD = 2
+
+# Pillow releases the GIL while decoding, resizing and encoding, so threads are
+# enough to take the conversions off the event loop and run them in parallel
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="screenshot"
+        )
+
+    return _executor
+
+
+def get_webp_size(width: int, height: int) -> tuple[int, int]:
     ratio = 800 / height if width > height else 600 / width
 
-    image.convert("RGB").resize(size=(int(width * ratio), int(height * ratio))).save(
-        rf"{screenshot.get_webp()}",
-        format="webp",
+    return int(width * ratio), int(height * ratio)
+
+
+def encode_to_webp(image: Image.Image, path: str | IO[bytes]) -> None:
+    """Resize an image to the screenshot size and write it as WebP."""
+    size = get_webp_size(*image.size)
+    image.convert("RGB").resize(size=size, resample=Image.Resampling.BILINEAR).save(
+        path, format="webp", method=WEBP_METHOD
     )
+
+
+async def save_screenshot_as_webp(data: bytes, screenshot: ScreenShot) -> None:
+    """Convert a captured screenshot in memory and write it once, as WebP."""
+
+    def convert() -> None:
+        with Image.open(io.BytesIO(data)) as image:
+            encode_to_webp(image, screenshot.get_webp())
+
+    await asyncio.get_running_loop().run_in_executor(_get_executor(), convert)
+
+
+async def get_screenshot_webp(data: bytes) -> bytes:
+    """Convert a captured screenshot in memory to WebP bytes, without any file."""
+
+    def convert() -> bytes:
+        buffer = io.BytesIO()
+        with Image.open(io.BytesIO(data)) as image:
+            encode_to_webp(image, buffer)
+
+        return buffer.getvalue()
+
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), convert)
+
+
+async def convert_screenshot_to_webp(screenshot: ScreenShot) -> None:
+    """
+    Convert a PNG screenshot file to WebP with the previous settings (default
+    resampling and encoder effort), kept as the baseline of the benchmarks.
+    """
+    with Image.open(rf"{screenshot.get_png()}") as image:
+        image.convert("RGB").resize(size=get_webp_size(*image.size)).save(
+            rf"{screenshot.get_webp()}", format="webp"
+        )
     os.unlink(screenshot.get_png())
 
 
@@ -3,6 +3,7 @@ import json
 from dataclasses import dataclass
 
 import pkg_resources
+from playwright.async_api import BrowserContext as AsyncBrowserContext
 from playwright.async_api import Page as AsyncPage
 from playwright.sync_api import Page as SyncPage
 
@@ -135,13 +136,41 @@ class StealthConfig:
             yield SCRIPTS["webgl_vendor"]
 
 
+# Separator between scripts of a bundle: some scripts do not end with a semicolon
+# and the next one may start with a parenthesis.
+BUNDLE_SEPARATOR = "\n;\n"
+
+_BUNDLES: dict[tuple[type, str], str] = {}
+
+
+def get_stealth_bundle(config: StealthConfig = None) -> str:
+    """
+    Concatenate the enabled scripts of a config into a single init script.
+
+    Bundles are memoized per config value, so the scripts are only joined once.
+    """
+    config = config or StealthConfig()
+    key = (type(config), repr(config))
+
+    bundle = _BUNDLES.get(key)
+    if bundle is None:
+        bundle = _BUNDLES[key] = BUNDLE_SEPARATOR.join(config.enabled_scripts)
+
+    return bundle
+
+
 def stealth_sync(page: SyncPage, config: StealthConfig = None):
     """teaches synchronous playwright Page to be stealthy like a ninja!"""
-    for script in (config or StealthConfig()).enabled_scripts:
-        page.add_init_script(script)
+    page.add_init_script(get_stealth_bundle(config))
 
 
 async def stealth_async(page: AsyncPage, config: StealthConfig = None):
     """teaches asynchronous playwright Page to be stealthy like a ninja!"""
-    for script in (config or StealthConfig()).enabled_scripts:
-        await page.add_init_script(script)
+    await page.add_init_script(get_stealth_bundle(config))
+
+
+async def stealth_context_async(
+    context: AsyncBrowserContext, config: StealthConfig = None
+):
+    """teaches every page of an asynchronous playwright BrowserContext at once"""
+    await context.add_init_script(get_stealth_bundle(config))
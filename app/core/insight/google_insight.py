@@ -11,6 +11,7 @@ from app.core.insight.schemas import (
     Strategy,
 )
 from app.core.insight.tools import endpoint, get_insight_or_raise
+from app.core.instrumentation.timings import timed_phase
 from app.core.settings import SETTINGS
 
 
@@ -45,7 +46,8 @@ class Insight(ABC):
         )
 
         try:
-            response = requests.get(api_url)
+            with timed_phase("insight.api_call"):
+                response = requests.get(api_url)
         except requests.exceptions.ConnectionError as e:
             raise ConnectionError(
                 "Connection fail, check your network permissions"
@@ -54,7 +56,8 @@ class Insight(ABC):
         if response.status_code != 200:
             raise GoogleInsightError(f"Erreur {response.status_code}: {response.text}")
 
-        return response.json()
+        with timed_phase("insight.json_parsing"):
+            return response.json()
 
     @cached_property
     def _light_result(self) -> dict:
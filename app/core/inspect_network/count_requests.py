@@ -1,11 +1,15 @@
+from playwright.async_api import Browser
 from playwright.sync_api import sync_playwright
 
+from app.core.browser.profiles import DEFAULT_LAUNCH_PROFILE, launch_sync_browser
 from app.core.inspect_network.schemas import NetworkRequest
+from app.core.instrumentation.timings import timed_phase
 
 
 class InspectNetWork:
-    def __init__(self, url: str) -> None:
+    def __init__(self, url: str, launch_profile: str = DEFAULT_LAUNCH_PROFILE) -> None:
         self.url = url
+        self.launch_profile = launch_profile
         self._total_requests: int = 0
         self._js_requests: int = 0
         self._css_requests: int = 0
@@ -16,17 +20,45 @@ class InspectNetWork:
             return
 
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context()
-            page = context.new_page()
+            with timed_phase("network.browser_launch"):
+                browser = launch_sync_browser(p, self.launch_profile)
+            with timed_phase("network.page_setup"):
+                context = browser.new_context()
+                page = context.new_page()
 
             page.on("request", self._handle_request)
 
-            page.goto(self.url)
+            with timed_phase("network.goto"):
+                page.goto(self.url)
 
-            page.wait_for_load_state("networkidle")
+            with timed_phase("network.network_idle"):
+                page.wait_for_load_state("networkidle")
 
-            browser.close()
+            with timed_phase("network.browser_close"):
+                browser.close()
+
+        self._is_analysed = True
+
+    async def _analyse_with_browser(self, browser: Browser) -> None:
+        if self._is_analysed is True:
+            return
+
+        with timed_phase("network.page_setup"):
+            context = await browser.new_context()
+        try:
+            with timed_phase("network.page_setup"):
+                page = await context.new_page()
+
+            page.on("request", self._handle_request)
+
+            with timed_phase("network.goto"):
+                await page.goto(self.url)
+
+            with timed_phase("network.network_idle"):
+                await page.wait_for_load_state("networkidle")
+        finally:
+            with timed_phase("network.page_teardown"):
+                await context.close()
 
         self._is_analysed = True
 
@@ -34,6 +66,16 @@ class InspectNetWork:
         if self._is_analysed is False:
             self._analyse()
 
+        return self._get_network_request()
+
+    async def get_result_with_browser(self, browser: Browser) -> NetworkRequest:
+        """Same as get_result, on an already launched async browser."""
+        if self._is_analysed is False:
+            await self._analyse_with_browser(browser)
+
+        return self._get_network_request()
+
+    def _get_network_request(self) -> NetworkRequest:
         return NetworkRequest(
             total=self._total_requests,
             js=self._js_requests,
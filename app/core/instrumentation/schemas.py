@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+
+
+class PhaseStatistics(BaseModel):
+    """
+    Attributes
+    ----------
+    count : int
+        Number of analyses which went through the phase
+    total : float
+        Unit : s
+    p50 : float
+        Unit : s
+    p95 : float
+        Unit : s
+    p99 : float
+        Unit : s
+    max : float
+        Unit : s
+    """
+
+    count: int
+    total: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
@@ -0,0 +1,134 @@
+"""
+Per phase timing of the analyses.
+
+An analysis run inside `collect_timings()` gets the duration of each of its
+`timed_phase(...)` blocks recorded, even across threads started with
+asyncio.to_thread, since the collector travels in a context variable.
+"""
+
+import json
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from app.core.instrumentation.schemas import PhaseStatistics
+from app.core.instrumentation.tracing import span
+from app.core.statistics import percentile
+
+PROMETHEUS_METRIC_NAME = "ecodesign_phase_duration_seconds"
+
+
+class PhaseTimings:
+    """Durations of the phases of one analysis. Unit : s"""
+
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = {}
+
+    def add(self, phase: str, duration: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0) + duration
+
+
+_current_timings: ContextVar[PhaseTimings | None] = ContextVar(
+    "current_timings", default=None
+)
+
+
+@contextmanager
+def collect_timings() -> Iterator[PhaseTimings]:
+    """Collect the phases timed inside the block."""
+    timings = PhaseTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed_phase(phase: str) -> Iterator[None]:
+    """
+    Time the block as `phase` of the current analysis, if collected, and trace
+    it as a span, if traced.
+    """
+    timings = _current_timings.get()
+    start = time.perf_counter()
+    try:
+        with span(phase, category="phase"):
+            yield
+    finally:
+        if timings is not None:
+            timings.add(phase, time.perf_counter() - start)
+
+
+class TimingsAggregator:
+    """Aggregate the phase timings of a batch into percentiles."""
+
+    def __init__(self) -> None:
+        self.durations: dict[str, list[float]] = {}
+
+    def add(self, durations: dict[str, float]) -> None:
+        for phase, duration in durations.items():
+            self.durations.setdefault(phase, []).append(duration)
+
+    def get_statistics(self) -> dict[str, PhaseStatistics]:
+        return {
+            phase: PhaseStatistics(
+                count=len(values),
+                total=sum(values),
+                p50=percentile(values, 50),
+                p95=percentile(values, 95),
+                p99=percentile(values, 99),
+                max=max(values),
+            )
+            for phase, values in sorted(self.durations.items())
+        }
+
+    def to_json(self) -> str:
+        statistics = {
+            phase: phase_statistics.model_dump()
+            for phase, phase_statistics in self.get_statistics().items()
+        }
+
+        return json.dumps(statistics, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Render the statistics as a Prometheus summary, in text format."""
+        lines = [
+            f"# HELP {PROMETHEUS_METRIC_NAME} Duration of the analyses phases.",
+            f"# TYPE {PROMETHEUS_METRIC_NAME} summary",
+        ]
+        for phase, statistics in self.get_statistics().items():
+            for quantile, value in (
+                ("0.5", statistics.p50),
+                ("0.95", statistics.p95),
+                ("0.99", statistics.p99),
+            ):
+                lines.append(
+                    f'{PROMETHEUS_METRIC_NAME}{{phase="{phase}",quantile="{quantile}"}}'
+                    f" {value}"
+                )
+            lines.append(
+                f'{PROMETHEUS_METRIC_NAME}_sum{{phase="{phase}"}} {statistics.total}'
+            )
+            lines.append(
+                f'{PROMETHEUS_METRIC_NAME}_count{{phase="{phase}"}} {statistics.count}'
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: Path | str) -> None:
+        """
+        Write the statistics to path, as a Prometheus textfile if it ends with
+        .prom, as JSON otherwise.
+
+        The file is replaced atomically, so a collector never reads it half written.
+        """
+        path = Path(path)
+        content = self.to_prometheus() if path.suffix == ".prom" else self.to_json()
+
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_text(content, encoding="utf-8")
+        os.replace(temp_path, path)
@@ -0,0 +1,176 @@
+"""
+Optional tracing of the analyses, exported in the Chrome trace event format.
+
+Inside `tracing(path)`, every `span(...)` block (and every `timed_phase`) is
+written to path as a complete event, viewable offline in chrome://tracing or
+https://ui.perfetto.dev. Outside of it, spans cost nothing but a context
+variable lookup.
+
+Concurrent analyses are laid out on lanes (the "threads" of the viewer): a span
+opened with `own_lane=True` takes a free lane for itself and its children, lane 0
+holding the run and the event loop stalls.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import TextIO
+
+PID = 1
+
+MAIN_LANE = 0
+
+
+class Tracer:
+    """Stream trace events to a Chrome trace JSON file."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._file: TextIO | None = None
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._lanes_count = 0
+        self._free_lanes: list[int] = []
+        self._is_first_event = True
+
+    def open(self) -> None:
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write("[\n")
+        self._name_lane(MAIN_LANE, "run")
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+
+        with self._lock:
+            self._file.write("\n]\n")
+            self._file.close()
+            self._file = None
+
+    def now(self) -> float:
+        """Time since the tracer creation. Unit : µs"""
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def emit(self, event: dict) -> None:
+        line = json.dumps({"pid": PID, **event}, default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            if not self._is_first_event:
+                self._file.write(",\n")
+            self._file.write(line)
+            self._is_first_event = False
+
+    def acquire_lane(self) -> int:
+        with self._lock:
+            if self._free_lanes:
+                return self._free_lanes.pop()
+            self._lanes_count += 1
+            lane = self._lanes_count
+
+        self._name_lane(lane, f"slot {lane}")
+        return lane
+
+    def release_lane(self, lane: int) -> None:
+        with self._lock:
+            self._free_lanes.append(lane)
+
+    def _name_lane(self, lane: int, name: str) -> None:
+        self.emit(
+            {"ph": "M", "name": "thread_name", "tid": lane, "args": {"name": name}}
+        )
+
+
+_current_tracer: ContextVar[Tracer | None] = ContextVar("current_tracer", default=None)
+
+_current_lane: ContextVar[int] = ContextVar("current_lane", default=MAIN_LANE)
+
+
+@contextmanager
+def tracing(path: Path | str) -> Iterator[Tracer]:
+    """Trace the spans opened inside the block to path."""
+    tracer = Tracer(path)
+    tracer.open()
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+        tracer.close()
+
+
+@contextmanager
+def span(
+    name: str, *, category: str = "analysis", own_lane: bool = False, **args
+) -> Iterator[dict]:
+    """
+    Trace the block as a span named name.
+
+    Yields the args of the span, which the block may complete (status, bytes...).
+    An exception escaping the block marks the span in error.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield args
+        return
+
+    lane_token = None
+    if own_lane:
+        lane = tracer.acquire_lane()
+        lane_token = _current_lane.set(lane)
+
+    start = tracer.now()
+    try:
+        yield args
+    except BaseException as e:
+        args.setdefault("status", "error")
+        args.setdefault("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        tracer.emit(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": tracer.now() - start,
+                "tid": _current_lane.get(),
+                "args": args,
+            }
+        )
+        if lane_token is not None:
+            _current_lane.reset(lane_token)
+            tracer.release_lane(lane)
+
+
+async def watch_event_loop(interval: float = 0.05, threshold: float = 0.02) -> None:
+    """
+    Trace the event loop stalls longer than threshold seconds, until cancelled.
+
+    The loop is stalled when a sleep of interval seconds wakes up late.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return
+
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = time.perf_counter() - start - interval
+        if lag > threshold:
+            tracer.emit(
+                {
+                    "name": "event_loop_stall",
+                    "cat": "loop",
+                    "ph": "X",
+                    "ts": tracer.now() - lag * 1_000_000,
+                    "dur": lag * 1_000_000,
+                    "tid": MAIN_LANE,
+                    "args": {"lag_ms": round(lag * 1000, 1)},
+                }
+            )
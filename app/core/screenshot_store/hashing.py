@@ -0,0 +1,65 @@
+"""
+Perceptual hash of the screenshots, robust to the small differences between two
+captures of a same page (encoding artifacts, a blinking cursor...)
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from PIL import Image
+
+HASH_SIZE = 8
+
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+BAND_BITS = 16
+
+BANDS_COUNT = HASH_BITS // BAND_BITS
+
+
+def get_perceptual_hash(image: Image.Image) -> int:
+    """
+    Compute the 64 bits difference hash (dHash) of an image.
+
+    The image is reduced to 9x8 gray pixels, each bit telling whether a pixel is
+    brighter than its right neighbour.
+    """
+    small = image.convert("L").resize(
+        (HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR
+    )
+    pixels = small.tobytes()
+
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            left, right = pixels[offset + col], pixels[offset + col + 1]
+            value = (value << 1) | (left > right)
+
+    return value
+
+
+def get_distance(first: int, second: int) -> int:
+    """Hamming distance between two hashes: the number of differing bits."""
+    return (first ^ second).bit_count()
+
+
+def get_bands(value: int) -> list[int]:
+    """
+    Split a hash in 16 bits bands.
+
+    Two hashes at a distance lower than the bands count share at least one band,
+    so near duplicates are found by exact lookups on the bands.
+    """
+    mask = (1 << BAND_BITS) - 1
+
+    return [(value >> (i * BAND_BITS)) & mask for i in range(BANDS_COUNT)]
+
+
+def to_signed(value: int) -> int:
+    """Map a 64 bits hash to the signed integers stored by sqlite."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << HASH_BITS) if value < 0 else value
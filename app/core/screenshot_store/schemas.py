@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class StoredScreenshot(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Url of the captured page
+    date : datetime
+        Date of the capture
+    blob_id : str
+        Identifier of the stored image, shared by the duplicate captures
+    phash : int
+        Perceptual hash of the capture
+    is_duplicate : bool
+        Whether the capture reused an identical or near identical stored image
+    """
+
+    url: str
+    date: datetime
+    blob_id: str
+    phash: int
+    is_duplicate: bool = False
+
+
+class VisualChange(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Url of the page
+    previous_date, date : datetime
+        Dates of the two last captures of the page
+    previous_blob_id, blob_id : str
+        Images of the two last captures
+    distance : int
+        Number of differing bits of their perceptual hashes, 0 to 64
+    """
+
+    url: str
+    previous_date: datetime
+    date: datetime
+    previous_blob_id: str
+    blob_id: str
+    distance: int
@@ -0,0 +1,227 @@
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from app.core.screenshot_store.hashing import (
+    BANDS_COUNT,
+    get_bands,
+    get_distance,
+    get_perceptual_hash,
+    to_signed,
+    to_unsigned,
+)
+from app.core.screenshot_store.schemas import StoredScreenshot, VisualChange
+
+INDEX_NAME = "index.sqlite"
+
+BLOBS_FOLDER = "blobs"
+
+BLOB_EXTENSION = ".webp"
+
+# Two captures closer than this are stored once. Must stay below BANDS_COUNT for
+# the bands lookup to find every near duplicate.
+DUPLICATE_DISTANCE = 3
+
+# Two consecutive captures of a page further than this are a visual change
+CHANGE_DISTANCE = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    id TEXT PRIMARY KEY,
+    phash INTEGER NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    blob_id TEXT NOT NULL,
+    PRIMARY KEY (band, value, blob_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS captures (
+    url TEXT NOT NULL,
+    date TEXT NOT NULL,
+    blob_id TEXT NOT NULL,
+    phash INTEGER NOT NULL,
+    PRIMARY KEY (url, date)
+) WITHOUT ROWID;
+"""
+
+
+class ScreenshotStore:
+    """
+    Content addressed store of the screenshots of the analysed pages.
+
+    Images are stored once per content (sha256), and a capture at most
+    `duplicate_distance` bits of perceptual hash from a stored image reuses it.
+    An sqlite index maps each (url, date) capture to its image.
+    """
+
+    def __init__(
+        self, folder: Path | str, duplicate_distance: int = DUPLICATE_DISTANCE
+    ) -> None:
+        if not 0 <= duplicate_distance < BANDS_COUNT:
+            raise ValueError(
+                f"duplicate_distance must be between 0 and {BANDS_COUNT - 1}"
+            )
+
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.duplicate_distance = duplicate_distance
+        self._lock = threading.Lock()
+        # Captures are added from worker threads, one at a time under the lock
+        self._db = sqlite3.connect(self.folder / INDEX_NAME, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "ScreenshotStore":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def get_blob_path(self, blob_id: str) -> Path:
+        return self.folder / BLOBS_FOLDER / blob_id[:2] / f"{blob_id}{BLOB_EXTENSION}"
+
+    def add(
+        self, url: str, data: bytes, date: datetime | None = None
+    ) -> StoredScreenshot:
+        """Store a capture of url, given as encoded image bytes."""
+        date = date or datetime.now()
+        with Image.open(io.BytesIO(data)) as image:
+            phash = get_perceptual_hash(image)
+        blob_id = hashlib.sha256(data).hexdigest()
+
+        with self._lock, self._db:
+            existing_id = self._find_blob(blob_id, phash)
+            if existing_id is None:
+                self._write_blob(blob_id, data)
+                self._db.execute(
+                    "INSERT INTO blobs VALUES (?, ?, ?)",
+                    (blob_id, to_signed(phash), len(data)),
+                )
+                self._db.executemany(
+                    "INSERT INTO bands VALUES (?, ?, ?)",
+                    [(i, band, blob_id) for i, band in enumerate(get_bands(phash))],
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO captures VALUES (?, ?, ?, ?)",
+                (url, date.isoformat(), existing_id or blob_id, to_signed(phash)),
+            )
+
+        return StoredScreenshot(
+            url=url,
+            date=date,
+            blob_id=existing_id or blob_id,
+            phash=phash,
+            is_duplicate=existing_id is not None,
+        )
+
+    def get_history(self, url: str) -> list[StoredScreenshot]:
+        """Captures of url, oldest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, date, blob_id, phash FROM captures"
+                " WHERE url = ? ORDER BY date",
+                (url,),
+            ).fetchall()
+
+        return [self._to_screenshot(row) for row in rows]
+
+    def get_visual_changes(
+        self, urls: Iterable[str] | None = None, min_distance: int = CHANGE_DISTANCE
+    ) -> Iterator[VisualChange]:
+        """
+        Yield the pages whose last capture differs from the previous one by at
+        least min_distance bits, among urls or among all the pages.
+
+        The two last captures of every page are read in a single ordered scan of
+        the index, urls being joined from a temporary table.
+        """
+        query = """
+            SELECT url, date, blob_id, phash FROM (
+                SELECT url, date, blob_id, phash, ROW_NUMBER() OVER (
+                    PARTITION BY url ORDER BY date DESC
+                ) AS rank
+                FROM captures {filter}
+            )
+            WHERE rank <= 2
+            ORDER BY url, rank
+        """
+        with self._lock:
+            if urls is None:
+                rows = self._db.execute(query.format(filter="")).fetchall()
+            else:
+                self._db.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS wanted (url TEXT PRIMARY KEY)"
+                )
+                self._db.execute("DELETE FROM wanted")
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO wanted VALUES (?)", ((url,) for url in urls)
+                )
+                rows = self._db.execute(
+                    query.format(filter="WHERE url IN (SELECT url FROM wanted)")
+                ).fetchall()
+
+        for last, previous in zip(rows, rows[1:], strict=False):
+            if last[0] != previous[0]:
+                continue
+            distance = get_distance(to_unsigned(last[3]), to_unsigned(previous[3]))
+            if distance >= min_distance:
+                yield VisualChange(
+                    url=last[0],
+                    previous_date=datetime.fromisoformat(previous[1]),
+                    date=datetime.fromisoformat(last[1]),
+                    previous_blob_id=previous[2],
+                    blob_id=last[2],
+                    distance=distance,
+                )
+
+    def _find_blob(self, blob_id: str, phash: int) -> str | None:
+        """Identical blob, or nearest stored blob within the duplicate distance."""
+        if self._db.execute("SELECT 1 FROM blobs WHERE id = ?", (blob_id,)).fetchone():
+            return blob_id
+
+        condition = " OR ".join(["(band = ? AND value = ?)"] * BANDS_COUNT)
+        params = [param for band in enumerate(get_bands(phash)) for param in band]
+        candidates = self._db.execute(
+            "SELECT DISTINCT blobs.id, blobs.phash FROM bands"
+            " JOIN blobs ON blobs.id = bands.blob_id"
+            f" WHERE {condition}",
+            params,
+        ).fetchall()
+
+        nearest = min(
+            ((get_distance(phash, to_unsigned(value)), id) for id, value in candidates),
+            default=None,
+        )
+        if nearest is None or nearest[0] > self.duplicate_distance:
+            return None
+
+        return nearest[1]
+
+    def _write_blob(self, blob_id: str, data: bytes) -> None:
+        path = self.get_blob_path(blob_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _to_screenshot(row: tuple) -> StoredScreenshot:
+        url, date, blob_id, phash = row
+
+        return StoredScreenshot(
+            url=url,
+            date=datetime.fromisoformat(date),
+            blob_id=blob_id,
+            phash=to_unsigned(phash),
+        )
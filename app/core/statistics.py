@@ -0,0 +1,179 @@
+"""
+Small statistics helpers shared by the analyses reports
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import math
+from collections.abc import Iterable, Sequence
+
+# Values buffered by a QuantileSketch before being merged, per unit of compression
+BUFFER_FACTOR = 5
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Compute the q-th percentile of values, with linear interpolation.
+
+    Parameters
+    ----------
+    values : Sequence[float]
+        Values, not necessarily sorted.
+    q : float
+        Percentile to compute, between 0 and 100.
+
+    Returns
+    -------
+    float
+        The percentile, 0 if values is empty.
+    """
+    if not 0 <= q <= 100:
+        raise ValueError("q must be between 0 and 100")
+
+    if not values:
+        return 0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class QuantileSketch:
+    """
+    Mergeable summary of the distribution of a stream of values, answering
+    quantiles in bounded memory (a merging t-digest).
+
+    Values are buffered, then merged into centroids (mean, weight): about
+    `compression` of them, small near the extremes and large in the middle, so
+    that tail quantiles stay accurate. Two sketches merge by merging their
+    centroids, in any order.
+    """
+
+    def __init__(self, compression: int = 100) -> None:
+        if compression < 10:
+            raise ValueError("compression must be at least 10")
+
+        self.compression = compression
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means: list[float] = []
+        self._weights: list[float] = []
+        self._buffer: list[float] = []
+
+    def add(self, value: float) -> None:
+        self._buffer.append(value)
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= BUFFER_FACTOR * self.compression:
+            self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        other._compress()
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(zip(other._means, other._weights, strict=True))
+
+    def get_centroids(self) -> list[tuple[float, float]]:
+        """(mean, weight) of the centroids, to store or send the sketch."""
+        self._compress()
+
+        return list(zip(self._means, self._weights, strict=True))
+
+    @classmethod
+    def from_centroids(
+        cls,
+        centroids: list[tuple[float, float]],
+        count: int,
+        total: float,
+        min_value: float,
+        max_value: float,
+        compression: int = 100,
+    ) -> "QuantileSketch":
+        sketch = cls(compression)
+        sketch.count, sketch.total = count, total
+        sketch.min, sketch.max = min_value, max_value
+        sketch._means = [mean for mean, _ in centroids]
+        sketch._weights = [weight for _, weight in centroids]
+
+        return sketch
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate q-quantile of the values, q between 0 and 1, interpolated
+        between the centers of the centroids at the rank q * count, a centroid of
+        weight w spanning w values. percentile uses the rank (n - 1) * q instead:
+        for 1 to 10, the 0.9-quantile is 9.5 here and the 90th percentile 9.1.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+
+        self._compress()
+        if not self._means:
+            return 0
+
+        target = q * self.count
+        # Cumulated weight at the center of the current centroid
+        center = self._weights[0] / 2
+        if target <= center:
+            return self.min + (self._means[0] - self.min) * target / center
+
+        for i in range(1, len(self._means)):
+            next_center = center + (self._weights[i - 1] + self._weights[i]) / 2
+            if target <= next_center:
+                ratio = (target - center) / (next_center - center)
+                return (
+                    self._means[i - 1] + (self._means[i] - self._means[i - 1]) * ratio
+                )
+            center = next_center
+
+        last_half = self._weights[-1] / 2
+        ratio = (target - center) / last_half
+
+        return self._means[-1] + (self.max - self._means[-1]) * ratio
+
+    def _compress(self, centroids: Iterable[tuple[float, float]] = ()) -> None:
+        """Merge the buffered values and centroids into the centroids."""
+        merged = [*zip(self._means, self._weights, strict=True), *centroids]
+        if not self._buffer and len(merged) == len(self._means):
+            return
+        merged.extend((value, 1.0) for value in self._buffer)
+        merged.sort()
+        self._buffer = []
+
+        total = sum(weight for _, weight in merged)
+        means, weights = [], []
+        mean, weight = merged[0]
+        done = 0.0
+        k_lower = self._get_k(0)
+        for next_mean, next_weight in merged[1:]:
+            if self._get_k((done + weight + next_weight) / total) - k_lower <= 1:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+                continue
+            means.append(mean)
+            weights.append(weight)
+            done += weight
+            k_lower = self._get_k(done / total)
+            mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+
+        self._means, self._weights = means, weights
+
+    def _get_k(self, q: float) -> float:
+        """Scale function: centroids spanning one unit of k at most."""
+        return self.compression / (2 * math.pi) * math.asin(2 * min(q, 1) - 1)
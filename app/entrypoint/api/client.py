@@ -0,0 +1,52 @@
+"""
+Thin client of the local analysis service.
+"""
+
+import requests
+
+from app.adapter.exception.app_exception import AnalysisServiceError
+from app.core.constants import SERVICE_HOST, SERVICE_PORT
+
+DEFAULT_SERVER_URL = f"http://{SERVICE_HOST}:{SERVICE_PORT}"
+
+
+def submit_job(
+    url: str,
+    kind: str = "combined",
+    strategy: str = "mobile",
+    *,
+    server_url: str = DEFAULT_SERVER_URL,
+    wait: bool = True,
+) -> dict:
+    response = _call(
+        "post",
+        f"{server_url}/jobs",
+        params={"wait": str(wait).lower()},
+        json={"url": url, "kind": kind, "strategy": strategy},
+    )
+
+    return response.json()
+
+
+def get_job(
+    job_id: str, *, server_url: str = DEFAULT_SERVER_URL, wait: bool = False
+) -> dict:
+    response = _call(
+        "get", f"{server_url}/jobs/{job_id}", params={"wait": str(wait).lower()}
+    )
+
+    return response.json()
+
+
+def _call(method: str, url: str, **kwargs) -> requests.Response:
+    try:
+        response = requests.request(method, url, **kwargs)
+    except requests.exceptions.ConnectionError as e:
+        raise ConnectionError(
+            f"Service d'analyse injoignable sur {url}, lancez `serve` d'abord"
+        ) from e
+
+    if response.status_code not in (200, 202):
+        raise AnalysisServiceError(f"Erreur {response.status_code}: {response.text}")
+
+    return response
@@ -0,0 +1,177 @@
+"""
+Local HTTP API keeping warm browsers to run analysis jobs.
+
+Routes
+------
+GET  /health          -> {"status": "ok", "pending": int, "browsers": PoolStats}
+POST /jobs            -> body JobRequest, `?wait=false` to get the job id at once
+GET  /jobs/<job_id>   -> the Job, `?wait=true` to block until it is finished
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import ValidationError
+
+from app.adapter.exception.app_exception import JobNotFoundError, ServiceBusyError
+from app.core.browser.pool import BrowserPool
+from app.core.browser.profiles import DEFAULT_LAUNCH_PROFILE
+from app.core.browser.schemas import RecyclePolicy
+from app.core.constants import LOGGER_NAME, SERVICE_HOST, SERVICE_PORT
+from app.usecase.analysis_service.schemas import Job, JobRequest
+from app.usecase.analysis_service.service import AnalysisService
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Maximum time a synchronous request waits for its job. Unit : s
+WAIT_TIMEOUT = 600
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    HTTP server whose handler threads submit jobs to an AnalysisService running
+    on a dedicated event loop thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: AnalysisService) -> None:
+        super().__init__(address, AnalysisRequestHandler)
+        self.service = service
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def start_service(self) -> None:
+        self._loop_thread.start()
+        self.call(self.service.start())
+
+    def stop_service(self) -> None:
+        self.call(self.service.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join()
+
+    def call(self, coroutine, timeout: float | None = None):
+        """Run a coroutine on the service loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    server: AnalysisServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/health":
+            pending = self.server.call(self._pending_count())
+            stats = self.server.call(self._pool_stats())
+            self._send_json(
+                HTTPStatus.OK, {"status": "ok", "pending": pending, "browsers": stats}
+            )
+            return
+
+        if url.path.startswith("/jobs/"):
+            job_id = url.path.removeprefix("/jobs/")
+            wait = query.get("wait", ["false"])[0] == "true"
+            try:
+                job = self._get_job(job_id, wait)
+            except JobNotFoundError as e:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": str(e)})
+                return
+            self._send_job(job)
+            return
+
+        self._send_json(HTTPStatus.NOT_FOUND, {"error": "Route introuvable"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path != "/jobs":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Route introuvable"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = JobRequest.model_validate_json(self.rfile.read(length))
+        except ValidationError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+
+        try:
+            job = self.server.call(self._submit(request))
+        except ServiceBusyError as e:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+            return
+
+        if query.get("wait", ["true"])[0] == "true":
+            job = self._get_job(job.id, wait=True)
+
+        self._send_job(job)
+
+    # The service state is only touched from its own loop thread
+
+    async def _pending_count(self) -> int:
+        return self.server.service.pending_count
+
+    async def _pool_stats(self) -> dict:
+        return self.server.service.pool.stats.model_dump()
+
+    async def _submit(self, request: JobRequest) -> Job:
+        return self.server.service.submit(request)
+
+    async def _get(self, job_id: str) -> Job:
+        return self.server.service.get(job_id)
+
+    def _get_job(self, job_id: str, wait: bool) -> Job:
+        if not wait:
+            return self.server.call(self._get(job_id))
+
+        return self.server.call(self.server.service.wait(job_id, WAIT_TIMEOUT))
+
+    def _send_job(self, job: Job) -> None:
+        status = (
+            HTTPStatus.OK if job.status in ("done", "error") else HTTPStatus.ACCEPTED
+        )
+        self._send_json(status, job.model_dump(mode="json"))
+
+    def _send_json(self, status: HTTPStatus, content: dict) -> None:
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(
+    host: str = SERVICE_HOST,
+    port: int = SERVICE_PORT,
+    browsers: int = 2,
+    max_pending: int = 100,
+    policy: RecyclePolicy | None = None,
+    launch_profile: str = DEFAULT_LAUNCH_PROFILE,
+) -> None:
+    """Start the service and serve until interrupted."""
+    pool = BrowserPool(size=browsers, policy=policy, launch_profile=launch_profile)
+    service = AnalysisService(pool, max_pending=max_pending)
+    server = AnalysisServer((host, port), service)
+    server.start_service()
+    logger.info("Service d'analyse démarré sur http://%s:%s", host, port)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.stop_service()
+        logger.info("Service d'analyse arrêté")
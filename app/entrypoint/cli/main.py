@@ -1,13 +1,40 @@
 import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack, ExitStack
+from pathlib import Path
 
 import rich
 import typer
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from app.core.asset_cache.cache import AssetCache
+from app.core.browser.pool import BrowserPool
+from app.core.browser.profiles import (
+    DEFAULT_LAUNCH_PROFILE,
+    LAUNCH_PROFILES,
+    get_launch_profile,
+)
+from app.core.browser.schemas import RecyclePolicy
+from app.core.change_detection.store import ResultStore
+from app.core.constants import SERVICE_HOST, SERVICE_PORT
+from app.core.discovery.discover import discover_urls
+from app.core.discovery.frontier import UrlFrontier
 from app.core.eco_index.scraper import EcoindexScraper
 from app.core.insight.google_insight import DestopInsight, MobileInsight
 from app.core.insight.schemas import InsightContent
 from app.core.inspect_network.count_requests import InspectNetWork
+from app.core.instrumentation.tracing import span, tracing, watch_event_loop
+from app.core.screenshot_store.store import CHANGE_DISTANCE, ScreenshotStore
+from app.entrypoint.api.client import DEFAULT_SERVER_URL, get_job, submit_job
+from app.entrypoint.api.server import serve as serve_api
+from app.usecase.batch_analysis.analysers import get_analyser, reuse_unchanged
+from app.usecase.batch_analysis.runner import (
+    BatchStats,
+    read_urls,
+    run_frontier_batch,
+)
+from app.usecase.batch_analysis.schemas import AnalysisKind
 from app.usecase.excel_completion.actions import (
     create_excel_from_template,
     open_excel_file,
@@ -16,9 +43,44 @@ from app.usecase.excel_completion.files_infos import (
     TEMPLATE_PATH,
     get_output_path,
 )
+from app.usecase.monitoring.monitor import Monitor
+from app.usecase.monitoring.schemas import MonitorConfig, MonitorRecord
+from app.usecase.run_diff.diff import MIN_CHANGE, diff_runs, read_results
+from app.usecase.sampling.planner import SamplingPlan, run_sampling
+from app.usecase.site_statistics.aggregator import SiteAggregator
 
 app = typer.Typer()
 
+URLS_SOURCE_HELP = "File of urls, one per line, or - for stdin"
+
+PER_HOST_HELP = "Maximum analyses in flight on a same host"
+
+PER_HOST_DELAY_HELP = "Minimum delay between two analyses of a same host (s)"
+
+TIMINGS_HELP = "Export p50/p95/p99 of each phase, to a .prom textfile or a .json"
+
+TRACE_HELP = "Write the spans of the run to a Chrome trace JSON file"
+
+SCREENSHOTS_HELP = "Store a screenshot of each page in this screenshot store folder"
+
+ASSET_CACHE_HELP = "Serve the js, css, fonts and images seen before from this folder"
+
+REUSE_UNCHANGED_HELP = (
+    "Reuse the results stored in this sqlite file for the pages unchanged since"
+    " their last analysis"
+)
+
+LAUNCH_PROFILE_HELP = f"Chromium launch profile: {', '.join(LAUNCH_PROFILES)}"
+
+
+def check_launch_profile(name: str) -> str:
+    try:
+        get_launch_profile(name)
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from None
+
+    return name
+
 
 @app.command()
 def insight(url: str, strategy: str):
@@ -82,5 +144,418 @@ def complete_excel(urls: list[str]):
         open_excel_file(output_path)
 
 
+async def _stream_batch(
+    source: str,
+    kind: AnalysisKind,
+    concurrency: int,
+    per_host: int,
+    per_host_delay: float,
+    timings_path: str | None,
+    trace_path: str | None,
+    strategy: str = "mobile",
+    screenshots_path: str | None = None,
+    asset_cache_path: str | None = None,
+    launch_profile: str = DEFAULT_LAUNCH_PROFILE,
+    results_path: str | None = None,
+) -> None:
+    stats = BatchStats()
+    asset_cache = AssetCache(asset_cache_path) if asset_cache_path else None
+    frontier = UrlFrontier(per_host_concurrency=per_host, per_host_delay=per_host_delay)
+
+    with ExitStack() as stack:
+        # Urls are read as the analyses go, so that stdin may never end
+        feeder = frontier.feed(read_urls(source))
+        stack.callback(feeder.cancel)
+        screenshot_store = None
+        if screenshots_path:
+            screenshot_store = stack.enter_context(ScreenshotStore(screenshots_path))
+        analyser = get_analyser(
+            kind,
+            strategy=strategy,
+            screenshot_store=screenshot_store,
+            asset_cache=asset_cache,
+            launch_profile=launch_profile,
+        )
+        if results_path:
+            result_store = stack.enter_context(ResultStore(results_path))
+            store_kind = f"{kind}_{strategy}" if kind == "insight" else kind
+            analyser = reuse_unchanged(analyser, store_kind, result_store)
+        if trace_path:
+            stack.enter_context(tracing(trace_path))
+            loop_watcher = asyncio.create_task(watch_event_loop())
+            stack.callback(loop_watcher.cancel)
+
+        with span("run", kind=kind, concurrency=concurrency) as span_args:
+            async for item in run_frontier_batch(frontier, analyser, kind, concurrency):
+                stats.add(item)
+                typer.echo(item.model_dump_json())
+            span_args.update(succeeded=stats.succeeded, failed=stats.failed)
+        await feeder
+
+    summary = stats.get_summary()
+    summary.skipped = frontier.duplicates + frontier.invalids
+    typer.echo(summary.model_dump_json(), err=True)
+    if asset_cache is not None:
+        typer.echo(
+            f"Asset cache: {asset_cache.hits} hits, {asset_cache.misses} misses,"
+            f" {asset_cache.saved_bytes} bytes not downloaded",
+            err=True,
+        )
+    if results_path:
+        typer.echo(
+            f"Unchanged pages: {summary.reused} of {summary.total} results reused"
+            f" ({summary.skip_ratio:.0%} of the analyses skipped)",
+            err=True,
+        )
+
+    if timings_path:
+        stats.timings.export(timings_path)
+
+
+@app.command()
+def eco_index_batch(
+    source: str = typer.Argument("-", help=URLS_SOURCE_HELP),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1),
+    per_host: int = typer.Option(2, min=1, help=PER_HOST_HELP),
+    per_host_delay: float = typer.Option(0.5, min=0, help=PER_HOST_DELAY_HELP),
+    timings: str | None = typer.Option(None, help=TIMINGS_HELP),
+    trace: str | None = typer.Option(None, help=TRACE_HELP),
+    screenshots: str | None = typer.Option(None, help=SCREENSHOTS_HELP),
+    asset_cache: str | None = typer.Option(None, help=ASSET_CACHE_HELP),
+    launch_profile: str = typer.Option(
+        DEFAULT_LAUNCH_PROFILE, help=LAUNCH_PROFILE_HELP, callback=check_launch_profile
+    ),
+    results: str | None = typer.Option(
+        None, "--reuse-unchanged", help=REUSE_UNCHANGED_HELP
+    ),
+):
+    asyncio.run(
+        _stream_batch(
+            source,
+            "eco_index",
+            concurrency,
+            per_host,
+            per_host_delay,
+            timings,
+            trace,
+            screenshots_path=screenshots,
+            asset_cache_path=asset_cache,
+            launch_profile=launch_profile,
+            results_path=results,
+        )
+    )
+
+
+@app.command()
+def network_batch(
+    source: str = typer.Argument("-", help=URLS_SOURCE_HELP),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1),
+    per_host: int = typer.Option(2, min=1, help=PER_HOST_HELP),
+    per_host_delay: float = typer.Option(0.5, min=0, help=PER_HOST_DELAY_HELP),
+    timings: str | None = typer.Option(None, help=TIMINGS_HELP),
+    trace: str | None = typer.Option(None, help=TRACE_HELP),
+    launch_profile: str = typer.Option(
+        DEFAULT_LAUNCH_PROFILE, help=LAUNCH_PROFILE_HELP, callback=check_launch_profile
+    ),
+    results: str | None = typer.Option(
+        None, "--reuse-unchanged", help=REUSE_UNCHANGED_HELP
+    ),
+):
+    asyncio.run(
+        _stream_batch(
+            source,
+            "network",
+            concurrency,
+            per_host,
+            per_host_delay,
+            timings,
+            trace,
+            launch_profile=launch_profile,
+            results_path=results,
+        )
+    )
+
+
+@app.command()
+def insight_batch(
+    strategy: str,
+    source: str = typer.Argument("-", help=URLS_SOURCE_HELP),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1),
+    per_host: int = typer.Option(2, min=1, help=PER_HOST_HELP),
+    per_host_delay: float = typer.Option(0.5, min=0, help=PER_HOST_DELAY_HELP),
+    timings: str | None = typer.Option(None, help=TIMINGS_HELP),
+    trace: str | None = typer.Option(None, help=TRACE_HELP),
+    results: str | None = typer.Option(
+        None, "--reuse-unchanged", help=REUSE_UNCHANGED_HELP
+    ),
+):
+    if strategy not in ("desktop", "mobile"):
+        print("Stategy must be desktop or mobile")
+        raise typer.Exit()
+
+    asyncio.run(
+        _stream_batch(
+            source,
+            "insight",
+            concurrency,
+            per_host,
+            per_host_delay,
+            timings,
+            trace,
+            strategy,
+            results_path=results,
+        )
+    )
+
+
+@app.command()
+def visual_changes(
+    folder: str,
+    source: str | None = typer.Argument(None, help=URLS_SOURCE_HELP),
+    min_distance: int = typer.Option(
+        CHANGE_DISTANCE, min=1, max=64, help="Differing bits of perceptual hash"
+    ),
+):
+    urls = read_urls(source) if source else None
+    with ScreenshotStore(folder) as store:
+        for change in store.get_visual_changes(urls, min_distance):
+            typer.echo(change.model_dump_json())
+
+
+@app.command("diff-runs")
+def compare_runs(
+    baseline: str = typer.Argument(..., help="JSONL results of the previous run"),
+    current: str = typer.Argument(..., help="JSONL results of the new run"),
+    top: int = typer.Option(20, min=0, help="Number of worst regressions listed"),
+    min_change: float = typer.Option(
+        MIN_CHANGE, min=0, help="Relative change under which a metric is stable"
+    ),
+):
+    with (
+        open(baseline, encoding="utf-8") as baseline_lines,
+        open(current, encoding="utf-8") as current_lines,
+    ):
+        report = diff_runs(baseline_lines, current_lines, top, min_change)
+
+    typer.echo(report.model_dump_json())
+
+
+def _aggregate_file(path: str) -> dict:
+    aggregator = SiteAggregator()
+    with open(path, encoding="utf-8") as lines:
+        aggregator.add_all((kind, result) for _, kind, result in read_results(lines))
+
+    return aggregator.to_dict()
+
+
+@app.command()
+def site_stats(
+    sources: list[str],
+    workers: int = typer.Option(1, min=1, help="Files aggregated in parallel"),
+    state: str | None = typer.Option(
+        None, help="JSON aggregate of previous results, merged then updated"
+    ),
+):
+    aggregator = SiteAggregator()
+    if state and Path(state).exists():
+        aggregator = SiteAggregator.from_dict(json.loads(Path(state).read_text()))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(_aggregate_file, sources):
+            aggregator.merge(SiteAggregator.from_dict(partial))
+
+    if state:
+        with open(state, "w", encoding="utf-8") as f_out:
+            json.dump(aggregator.to_dict(), f_out)
+
+    typer.echo(aggregator.get_statistics().model_dump_json())
+
+
+@app.command()
+def sample_audit(
+    source: str = typer.Argument("-", help=URLS_SOURCE_HELP),
+    kind: str = typer.Option("eco_index", help="eco_index, network or insight"),
+    strategy: str = typer.Option("mobile", help="Insight strategy"),
+    budget: int = typer.Option(500, min=1, help="Maximum number of pages analysed"),
+    margin: float = typer.Option(
+        2.0, min=0, help="Stop once the main metric is known within ± this margin"
+    ),
+    confidence: float = typer.Option(0.95, min=0.5, max=0.999),
+    round_size: int = typer.Option(50, min=1, help="Pages analysed per round"),
+    seed: int | None = typer.Option(None, help="Seed of the random sample"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1),
+    per_host: int = typer.Option(2, min=1, help=PER_HOST_HELP),
+    per_host_delay: float = typer.Option(0.5, min=0, help=PER_HOST_DELAY_HELP),
+    launch_profile: str = typer.Option(
+        DEFAULT_LAUNCH_PROFILE, help=LAUNCH_PROFILE_HELP, callback=check_launch_profile
+    ),
+):
+    if kind not in ("eco_index", "network", "insight"):
+        raise typer.BadParameter("kind must be eco_index, network or insight")
+    if strategy not in ("desktop", "mobile"):
+        raise typer.BadParameter("strategy must be desktop or mobile")
+
+    plan = SamplingPlan(read_urls(source), kind, seed=seed)
+    analyser = get_analyser(kind, strategy=strategy, launch_profile=launch_profile)
+    estimate = asyncio.run(
+        run_sampling(
+            plan,
+            analyser,
+            budget,
+            margin,
+            round_size=round_size,
+            concurrency=concurrency,
+            per_host=per_host,
+            per_host_delay=per_host_delay,
+            confidence=confidence,
+            on_item=lambda item: typer.echo(item.model_dump_json()),
+        )
+    )
+    typer.echo(estimate.model_dump_json(), err=True)
+
+
+@app.command()
+def discover(
+    root_url: str,
+    sitemap: bool = typer.Option(True, help="Read the sitemaps of the site"),
+    crawl: bool = typer.Option(False, help="Follow the links of the pages"),
+    max_depth: int = typer.Option(2, min=0, help="Crawl depth"),
+    max_urls: int = typer.Option(10000, min=1),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", min=1),
+):
+    urls = discover_urls(
+        root_url,
+        use_sitemap=sitemap,
+        use_crawl=crawl,
+        max_depth=max_depth,
+        max_urls=max_urls,
+        concurrency=concurrency,
+    )
+    for url in urls:
+        typer.echo(url)
+
+
+async def _monitor(
+    config: MonitorConfig,
+    history_path: str | None,
+    concurrency: int,
+    browsers: int,
+    duration: float | None,
+    launch_profile: str,
+) -> None:
+    async with AsyncExitStack() as stack:
+        history = None
+        if history_path:
+            history = stack.enter_context(open(history_path, "a", encoding="utf-8"))
+
+        def on_record(record: MonitorRecord) -> None:
+            line = record.model_dump_json()
+            typer.echo(line)
+            if history is not None:
+                history.write(line + "\n")
+                history.flush()
+
+        pool = None
+        if any(group.kind != "insight" for group in config.groups):
+            pool = BrowserPool(size=browsers, launch_profile=launch_profile)
+            await stack.enter_async_context(pool)
+
+        monitor = Monitor(config, on_record, pool=pool, concurrency=concurrency)
+        try:
+            await monitor.run(duration)
+        finally:
+            for name, stats in monitor.stats.items():
+                summary = stats.get_summary().model_dump_json()
+                typer.echo(f"{name}: {summary}", err=True)
+            typer.echo(f"Missed runs: {monitor.missed}", err=True)
+
+
+@app.command()
+def monitor(
+    config: str = typer.Argument(..., help="JSON file of the url groups to monitor"),
+    history: str | None = typer.Option(None, help="Append the results to a JSONL"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1),
+    browsers: int = typer.Option(2, min=1, help="Number of warm browsers"),
+    duration: float | None = typer.Option(
+        None, min=0, help="Stop after this many seconds, run forever otherwise"
+    ),
+    launch_profile: str = typer.Option(
+        DEFAULT_LAUNCH_PROFILE, help=LAUNCH_PROFILE_HELP, callback=check_launch_profile
+    ),
+):
+    try:
+        monitor_config = MonitorConfig.model_validate_json(Path(config).read_text())
+    except (OSError, ValueError) as e:
+        raise typer.BadParameter(str(e)) from None
+
+    try:
+        asyncio.run(
+            _monitor(
+                monitor_config, history, concurrency, browsers, duration, launch_profile
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command()
+def serve(
+    host: str = typer.Option(SERVICE_HOST),
+    port: int = typer.Option(SERVICE_PORT),
+    browsers: int = typer.Option(2, min=1, help="Number of warm browsers"),
+    max_pending: int = typer.Option(100, min=1, help="Maximum queued jobs"),
+    recycle_pages: int = typer.Option(
+        200, min=1, help="Replace a browser after this many pages"
+    ),
+    recycle_rss_mb: int = typer.Option(
+        1500, min=1, help="Replace a browser using more memory after a page"
+    ),
+    kill_rss_mb: int = typer.Option(
+        3000, min=1, help="Kill a browser using more memory during a page"
+    ),
+    page_memory_mb: int = typer.Option(
+        300, min=1, help="Memory to keep available to start a page"
+    ),
+    launch_profile: str = typer.Option(
+        DEFAULT_LAUNCH_PROFILE, help=LAUNCH_PROFILE_HELP, callback=check_launch_profile
+    ),
+):
+    policy = RecyclePolicy(
+        max_pages=recycle_pages,
+        max_rss_kb=recycle_rss_mb * 1024,
+        kill_rss_kb=kill_rss_mb * 1024,
+        page_memory_kb=page_memory_mb * 1024,
+    )
+    serve_api(
+        host=host,
+        port=port,
+        browsers=browsers,
+        max_pending=max_pending,
+        policy=policy,
+        launch_profile=launch_profile,
+    )
+
+
+@app.command()
+def submit(
+    url: str,
+    kind: str = typer.Option(
+        "combined", help="eco_index, network, insight or combined"
+    ),
+    strategy: str = typer.Option("mobile", help="Insight strategy"),
+    server: str = typer.Option(DEFAULT_SERVER_URL),
+    wait: bool = typer.Option(True, help="Wait for the result or only get the job id"),
+):
+    rich.print(submit_job(url, kind, strategy, server_url=server, wait=wait))
+
+
+@app.command()
+def job(
+    job_id: str,
+    server: str = typer.Option(DEFAULT_SERVER_URL),
+    wait: bool = typer.Option(False, help="Wait for the job to finish"),
+):
+    rich.print(get_job(job_id, server_url=server, wait=wait))
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from app.core.insight.schemas import Strategy
+
+JobKind = Literal["eco_index", "network", "insight", "combined"]
+
+JobStatus = Literal["queued", "running", "done", "error"]
+
+
+class JobRequest(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Url to analyse
+    kind : JobKind
+        Analysis to run, "combined" runs the three of them
+    strategy : Strategy
+        Strategy of the insight analysis
+    """
+
+    url: str
+    kind: JobKind = "combined"
+    strategy: Strategy = "mobile"
+
+
+class Job(BaseModel):
+    """
+    Attributes
+    ----------
+    id : str
+        Identifier of the job
+    request : JobRequest
+        What was asked
+    status : JobStatus
+        Where the job is in its lifecycle
+    result : dict | None
+        Result of the analysis, keyed by analysis kind
+    error : str | None
+        Error message when status is "error"
+    timings : dict[str, float]
+        Duration of each phase of the analyses. Unit : s
+    created_at, started_at, finished_at : datetime | None
+        Lifecycle dates of the job
+    """
+
+    id: str
+    request: JobRequest
+    status: JobStatus = "queued"
+    result: dict | None = None
+    error: str | None = None
+    timings: dict[str, float] = {}
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from uuid import uuid4
+
+from app.adapter.exception.app_exception import JobNotFoundError, ServiceBusyError
+from app.adapter.logger.mylogger import log_context
+from app.core.browser.pool import BrowserPool
+from app.core.constants import LOGGER_NAME
+from app.core.instrumentation.timings import collect_timings
+from app.usecase.analysis_service.schemas import Job, JobRequest
+from app.usecase.batch_analysis.analysers import (
+    analyse_eco_index,
+    analyse_insight,
+    analyse_network,
+)
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class AnalysisService:
+    """
+    Run analysis jobs on warm browsers, with bounded concurrency.
+
+    Jobs beyond `max_concurrency` wait in queue, and submissions beyond
+    `max_pending` waiting jobs are refused. Only the last `max_finished_jobs`
+    finished jobs are kept for lookup.
+    """
+
+    def __init__(
+        self,
+        pool: BrowserPool,
+        max_concurrency: int | None = None,
+        max_pending: int = 100,
+        max_finished_jobs: int = 1000,
+    ) -> None:
+        self.pool = pool
+        self.max_concurrency = max_concurrency or pool.size
+        self.max_pending = max_pending
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self._finished: dict[str, asyncio.Event] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._pending = 0
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def start(self) -> None:
+        await self.pool.start()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.pool.stop()
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending
+
+    def submit(self, request: JobRequest) -> Job:
+        if self.pending_count >= self.max_pending:
+            raise ServiceBusyError(
+                f"Trop de jobs en attente ({self.max_pending}), réessayez plus tard"
+            )
+
+        job = Job(id=uuid4().hex, request=request)
+        self.jobs[job.id] = job
+        self._finished[job.id] = asyncio.Event()
+        self._pending += 1
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"Job {job_id} introuvable")
+
+        return job
+
+    async def wait(self, job_id: str, timeout: float | None = None) -> Job:
+        """Wait for the job to finish, return it as is after timeout seconds."""
+        job = self.get(job_id)
+        event = self._finished.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        return job
+
+    async def _run(self, job: Job) -> None:
+        with log_context(job_id=job.id, url=job.request.url):
+            async with self._slots:
+                self._pending -= 1
+                job.status = "running"
+                job.started_at = datetime.now()
+                logger.info(
+                    "Job %s : analyse %s de %s",
+                    job.id,
+                    job.request.kind,
+                    job.request.url,
+                )
+                try:
+                    with collect_timings() as timings:
+                        job.timings = timings.durations
+                        job.result = await self._execute(job.request)
+                    job.status = "done"
+                except Exception as e:
+                    logger.warning("Job %s en erreur : %s", job.id, e)
+                    job.error = f"{type(e).__name__}: {e}"
+                    job.status = "error"
+                finally:
+                    job.finished_at = datetime.now()
+                    self._finished.pop(job.id).set()
+                    self._forget_old_jobs()
+
+    async def _execute(self, request: JobRequest) -> dict:
+        if request.kind == "insight":
+            return {"insight": await analyse_insight(request.url, request.strategy)}
+
+        if request.kind == "combined":
+            insight = asyncio.create_task(
+                analyse_insight(request.url, request.strategy)
+            )
+            try:
+                async with self.pool.acquire() as browser:
+                    eco_index = await analyse_eco_index(request.url, browser)
+                    network = await analyse_network(request.url, browser)
+            except BaseException:
+                insight.cancel()
+                raise
+
+            return {
+                "eco_index": eco_index,
+                "network": network,
+                "insight": await insight,
+            }
+
+        analyse = analyse_eco_index if request.kind == "eco_index" else analyse_network
+        async with self.pool.acquire() as browser:
+            return {request.kind: await analyse(request.url, browser)}
+
+    def _forget_old_jobs(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.status in ("done", "error")
+        ]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
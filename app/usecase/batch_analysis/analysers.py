@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import requests
+
+from app.core.asset_cache.cache import AssetCache
+from app.core.browser.profiles import DEFAULT_LAUNCH_PROFILE
+from app.core.change_detection.fingerprint import check_page
+from app.core.change_detection.store import ResultStore
+from app.core.constants import LOGGER_NAME
+from app.core.eco_index import Browser
+from app.core.eco_index.scraper import EcoindexScraper
+from app.core.insight.google_insight import DestopInsight, MobileInsight
+from app.core.insight.schemas import Strategy
+from app.core.inspect_network.count_requests import InspectNetWork
+from app.core.instrumentation.tracing import span
+from app.core.screenshot_store.store import ScreenshotStore
+from app.usecase.batch_analysis.schemas import Analyser, AnalysisKind
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# A stored result older than this is analysed again even if the page did not
+# change: its assets may have changed behind unchanged urls
+REUSE_MAX_AGE = timedelta(days=7)
+
+
+async def analyse_eco_index(
+    url: str,
+    browser: Browser | None = None,
+    screenshot_store: ScreenshotStore | None = None,
+    asset_cache: AssetCache | None = None,
+    launch_profile: str = DEFAULT_LAUNCH_PROFILE,
+) -> dict:
+    with span("eco_index", url=url) as span_args:
+        scraper = EcoindexScraper(
+            url=url,
+            browser=browser,
+            asset_cache=asset_cache,
+            launch_profile=launch_profile,
+            # Only the totals end up in the result
+            requests_mode="summary",
+            # Captured in memory, written once, by the store
+            keep_screenshot=screenshot_store is not None,
+        )
+        result = await scraper.get_page_analysis()
+        span_args.update(
+            status="ok",
+            bytes=round(result.size * 1000),
+            requests=result.requests,
+            nodes=result.nodes,
+        )
+
+    output = result.model_dump(mode="json")
+    categories = await scraper.get_requests_by_category()
+    output["categories"] = categories.model_dump(mode="json")
+    if screenshot_store is not None and scraper.screenshot_webp is not None:
+        stored = await asyncio.to_thread(
+            screenshot_store.add, url, scraper.screenshot_webp, result.date
+        )
+        output["screenshot"] = stored.model_dump(
+            mode="json", include={"blob_id", "is_duplicate"}
+        )
+
+    return output
+
+
+async def analyse_network(
+    url: str,
+    browser: Browser | None = None,
+    launch_profile: str = DEFAULT_LAUNCH_PROFILE,
+) -> dict:
+    inspect = InspectNetWork(url=url, launch_profile=launch_profile)
+    with span("network", url=url) as span_args:
+        if browser is not None:
+            result = await inspect.get_result_with_browser(browser)
+        else:
+            # The standalone analysis relies on the sync playwright API, which
+            # cannot run inside the event loop thread.
+            result = await asyncio.to_thread(inspect.get_result)
+        span_args.update(status="ok", requests=result.total)
+
+    return result.model_dump(mode="json")
+
+
+async def analyse_insight(url: str, strategy: Strategy = "mobile") -> dict:
+    insight_class = DestopInsight if strategy == "desktop" else MobileInsight
+    with span("insight", url=url, strategy=strategy) as span_args:
+        result = await asyncio.to_thread(insight_class(url).get_result)
+        span_args.update(status="ok", performance=result.performance)
+
+    return result.model_dump(mode="json")
+
+
+def get_analyser(
+    kind: AnalysisKind,
+    *,
+    strategy: Strategy = "mobile",
+    screenshot_store: ScreenshotStore | None = None,
+    asset_cache: AssetCache | None = None,
+    launch_profile: str = DEFAULT_LAUNCH_PROFILE,
+) -> Analyser:
+    if kind == "eco_index":
+        if (
+            screenshot_store is None
+            and asset_cache is None
+            and launch_profile == DEFAULT_LAUNCH_PROFILE
+        ):
+            return analyse_eco_index
+        return lambda url: analyse_eco_index(
+            url,
+            screenshot_store=screenshot_store,
+            asset_cache=asset_cache,
+            launch_profile=launch_profile,
+        )
+
+    if kind == "network":
+        if launch_profile == DEFAULT_LAUNCH_PROFILE:
+            return analyse_network
+        return lambda url: analyse_network(url, launch_profile=launch_profile)
+
+    if kind == "insight":
+        return lambda url: analyse_insight(url, strategy)
+
+    raise ValueError(f"Unknown analysis kind: {kind}")
+
+
+def reuse_unchanged(
+    analyser: Analyser,
+    kind: str,
+    store: ResultStore,
+    session: requests.Session | None = None,
+    max_age: timedelta = REUSE_MAX_AGE,
+) -> Analyser:
+    """
+    Wrap analyser to reuse the stored result of the pages unchanged since their
+    last analysis, checked with a conditional request and a hash of their HTML.
+
+    Results get a "reused" flag, True when they come from the store. A reused
+    page is not loaded, so no screenshot of it is stored in a screenshot store.
+    """
+    session = session or requests.Session()
+
+    async def analyse(url: str) -> dict:
+        with span("change_check", url=url) as span_args:
+            stored = await asyncio.to_thread(store.get, url, kind)
+            if stored is not None and datetime.now() - stored.analysed_at > max_age:
+                stored = None
+            previous = stored.fingerprint if stored is not None else None
+            check = await asyncio.to_thread(check_page, session, url, previous)
+            span_args["reason"] = check.reason
+
+        if stored is not None and not check.is_changed:
+            logger.info(
+                "Page %s inchangée (%s), résultat du %s réutilisé",
+                url,
+                check.reason,
+                stored.analysed_at.isoformat(timespec="seconds"),
+            )
+            await asyncio.to_thread(store.update_fingerprint, check.fingerprint, kind)
+            return {**stored.result, "reused": True}
+
+        result = await analyser(url)
+        if check.fingerprint is not None:
+            await asyncio.to_thread(store.save, check.fingerprint, kind, result)
+
+        return {**result, "reused": False}
+
+    return analyse
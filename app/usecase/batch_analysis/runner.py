@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import sys
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator
+
+from app.adapter.logger.mylogger import log_context
+from app.core.constants import LOGGER_NAME
+from app.core.discovery.frontier import UrlFrontier
+from app.core.instrumentation.timings import TimingsAggregator, collect_timings
+from app.core.instrumentation.tracing import span
+from app.core.statistics import QuantileSketch, percentile
+from app.usecase.batch_analysis.schemas import (
+    Analyser,
+    AnalysisKind,
+    BatchItem,
+    BatchSummary,
+)
+
+logger = logging.getLogger(LOGGER_NAME)
+
+STDIN_SOURCE = "-"
+
+
+def read_urls(source: str) -> Iterator[str]:
+    """
+    Yield the urls of a file, one per line, or of stdin when source is "-".
+
+    Blank lines and lines starting with "#" are skipped.
+    """
+    if source == STDIN_SOURCE:
+        yield from _clean_lines(sys.stdin)
+        return
+
+    with open(source, encoding="utf-8") as f_in:
+        yield from _clean_lines(f_in)
+
+
+def _clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+async def analyse_one(url: str, analyser: Analyser, kind: AnalysisKind) -> BatchItem:
+    start = time.perf_counter()
+    with (
+        log_context(url=url, kind=kind),
+        span("analysis", own_lane=True, url=url, kind=kind) as span_args,
+        collect_timings() as timings,
+    ):
+        try:
+            result = await analyser(url)
+        except Exception as e:
+            logger.warning("Analyse %s de la page %s en erreur : %s", kind, url, e)
+            span_args.update(status="error", error=f"{type(e).__name__}: {e}")
+            return BatchItem(
+                url=url,
+                kind=kind,
+                status="error",
+                duration=time.perf_counter() - start,
+                error=f"{type(e).__name__}: {e}",
+                timings=timings.durations,
+            )
+        span_args["status"] = "ok"
+
+    return BatchItem(
+        url=url,
+        kind=kind,
+        status="ok",
+        duration=time.perf_counter() - start,
+        result=result,
+        timings=timings.durations,
+    )
+
+
+async def run_batch(
+    urls: Iterable[str],
+    analyser: Analyser,
+    kind: AnalysisKind,
+    concurrency: int = 4,
+) -> AsyncIterator[BatchItem]:
+    """
+    Analyse urls with at most `concurrency` analyses in flight, yielding each
+    item as soon as it finishes.
+
+    Urls are pulled lazily, so a huge list is never fully loaded in memory.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    pending: set[asyncio.Task[BatchItem]] = set()
+
+    for url in urls:
+        pending.add(asyncio.create_task(analyse_one(url, analyser, kind)))
+        if len(pending) < concurrency:
+            continue
+
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
+
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
+
+
+async def run_frontier_batch(
+    frontier: UrlFrontier,
+    analyser: Analyser,
+    kind: AnalysisKind,
+    concurrency: int = 4,
+) -> AsyncIterator[BatchItem]:
+    """
+    Same as run_batch, urls being handed out by a frontier which dedupes them
+    and keeps the per host politeness limits.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    results: asyncio.Queue[BatchItem | None] = asyncio.Queue()
+
+    async def worker() -> None:
+        try:
+            while True:
+                with span("frontier_wait", category="wait", own_lane=True):
+                    url = await frontier.get()
+                if url is None:
+                    break
+                try:
+                    item = await analyse_one(url, analyser, kind)
+                finally:
+                    frontier.release(url)
+                await results.put(item)
+        finally:
+            await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    running = len(workers)
+    try:
+        while running:
+            item = await results.get()
+            if item is None:
+                running -= 1
+            else:
+                yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+class BatchStats:
+    """Accumulate the items of a batch to build its summary."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.succeeded = 0
+        self.failed = 0
+        self.reused = 0
+        self.durations: list[float] = []
+        self.timings = TimingsAggregator()
+
+    def add(self, item: BatchItem) -> None:
+        self._count(item)
+        self.durations.append(item.duration)
+        self.timings.add(item.timings)
+
+    def get_summary(self) -> BatchSummary:
+        total = len(self.durations)
+
+        return self._get_summary(
+            total,
+            latency_mean=sum(self.durations) / total if total else 0,
+            latency_p50=percentile(self.durations, 50),
+            latency_p95=percentile(self.durations, 95),
+            latency_max=max(self.durations, default=0),
+        )
+
+    def _count(self, item: BatchItem) -> None:
+        if item.status == "ok":
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if item.result is not None and item.result.get("reused"):
+            self.reused += 1
+
+    def _get_summary(self, total: int, **latencies: float) -> BatchSummary:
+        duration = time.perf_counter() - self.start
+
+        return BatchSummary(
+            total=total,
+            succeeded=self.succeeded,
+            failed=self.failed,
+            reused=self.reused,
+            skip_ratio=self.reused / total if total else 0,
+            duration=duration,
+            throughput=total / duration if duration > 0 else 0,
+            **latencies,
+        )
+
+
+class SketchedBatchStats(BatchStats):
+    """
+    BatchStats in bounded memory, for the runs which never end: the latencies
+    are summarized by a QuantileSketch, the phase timings are not kept.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.latencies = QuantileSketch()
+
+    def add(self, item: BatchItem) -> None:
+        self._count(item)
+        self.latencies.add(item.duration)
+
+    def get_summary(self) -> BatchSummary:
+        latencies = self.latencies
+
+        return self._get_summary(
+            latencies.count,
+            latency_mean=latencies.mean,
+            latency_p50=latencies.quantile(0.5),
+            latency_p95=latencies.quantile(0.95),
+            latency_max=latencies.max if latencies.count else 0,
+        )
@@ -0,0 +1,83 @@
+from collections.abc import Awaitable, Callable
+from typing import Literal
+
+from pydantic import BaseModel
+
+AnalysisKind = Literal["eco_index", "network", "insight"]
+
+ItemStatus = Literal["ok", "error"]
+
+Analyser = Callable[[str], Awaitable[dict]]
+
+
+class BatchItem(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Analysed url
+    kind : AnalysisKind
+        Analysis made on the url
+    status : ItemStatus
+        "ok" when the analysis succeeded, "error" otherwise
+    duration : float
+        Unit : s
+    result : dict | None
+        Result of the analysis, None on error
+    error : str | None
+        Error message, None on success
+    timings : dict[str, float]
+        Duration of each phase of the analysis. Unit : s
+    """
+
+    url: str
+    kind: AnalysisKind
+    status: ItemStatus
+    duration: float
+    result: dict | None = None
+    error: str | None = None
+    timings: dict[str, float] = {}
+
+
+class BatchSummary(BaseModel):
+    """
+    Attributes
+    ----------
+    total : int
+        Number of analysed urls
+    succeeded : int
+        Number of successful analyses
+    failed : int
+        Number of failed analyses
+    skipped : int
+        Number of invalid or duplicate urls not analysed
+    reused : int
+        Number of results reused from a previous run, the page being unchanged
+    skip_ratio : float
+        reused / total, share of the analyses skipped
+    duration : float
+        Wall time of the whole batch. Unit : s
+    throughput : float
+        Unit : url/s
+    latency_mean : float
+        Unit : s
+    latency_p50 : float
+        Unit : s
+    latency_p95 : float
+        Unit : s
+    latency_max : float
+        Unit : s
+    """
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    reused: int = 0
+    skip_ratio: float = 0
+    duration: float = 0
+    throughput: float = 0
+    latency_mean: float = 0
+    latency_p50: float = 0
+    latency_p95: float = 0
+    latency_max: float = 0
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import os
 import sys
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 from typing import List
@@ -11,6 +12,7 @@ from openpyxl.workbook.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
 from app.adapter.exception.app_exception import AppError
+from app.adapter.logger.mylogger import log_context
 from app.core.constants import LOGGER_NAME
 from app.core.eco_index.scraper import EcoindexScraper
 from app.core.insight.google_insight import MobileInsight
@@ -21,6 +23,9 @@ from app.usecase.excel_completion.files_infos import (
     TEMPLATE_PATH,
     get_output_path,
 )
+from app.usecase.excel_completion.schemas import PageReport
+from app.usecase.site_statistics.aggregator import SiteAggregator
+from app.usecase.site_statistics.schemas import MetricDistribution, SiteStatistics
 
 logger = logging.getLogger(LOGGER_NAME)
 
@@ -72,8 +77,97 @@ def copy_sheet(
         target_sheet.row_dimensions[row].hidden = row_dim.hidden
 
 
-def create_excel_from_template(
-    template_path: Path, output_path: str, urls: List[str]
+def fill_page_sheet(sheet: Worksheet, report: PageReport) -> None:
+    eco_index, insight, inspect = report.eco_index, report.insight, report.network
+
+    # url / date
+    sheet["B3"] = report.url
+    sheet["B4"] = datetime.now().strftime("%d/%m/%Y, %H:%M")
+
+    # Green IT Analysis
+    sheet["B12"] = eco_index.ges
+    sheet["B13"] = f"{eco_index.size / 1000:.2f}"
+    sheet["B14"] = eco_index.nodes
+    sheet["B15"] = eco_index.requests
+
+    # Lighthouse
+    sheet["B18"] = insight.performance
+    sheet["B19"] = f"{insight.first_contentful_paint / 1000:.2f}"
+    sheet["C19"] = (
+        f"Largest contentful paint : {insight.largest_contentful_paint / 1000:.2f} s"
+    )
+    sheet["B20"] = f"{insight.total_blocking_time / 1000:.2f}"
+    sheet["B21"] = f"ok, {insight.speed_index} ms"
+
+    # Réseau
+    sheet["B24"] = inspect.total
+    sheet["B25"] = inspect.js
+    sheet["B26"] = inspect.css
+
+
+def add_report(aggregator: SiteAggregator, report: PageReport) -> None:
+    eco_index = report.eco_index.model_dump(mode="json")
+    if report.categories is not None:
+        eco_index["categories"] = report.categories.model_dump()
+    aggregator.add("eco_index", eco_index)
+    aggregator.add("insight", report.insight.model_dump())
+    aggregator.add("network", report.network.model_dump())
+
+
+def _fill_distribution(
+    sheet: Worksheet, row: int, distribution: MetricDistribution, scale: float = 1
+) -> None:
+    """Median of a metric in column B, its 90th percentile in column C."""
+    sheet[f"B{row}"] = round(distribution.p50 / scale, 2)
+    sheet[f"C{row}"] = round(distribution.p90 / scale, 2)
+
+
+def fill_synthese_sheet(sheet: Worksheet, statistics: SiteStatistics) -> None:
+    metrics = statistics.metrics
+    pages_count = max(statistics.pages.values(), default=0)
+
+    sheet["B3"] = f"{pages_count} écrans diagnostiqués"
+    sheet["B5"] = datetime.now().strftime("%d/%m/%Y")
+
+    # Médiane (B) et 90e centile (C) des pages
+    for header_row in (16, 22, 28):
+        sheet[f"B{header_row}"] = "Médiane"
+        sheet[f"C{header_row}"] = "P90"
+    for row, metric, scale in (
+        (17, "ges", 1),
+        (18, "size", 1000),
+        (19, "nodes", 1),
+        (20, "requests", 1),
+        (23, "performance", 1),
+        (24, "first_contentful_paint", 1000),
+        (25, "total_blocking_time", 1000),
+        (29, "total", 1),
+        (30, "js", 1),
+        (31, "css", 1),
+    ):
+        if metric in metrics:
+            _fill_distribution(sheet, row, metrics[metric], scale)
+
+    # Répartition des pages par note et du poids par type de ressource
+    if "score" in metrics:
+        sheet["A33"] = "Score Ecoindex"
+        _fill_distribution(sheet, 33, metrics["score"])
+    sheet["A35"] = "Notes Ecoindex"
+    sheet["B35"] = "Pages"
+    for row, (grade, count) in enumerate(statistics.grades.items(), start=36):
+        sheet[f"A{row}"] = grade
+        sheet[f"B{row}"] = count
+    sheet["D35"] = "Type de ressource"
+    sheet["E35"] = "Part du poids"
+    for row, (category, share) in enumerate(
+        statistics.category_share.items(), start=36
+    ):
+        sheet[f"D{row}"] = category
+        sheet[f"E{row}"] = f"{share:.0%}"
+
+
+def create_excel_from_reports(
+    template_path: Path, output_path: str, reports: Iterable[PageReport]
 ) -> None:
     # Open the template
     template_wb: Workbook = openpyxl.load_workbook(template_path)
@@ -82,7 +176,7 @@ def create_excel_from_template(
     new_wb: Workbook = openpyxl.Workbook()
     new_wb.remove(new_wb.active)
 
-    # Copy the "Synthèse" sheet without modifying it
+    # Copy the "Synthèse" sheet, filled once every page is aggregated
     synth_sheet = template_wb[SYNTHESE_PAGE_NAME]
     copy_sheet(synth_sheet, new_wb, SYNTHESE_PAGE_NAME)
 
@@ -90,48 +184,49 @@ def create_excel_from_template(
     list_sheet = template_wb[LIST_PAGE_NAME]
     copy_sheet(list_sheet, new_wb, LIST_PAGE_NAME)
 
-    # For each URL, create a new sheet based on "Page 1" from the template
-    for i, url in enumerate(urls, start=1):
-        logger.info("Analyse de la page %s ...", url)
+    # For each report, create a new sheet based on "Page 1" from the template
+    aggregator = SiteAggregator()
+    for i, report in enumerate(reports, start=1):
         new_sheet_name: str = f"page {i}"
         copy_sheet(template_wb["page 1"], new_wb, new_sheet_name)
+        fill_page_sheet(new_wb[new_sheet_name], report)
+        add_report(aggregator, report)
 
-        insight = MobileInsight(url).get_result()
-        logger.info("Insights google obtenus ...")
+        logger.info("Page %s pour l'url %s ajoutée", i, report.url)
 
-        eco_index = asyncio.run(EcoindexScraper(url=url).get_page_analysis())
-        logger.info("Eco index obtenu ...")
+    fill_synthese_sheet(new_wb[SYNTHESE_PAGE_NAME], aggregator.get_statistics())
 
-        inspect = InspectNetWork(url=url).get_result()
-        logger.info("Inspection du network completée ....")
+    new_wb.save(output_path)
 
-        # url / date
-        new_wb[new_sheet_name]["B3"] = url
-        new_wb[new_sheet_name]["B4"] = datetime.now().strftime("%d/%m/%Y, %H:%M")
 
-        # Green IT Analysis
-        new_wb[new_sheet_name]["B12"] = eco_index.ges
-        new_wb[new_sheet_name]["B13"] = f"{eco_index.size / 1000:.2f}"
-        new_wb[new_sheet_name]["B14"] = eco_index.nodes
-        new_wb[new_sheet_name]["B15"] = eco_index.requests
+def analyse_pages(urls: Iterable[str]) -> Iterator[PageReport]:
+    for url in urls:
+        with log_context(url=url):
+            logger.info("Analyse de la page %s ...", url)
 
-        # Lighthouse
-        new_wb[new_sheet_name]["B18"] = insight.performance
-        new_wb[new_sheet_name]["B19"] = f"{insight.first_contentful_paint / 1000:.2f}"
-        new_wb[new_sheet_name]["C19"] = (
-            f"Largest contentful paint : {insight.largest_contentful_paint / 1000:.2f} s"
-        )
-        new_wb[new_sheet_name]["B20"] = f"{insight.total_blocking_time / 1000:.2f}"
-        new_wb[new_sheet_name]["B21"] = f"ok, {insight.speed_index} ms"
+            insight = MobileInsight(url).get_result()
+            logger.info("Insights google obtenus ...")
 
-        # Réseau
-        new_wb[new_sheet_name]["B24"] = inspect.total
-        new_wb[new_sheet_name]["B25"] = inspect.js
-        new_wb[new_sheet_name]["B26"] = inspect.css
+            scraper = EcoindexScraper(url=url, requests_mode="summary")
+            eco_index = asyncio.run(scraper.get_page_analysis())
+            logger.info("Eco index obtenu ...")
 
-        logger.info("Page %s pour l'url %s ajoutée", i, url)
+            inspect = InspectNetWork(url=url).get_result()
+            logger.info("Inspection du network completée ....")
 
-    new_wb.save(output_path)
+        yield PageReport(
+            url=url,
+            eco_index=eco_index,
+            insight=insight,
+            network=inspect,
+            categories=scraper.all_requests.aggregation,
+        )
+
+
+def create_excel_from_template(
+    template_path: Path, output_path: str, urls: List[str]
+) -> None:
+    create_excel_from_reports(template_path, output_path, analyse_pages(urls))
 
 
 if __name__ == "__main__":
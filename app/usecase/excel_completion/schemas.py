@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+
+from app.core.eco_index.schemas import MimetypeAggregation, Result
+from app.core.insight.schemas import InsightContent
+from app.core.inspect_network.schemas import NetworkRequest
+
+
+class PageReport(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Analysed url
+    eco_index : Result
+        Ecoindex analysis of the page
+    insight : InsightContent
+        Google PageSpeed Insights analysis of the page
+    network : NetworkRequest
+        Network inspection of the page
+    categories : MimetypeAggregation | None
+        Requests of the page per category of resource
+    """
+
+    url: str
+    eco_index: Result
+    insight: InsightContent
+    network: NetworkRequest
+    categories: MimetypeAggregation | None = None
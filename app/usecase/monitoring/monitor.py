@@ -0,0 +1,146 @@
+import asyncio
+import heapq
+import logging
+from collections.abc import Callable
+from datetime import datetime
+
+from app.core.browser.pool import BrowserPool
+from app.core.constants import LOGGER_NAME
+from app.usecase.batch_analysis.analysers import (
+    analyse_eco_index,
+    analyse_insight,
+    analyse_network,
+)
+from app.usecase.batch_analysis.runner import SketchedBatchStats, analyse_one
+from app.usecase.batch_analysis.schemas import Analyser
+from app.usecase.monitoring.schemas import MonitorConfig, MonitorGroup, MonitorRecord
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# (due time, group index, url index)
+ScheduledRun = tuple[float, int, int]
+
+
+def get_first_runs(groups: list[MonitorGroup], start: float = 0) -> list[ScheduledRun]:
+    """
+    First run of every url of groups.
+
+    The urls of a group are spread evenly over its interval, and each group is
+    shifted by a fraction of its step so that the groups do not start their
+    urls together.
+    """
+    runs = []
+    for group_index, group in enumerate(groups):
+        step = group.interval / len(group.urls)
+        phase = step * group_index / len(groups)
+        runs.extend(
+            (start + phase + url_index * step, group_index, url_index)
+            for url_index in range(len(group.urls))
+        )
+
+    return runs
+
+
+class Monitor:
+    """
+    Analyse the urls of groups again and again, each at the interval of its
+    group, until the run duration is over.
+
+    The runs are spread over the intervals rather than started all at once,
+    and share `concurrency` slots and the warm browsers of a pool. A url whose
+    previous analysis is still running misses its turn.
+    """
+
+    def __init__(
+        self,
+        config: MonitorConfig,
+        on_record: Callable[[MonitorRecord], None],
+        pool: BrowserPool | None = None,
+        concurrency: int = 4,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.groups = config.groups
+        self.on_record = on_record
+        self.pool = pool
+        # Bounded: the monitor may run forever
+        self.stats = {group.name: SketchedBatchStats() for group in self.groups}
+        self.missed = 0
+        self._slots = asyncio.Semaphore(concurrency)
+        self._running: set[tuple[int, int]] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._analysers = [self.get_analyser(group) for group in self.groups]
+
+    def get_analyser(self, group: MonitorGroup) -> Analyser:
+        if group.kind == "insight":
+            return lambda url: analyse_insight(url, group.strategy)
+
+        analyse = analyse_eco_index if group.kind == "eco_index" else analyse_network
+        if self.pool is None:
+            return analyse
+
+        async def analyse_with_pool(url: str) -> dict:
+            async with self.pool.acquire() as browser:
+                return await analyse(url, browser)
+
+        return analyse_with_pool
+
+    async def run(self, duration: float | None = None) -> None:
+        """
+        Start the runs due within duration seconds (forever when None), then
+        wait for the analyses in flight.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        schedule = get_first_runs(self.groups, start)
+        heapq.heapify(schedule)
+
+        try:
+            while schedule:
+                due, group_index, url_index = schedule[0]
+                if duration is not None and due >= start + duration:
+                    break
+                await asyncio.sleep(max(0, due - loop.time()))
+                # Next run from the due time, not from now: a late tick does
+                # not shift the following ones
+                interval = self.groups[group_index].interval
+                heapq.heapreplace(schedule, (due + interval, group_index, url_index))
+                self._start(due, group_index, url_index)
+
+            await asyncio.gather(*self._tasks)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _start(self, due: float, group_index: int, url_index: int) -> None:
+        key = (group_index, url_index)
+        if key in self._running:
+            self.missed += 1
+            logger.warning(
+                "Analyse précédente de %s encore en cours, passage ignoré",
+                self.groups[group_index].urls[url_index],
+            )
+            return
+
+        self._running.add(key)
+        task = asyncio.create_task(self._analyse(due, group_index, url_index))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _analyse(self, due: float, group_index: int, url_index: int) -> None:
+        group = self.groups[group_index]
+        try:
+            async with self._slots:
+                delay = max(0.0, asyncio.get_running_loop().time() - due)
+                date = datetime.now()
+                item = await analyse_one(
+                    group.urls[url_index], self._analysers[group_index], group.kind
+                )
+            self.stats[group.name].add(item)
+            self.on_record(
+                MonitorRecord(group=group.name, date=date, delay=delay, item=item)
+            )
+        finally:
+            self._running.discard((group_index, url_index))
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.insight.schemas import Strategy
+from app.usecase.batch_analysis.schemas import AnalysisKind, BatchItem
+
+
+class MonitorGroup(BaseModel):
+    """
+    Attributes
+    ----------
+    name : str
+        Name of the group, written with its results
+    kind : AnalysisKind
+        Analysis made on the urls of the group
+    interval : float
+        Time between two analyses of a same url. Unit : s
+    urls : list[str]
+        Urls of the group
+    strategy : Strategy
+        Strategy of the insight analyses
+    """
+
+    name: str
+    kind: AnalysisKind
+    interval: float = Field(gt=0)
+    urls: list[str] = Field(min_length=1)
+    strategy: Strategy = "mobile"
+
+
+class MonitorConfig(BaseModel):
+    groups: list[MonitorGroup] = Field(min_length=1)
+
+    @field_validator("groups")
+    @classmethod
+    def group_names_are_unique(cls, v: list[MonitorGroup]) -> list[MonitorGroup]:
+        names = [group.name for group in v]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        assert not duplicates, f"group names must be unique, repeated: {duplicates}"
+
+        return v
+
+
+class MonitorRecord(BaseModel):
+    """
+    Attributes
+    ----------
+    group : str
+        Group of the analysed url
+    date : datetime
+        Start of the analysis
+    delay : float
+        Time the analysis waited past its scheduled start for a free slot.
+        Unit : s
+    item : BatchItem
+        Analysis of the url
+    """
+
+    group: str
+    date: datetime
+    delay: float
+    item: BatchItem
@@ -0,0 +1,227 @@
+import heapq
+import itertools
+import json
+import logging
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+from app.core.constants import LOGGER_NAME
+from app.core.discovery.urls import canonicalize_url
+from app.core.eco_index.schemas import Grade
+from app.usecase.run_diff.schemas import DiffReport, MetricChange, PageRegression
+
+logger = logging.getLogger(LOGGER_NAME)
+
+GRADES = {grade.value: index for index, grade in enumerate(Grade)}
+
+# Metrics compared for each kind of analysis, with their direction: 1 when a
+# higher value is worse (weight, requests, timings), -1 when it is better (scores)
+METRICS: dict[str, dict[str, int]] = {
+    "eco_index": {"score": -1, "size": 1, "nodes": 1, "requests": 1},
+    "network": {"total": 1, "js": 1, "css": 1},
+    "insight": {
+        "performance": -1,
+        "accessibility": -1,
+        "best_practices": -1,
+        "seo": -1,
+        "first_contentful_paint": 1,
+        "largest_contentful_paint": 1,
+        "total_blocking_time": 1,
+        "cumulative_layout_shift": 1,
+        "speed_index": 1,
+    },
+}
+
+# Relative change under which a metric is considered stable
+MIN_CHANGE = 0.05
+
+# (grade, values of the metrics of the kind), as kept for each baseline page
+PageValues = tuple[str | None, tuple[float | None, ...]]
+
+
+def read_items(
+    lines: Iterable[str], malformed: list[int] | None = None
+) -> Iterator[tuple[str, str, dict | None]]:
+    """
+    Yield (normalized url, kind, result) of the analyses of JSONL lines: batch
+    output, or monitor history whose records wrap an item. The result is None
+    when the analysis failed.
+
+    A line which is not JSON, like the truncated last line of a monitor stopped
+    by Ctrl+C, is logged, skipped and its number added to `malformed`.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning("Ligne %s illisible, ignorée", number)
+            if malformed is not None:
+                malformed.append(number)
+            continue
+        item = item.get("item", item)
+        if item.get("kind") not in METRICS:
+            continue
+        url = canonicalize_url(item["url"])
+        if url is None:
+            continue
+        result = item.get("result")
+        if item.get("status") == "ok" and result:
+            yield url, item["kind"], result
+        else:
+            yield url, item["kind"], None
+
+
+def read_results(
+    lines: Iterable[str], malformed: list[int] | None = None
+) -> Iterator[tuple[str, str, dict]]:
+    """Yield (normalized url, kind, result) of the successful analyses only."""
+    for url, kind, result in read_items(lines, malformed):
+        if result is not None:
+            yield url, kind, result
+
+
+def get_page_values(kind: str, result: dict) -> PageValues:
+    return result.get("grade"), tuple(result.get(metric) for metric in METRICS[kind])
+
+
+class RunDiff:
+    """
+    Compare the results of a run to those of a baseline run, page by page.
+
+    Only the compared metrics of the baseline are indexed, by normalized url and
+    kind; the current run is streamed through `add`, keeping counters and the
+    `top` worst regressions in a bounded heap. A page whose current analysis
+    failed is counted as failed, not as removed, unless another result of the
+    current run compares it.
+    """
+
+    def __init__(self, top: int = 20, min_change: float = MIN_CHANGE) -> None:
+        self.top = top
+        self.min_change = min_change
+        self.compared = 0
+        self.added = 0
+        self.duplicates = 0
+        self.regressed = 0
+        self.improved = 0
+        self.grade_drops = 0
+        self.grade_rises = 0
+        self._baseline: dict[tuple[str, str], PageValues] = {}
+        self._seen: set[tuple[str, str]] = set()
+        self._failed: set[tuple[str, str]] = set()
+        self._regressions: Counter[str] = Counter()
+        self._improvements: Counter[str] = Counter()
+        self._worst: list[tuple[int, float, int, PageRegression]] = []
+        self._order = itertools.count()
+
+    def index_baseline(self, results: Iterable[tuple[str, str, dict]]) -> None:
+        """Index the baseline, the last result of a page replacing the others."""
+        for url, kind, result in results:
+            self._baseline[url, kind] = get_page_values(kind, result)
+
+    def add(self, url: str, kind: str, result: dict | None) -> None:
+        key = (url, kind)
+        if result is None:
+            self._failed.add(key)
+            return
+        if key in self._seen:
+            self.duplicates += 1
+            return
+        self._seen.add(key)
+
+        baseline = self._baseline.get(key)
+        if baseline is None:
+            self.added += 1
+            return
+        self.compared += 1
+
+        grade_before, values_before = baseline
+        grade_after, values_after = get_page_values(kind, result)
+        grade_drop = GRADES.get(grade_after, 0) - GRADES.get(grade_before, 0)
+        if grade_before is None or grade_after is None:
+            grade_drop = 0
+
+        worse: dict[str, tuple[float, float, float]] = {}
+        is_improved = grade_drop < 0
+        for (metric, direction), before, after in zip(
+            METRICS[kind].items(), values_before, values_after, strict=True
+        ):
+            if before is None or after is None:
+                continue
+            change = direction * (after - before) / (abs(before) or 1)
+            if change >= self.min_change:
+                worse[metric] = (before, after, change)
+                self._regressions[metric] += 1
+            elif change <= -self.min_change:
+                is_improved = True
+                self._improvements[metric] += 1
+
+        if grade_drop > 0:
+            self.grade_drops += 1
+        elif grade_drop < 0:
+            self.grade_rises += 1
+        if is_improved:
+            self.improved += 1
+        if grade_drop <= 0 and not worse:
+            return
+
+        self.regressed += 1
+        severity = max((change for _, _, change in worse.values()), default=0)
+        if len(self._worst) == self.top and (
+            not self._worst or (grade_drop, severity) <= self._worst[0][:2]
+        ):
+            return
+
+        regression = PageRegression(
+            url=url,
+            kind=kind,
+            grade_before=grade_before,
+            grade_after=grade_after,
+            changes={
+                metric: MetricChange(before=before, after=after, change=change)
+                for metric, (before, after, change) in worse.items()
+            },
+            severity=severity,
+        )
+        entry = (grade_drop, severity, -next(self._order), regression)
+        if len(self._worst) < self.top:
+            heapq.heappush(self._worst, entry)
+        else:
+            heapq.heapreplace(self._worst, entry)
+
+    def get_report(self) -> DiffReport:
+        failed = self._failed - self._seen
+        return DiffReport(
+            compared=self.compared,
+            added=self.added,
+            removed=len(self._baseline.keys() - self._seen - failed),
+            failed=len(failed),
+            duplicates=self.duplicates,
+            regressed=self.regressed,
+            improved=self.improved,
+            grade_drops=self.grade_drops,
+            grade_rises=self.grade_rises,
+            regressions=dict(self._regressions.most_common()),
+            improvements=dict(self._improvements.most_common()),
+            worst=[entry[-1] for entry in sorted(self._worst, reverse=True)],
+        )
+
+
+def diff_runs(
+    baseline_lines: Iterable[str],
+    current_lines: Iterable[str],
+    top: int = 20,
+    min_change: float = MIN_CHANGE,
+) -> DiffReport:
+    """Compare two JSONL result sets, the baseline being read first."""
+    run_diff = RunDiff(top, min_change)
+    malformed: list[int] = []
+    run_diff.index_baseline(read_results(baseline_lines, malformed))
+    for url, kind, result in read_items(current_lines, malformed):
+        run_diff.add(url, kind, result)
+
+    report = run_diff.get_report()
+    report.malformed = len(malformed)
+
+    return report
@@ -0,0 +1,86 @@
+from pydantic import BaseModel
+
+
+class MetricChange(BaseModel):
+    """
+    Attributes
+    ----------
+    before, after : float
+        Values of the metric in the baseline and in the current run
+    change : float
+        Relative change, positive when the page got worse (bigger weight, lower
+        score...)
+    """
+
+    before: float
+    after: float
+    change: float
+
+
+class PageRegression(BaseModel):
+    """
+    Attributes
+    ----------
+    url : str
+        Normalized url of the page
+    kind : str
+        Analysis compared
+    grade_before, grade_after : str | None
+        Ecoindex grades of the two runs, None for the other analyses
+    changes : dict[str, MetricChange]
+        Metrics which got worse
+    severity : float
+        Largest relative change of the metrics which got worse
+    """
+
+    url: str
+    kind: str
+    grade_before: str | None = None
+    grade_after: str | None = None
+    changes: dict[str, MetricChange] = {}
+    severity: float = 0
+
+
+class DiffReport(BaseModel):
+    """
+    Attributes
+    ----------
+    compared : int
+        Pages analysed in both runs
+    added : int
+        Pages only in the current run
+    removed : int
+        Pages only in the baseline
+    failed : int
+        Pages whose analysis failed in the current run, with no result to compare
+    duplicates : int
+        Results of the current run ignored, their page being already compared
+    regressed : int
+        Pages with a worse grade or a metric which got worse
+    improved : int
+        Pages with a better grade or a metric which got better
+    grade_drops, grade_rises : int
+        Pages whose ecoindex grade got worse, better
+    regressions : dict[str, int]
+        Number of pages which got worse, per metric
+    improvements : dict[str, int]
+        Number of pages which got better, per metric
+    worst : list[PageRegression]
+        Worst regressions, by grade letters lost then by severity
+    malformed : int
+        Lines of the two files which are not JSON, skipped
+    """
+
+    compared: int = 0
+    added: int = 0
+    removed: int = 0
+    failed: int = 0
+    duplicates: int = 0
+    regressed: int = 0
+    improved: int = 0
+    grade_drops: int = 0
+    grade_rises: int = 0
+    regressions: dict[str, int] = {}
+    improvements: dict[str, int] = {}
+    worst: list[PageRegression] = []
+    malformed: int = 0
@@ -0,0 +1,364 @@
+import heapq
+import logging
+import math
+import random
+import re
+import statistics
+from collections.abc import Callable, Iterable
+from urllib.parse import urlsplit
+
+from app.core.constants import LOGGER_NAME
+from app.core.discovery.frontier import UrlFrontier, normalize_url
+from app.usecase.batch_analysis.runner import run_frontier_batch
+from app.usecase.batch_analysis.schemas import Analyser, AnalysisKind, BatchItem
+from app.usecase.sampling.schemas import (
+    MetricEstimate,
+    SampleEstimate,
+    StratumSummary,
+)
+from app.usecase.site_statistics.aggregator import SKETCHED_METRICS
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Metric whose confidence interval decides when to stop sampling, per kind
+PRIMARY_METRICS = {"eco_index": "score", "insight": "performance", "network": "total"}
+
+# Path segments of the pages listing other pages
+LISTING_SEGMENTS = frozenset(
+    {
+        "archive",
+        "archives",
+        "categorie",
+        "categories",
+        "category",
+        "page",
+        "recherche",
+        "search",
+        "tag",
+        "tags",
+    }
+)
+
+# Last segment of the pages showing one item: an id or a long slug
+DETAIL_SEGMENT = re.compile(r"\d|[^/]{30,}")
+
+# Deeper pages are grouped with the pages of this depth
+MAX_DEPTH = 4
+
+# The smallest strata beyond this number are merged into OTHER_STRATUM
+MAX_STRATA = 20
+
+OTHER_STRATUM = "other"
+
+# Pages to analyse in every stratum before allocating by spread: the variance
+# of a stratum needs 2 of them
+MIN_STRATUM_SAMPLES = 2
+
+# Under this many values, the variance of a stratum is too unreliable to be
+# used alone, and the interval of the site too unreliable to stop sampling: the
+# usual rule of thumb of the normal approximation
+FEW_SAMPLES = 30
+
+
+def get_page_type(segments: list[str], query: str) -> str:
+    """home, listing, detail or page, guessed from the path and the query."""
+    if not segments:
+        return "home"
+    if query or LISTING_SEGMENTS.intersection(segment.lower() for segment in segments):
+        return "listing"
+    if DETAIL_SEGMENT.search(segments[-1]):
+        return "detail"
+
+    return "page"
+
+
+def get_stratum_variance(values: list[float], pooled_variance: float) -> float:
+    """
+    Variance of the values of a stratum, at least pooled_variance while they
+    are few or all equal: two equal scores do not make a constant stratum.
+    """
+    if len(values) < 2:
+        return pooled_variance
+
+    variance = statistics.variance(values)
+    if variance == 0 or len(values) < FEW_SAMPLES:
+        return max(variance, pooled_variance)
+
+    return variance
+
+
+def get_stratum_key(url: str) -> str:
+    """host/prefix|depth|page type of an url, the prefix being its first segment."""
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split("/") if segment]
+    prefix = segments[0] if len(segments) > 1 else ""
+    depth = min(len(segments), MAX_DEPTH)
+
+    return f"{parts.netloc}/{prefix}|{depth}|{get_page_type(segments, parts.query)}"
+
+
+class SamplingPlan:
+    """
+    Stratified random sample of the urls of a site, drawn round by round, and
+    estimate of the site metrics from the results of the sampled pages.
+
+    Urls are split into strata of similar pages (path prefix, depth and page
+    type). Each stratum first gets MIN_STRATUM_SAMPLES random pages, then the
+    pages are allocated in proportion to the size of the strata times their
+    spread (Neyman allocation), which spends the budget where it narrows the
+    confidence interval the most. Only the values of the metrics are kept.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        kind: AnalysisKind,
+        seed: int | None = None,
+        max_strata: int = MAX_STRATA,
+    ) -> None:
+        if max_strata < 1:
+            raise ValueError("max_strata must be at least 1")
+
+        self.kind = kind
+        self.metrics = SKETCHED_METRICS[kind]
+        self.primary_metric = PRIMARY_METRICS[kind]
+        self.sampled = 0
+        self.failed = 0
+        self.rounds = 0
+
+        seen: set[str] = set()
+        strata: dict[str, list[str]] = {}
+        for url in urls:
+            normalized = normalize_url(url)
+            if normalized is None or normalized[1] in seen:
+                continue
+            url, canonical_url, _ = normalized
+            seen.add(canonical_url)
+            strata.setdefault(get_stratum_key(canonical_url), []).append(url)
+        self.population = len(seen)
+
+        ordered = sorted(strata.items(), key=lambda item: len(item[1]), reverse=True)
+        if len(ordered) > max_strata:
+            others = [url for _, urls in ordered[max_strata - 1 :] for url in urls]
+            ordered = [*ordered[: max_strata - 1], (OTHER_STRATUM, others)]
+        self.strata = dict(ordered)
+
+        rng = random.Random(seed)
+        for stratum_urls in self.strata.values():
+            rng.shuffle(stratum_urls)
+
+        self._drawn = dict.fromkeys(self.strata, 0)
+        self._pending: dict[str, str] = {}
+        self._values = {
+            key: {metric: [] for metric in self.metrics} for key in self.strata
+        }
+
+    def draw(self, count: int) -> list[str]:
+        """Next count urls (fewer when the site is exhausted) to analyse."""
+        urls = []
+        for key, allocated in self._allocate(count).items():
+            start = self._drawn[key]
+            drawn = self.strata[key][start : start + allocated]
+            self._drawn[key] += len(drawn)
+            self._pending.update(dict.fromkeys(drawn, key))
+            urls.extend(drawn)
+        if urls:
+            self.rounds += 1
+
+        return urls
+
+    def add(self, url: str, result: dict | None) -> None:
+        """Record the result of a drawn url, None when its analysis failed."""
+        key = self._pending.pop(url, None)
+        if key is None:
+            return
+
+        self.sampled += 1
+        if result is None:
+            self.failed += 1
+            return
+
+        for metric in self.metrics:
+            value = result.get(metric)
+            if value is not None:
+                self._values[key][metric].append(value)
+
+    def estimate(self, confidence: float = 0.95) -> SampleEstimate:
+        """
+        Stratified estimate of the mean of each metric over the site.
+
+        The variance of a stratum with few or equal values is at least the
+        variance of all the values (see get_stratum_variance). Strata not
+        measured yet are given the mean of the others, their share of the site
+        adding the variance of all the values, as a stratum measured once.
+        """
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+
+        z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+        metrics = {}
+        for metric in self.metrics:
+            measured = {
+                key: values[metric]
+                for key, values in self._values.items()
+                if values[metric]
+            }
+            if not measured:
+                continue
+            pooled_variance = self._get_pooled_variance(metric)
+            covered = sum(len(self.strata[key]) for key in measured)
+
+            mean, variance = 0.0, 0.0
+            for key, values in measured.items():
+                size, samples = len(self.strata[key]), len(values)
+                mean += size / covered * statistics.fmean(values)
+                if samples < size:
+                    weight = size / self.population
+                    stratum_variance = get_stratum_variance(values, pooled_variance)
+                    # Finite population correction: a fully sampled stratum is exact
+                    variance += (
+                        weight**2 * (1 - samples / size) * stratum_variance / samples
+                    )
+            if covered < self.population:
+                variance += (1 - covered / self.population) ** 2 * pooled_variance
+
+            margin = z * math.sqrt(variance)
+            metrics[metric] = MetricEstimate(
+                mean=mean,
+                margin=margin,
+                low=mean - margin,
+                high=mean + margin,
+                samples=sum(len(values) for values in measured.values()),
+            )
+
+        return SampleEstimate(
+            population=self.population,
+            sampled=self.sampled,
+            failed=self.failed,
+            rounds=self.rounds,
+            confidence=confidence,
+            metrics=metrics,
+            strata=[
+                StratumSummary(key=key, size=len(urls), sampled=self._drawn[key])
+                for key, urls in self.strata.items()
+            ],
+        )
+
+    def has_enough_samples(self) -> bool:
+        """
+        Whether the interval of the primary metric can be trusted to stop: every
+        stratum has MIN_STRATUM_SAMPLES values or no url left, and the whole
+        site FEW_SAMPLES values or no url left.
+        """
+        measured = 0
+        for key, urls in self.strata.items():
+            values = len(self._values[key][self.primary_metric])
+            measured += values
+            if values < MIN_STRATUM_SAMPLES and self._drawn[key] < len(urls):
+                return False
+
+        return measured >= FEW_SAMPLES or sum(self._drawn.values()) == self.population
+
+    def _allocate(self, count: int) -> dict[str, int]:
+        remaining = {
+            key: len(urls) - self._drawn[key]
+            for key, urls in self.strata.items()
+            if len(urls) > self._drawn[key]
+        }
+        allocation = dict.fromkeys(remaining, 0)
+
+        # Every stratum first gets enough values to estimate its variance,
+        # failed analyses being drawn again, biggest strata first when the
+        # count is too small for all of them
+        for key in remaining:
+            measured = len(self._values[key][self.primary_metric])
+            missing = min(MIN_STRATUM_SAMPLES - measured, remaining[key], count)
+            if missing > 0:
+                allocation[key] += missing
+                count -= missing
+
+        # Then one page at a time to the stratum furthest below its share of
+        # the whole sample, shares being proportional to size times spread
+        pooled_variance = self._get_pooled_variance(self.primary_metric)
+        weights = {key: len(self.strata[key]) for key in remaining}
+        if 0 < pooled_variance < math.inf:
+            for key in remaining:
+                values = self._values[key][self.primary_metric]
+                weights[key] *= math.sqrt(get_stratum_variance(values, pooled_variance))
+        heap = [
+            (-weight / (self._drawn[key] + allocation[key] + 1), key)
+            for key, weight in weights.items()
+            if weight and allocation[key] < remaining[key]
+        ]
+        heapq.heapify(heap)
+        while count > 0 and heap:
+            _, key = heapq.heappop(heap)
+            allocation[key] += 1
+            count -= 1
+            if allocation[key] < remaining[key]:
+                priority = -weights[key] / (self._drawn[key] + allocation[key] + 1)
+                heapq.heappush(heap, (priority, key))
+
+        return {key: allocated for key, allocated in allocation.items() if allocated}
+
+    def _get_pooled_variance(self, metric: str) -> float:
+        """Variance of all the values of the metric, inf under 2 values."""
+        values = [value for values in self._values.values() for value in values[metric]]
+
+        return statistics.variance(values) if len(values) > 1 else math.inf
+
+
+async def run_sampling(
+    plan: SamplingPlan,
+    analyser: Analyser,
+    budget: int,
+    margin: float,
+    round_size: int = 50,
+    concurrency: int = 4,
+    per_host: int = 2,
+    per_host_delay: float = 0.5,
+    confidence: float = 0.95,
+    on_item: Callable[[BatchItem], None] | None = None,
+) -> SampleEstimate:
+    """
+    Analyse rounds of round_size sampled urls until the confidence interval of
+    the primary metric is within ± margin, every stratum being measured, or
+    budget urls are analysed.
+    """
+    if round_size < 1:
+        raise ValueError("round_size must be at least 1")
+
+    estimate = plan.estimate(confidence)
+    while plan.sampled < budget:
+        urls = plan.draw(min(round_size, budget - plan.sampled))
+        if not urls:
+            break
+
+        frontier = UrlFrontier(
+            per_host_concurrency=per_host, per_host_delay=per_host_delay
+        )
+        frontier.extend(urls)
+        async for item in run_frontier_batch(
+            frontier, analyser, plan.kind, concurrency
+        ):
+            plan.add(item.url, item.result if item.status == "ok" else None)
+            if on_item is not None:
+                on_item(item)
+
+        estimate = plan.estimate(confidence)
+        primary = estimate.metrics.get(plan.primary_metric)
+        if primary is None:
+            continue
+        logger.info(
+            "Échantillonnage, tour %s : %s pages sur %s, %s = %.2f ± %.2f",
+            plan.rounds,
+            plan.sampled,
+            plan.population,
+            plan.primary_metric,
+            primary.mean,
+            primary.margin,
+        )
+        if primary.margin <= margin and plan.has_enough_samples():
+            break
+
+    return estimate
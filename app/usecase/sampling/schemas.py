@@ -0,0 +1,68 @@
+from pydantic import BaseModel
+
+
+class MetricEstimate(BaseModel):
+    """
+    Attributes
+    ----------
+    mean : float
+        Estimated mean of the metric over all the pages of the site
+    margin : float
+        Half width of the confidence interval, inf while it cannot be estimated
+    low, high : float
+        Bounds of the confidence interval, mean ∓ margin
+    samples : int
+        Number of pages measured
+    """
+
+    mean: float
+    margin: float
+    low: float
+    high: float
+    samples: int
+
+
+class StratumSummary(BaseModel):
+    """
+    Attributes
+    ----------
+    key : str
+        Path prefix, depth and page type shared by the urls of the stratum
+    size : int
+        Number of urls of the stratum
+    sampled : int
+        Number of urls of the stratum analysed
+    """
+
+    key: str
+    size: int
+    sampled: int
+
+
+class SampleEstimate(BaseModel):
+    """
+    Attributes
+    ----------
+    population : int
+        Number of distinct urls of the site
+    sampled : int
+        Number of urls analysed, failed ones included
+    failed : int
+        Number of analyses in error
+    rounds : int
+        Number of sampling rounds run
+    confidence : float
+        Confidence level of the intervals, 0.95 for 95 %
+    metrics : dict[str, MetricEstimate]
+        Site level estimate of each metric
+    strata : list[StratumSummary]
+        Strata of the site, biggest first
+    """
+
+    population: int
+    sampled: int = 0
+    failed: int = 0
+    rounds: int = 0
+    confidence: float
+    metrics: dict[str, MetricEstimate] = {}
+    strata: list[StratumSummary] = []
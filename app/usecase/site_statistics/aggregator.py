@@ -0,0 +1,136 @@
+from collections import Counter
+from collections.abc import Iterable
+
+from app.core.eco_index.schemas import Grade
+from app.core.statistics import QuantileSketch
+from app.usecase.site_statistics.schemas import MetricDistribution, SiteStatistics
+
+# Metrics whose distribution is followed, per kind of analysis
+SKETCHED_METRICS = {
+    "eco_index": ("score", "ges", "water", "size", "nodes", "requests"),
+    "insight": (
+        "performance",
+        "first_contentful_paint",
+        "largest_contentful_paint",
+        "total_blocking_time",
+        "speed_index",
+    ),
+    "network": ("total", "js", "css"),
+}
+
+# Centroids of the sketches: p50 and p90 within a fraction of a percent
+SKETCH_COMPRESSION = 200
+
+
+class SiteAggregator:
+    """
+    Site level statistics, updated page by page as the results arrive.
+
+    Each metric is summarized by a QuantileSketch and grades and bytes by
+    counters, so the memory does not grow with the number of pages. The
+    aggregates of parallel workers are combined with `merge`, or `to_dict` and
+    `from_dict` across processes.
+    """
+
+    def __init__(self, compression: int = SKETCH_COMPRESSION) -> None:
+        self.compression = compression
+        self.pages: Counter[str] = Counter()
+        self.grades: Counter[str] = Counter()
+        self.category_bytes: Counter[str] = Counter()
+        self.sketches: dict[str, QuantileSketch] = {}
+
+    def add(self, kind: str, result: dict) -> None:
+        """Add the result of an analysis, as written by the batch commands."""
+        if kind not in SKETCHED_METRICS:
+            return
+
+        self.pages[kind] += 1
+        for metric in SKETCHED_METRICS[kind]:
+            value = result.get(metric)
+            if value is not None:
+                self._get_sketch(metric).add(value)
+
+        if result.get("grade") is not None:
+            self.grades[result["grade"]] += 1
+        for category, metrics in (result.get("categories") or {}).items():
+            self.category_bytes[category] += metrics["total_size"]
+
+    def add_all(self, results: Iterable[tuple[str, dict]]) -> None:
+        for kind, result in results:
+            self.add(kind, result)
+
+    def merge(self, other: "SiteAggregator") -> None:
+        self.pages.update(other.pages)
+        self.grades.update(other.grades)
+        self.category_bytes.update(other.category_bytes)
+        for metric, sketch in other.sketches.items():
+            self._get_sketch(metric).merge(sketch)
+
+    def get_statistics(self) -> SiteStatistics:
+        total_bytes = sum(self.category_bytes.values())
+
+        return SiteStatistics(
+            pages=dict(self.pages),
+            metrics={
+                metric: MetricDistribution(
+                    count=sketch.count,
+                    mean=sketch.mean,
+                    min=sketch.min,
+                    p50=sketch.quantile(0.5),
+                    p90=sketch.quantile(0.9),
+                    max=sketch.max,
+                )
+                for metric, sketch in self.sketches.items()
+            },
+            grades={grade.value: self.grades[grade.value] for grade in Grade},
+            category_bytes=dict(self.category_bytes.most_common()),
+            category_share={
+                category: size / total_bytes
+                for category, size in self.category_bytes.most_common()
+                if total_bytes
+            },
+        )
+
+    def to_dict(self) -> dict:
+        """Plain JSON compatible state of the aggregator."""
+        return {
+            "compression": self.compression,
+            "pages": dict(self.pages),
+            "grades": dict(self.grades),
+            "category_bytes": dict(self.category_bytes),
+            "sketches": {
+                metric: {
+                    "count": sketch.count,
+                    "total": sketch.total,
+                    "min": sketch.min,
+                    "max": sketch.max,
+                    "centroids": sketch.get_centroids(),
+                }
+                for metric, sketch in self.sketches.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "SiteAggregator":
+        aggregator = cls(state["compression"])
+        aggregator.pages.update(state["pages"])
+        aggregator.grades.update(state["grades"])
+        aggregator.category_bytes.update(state["category_bytes"])
+        for metric, sketch in state["sketches"].items():
+            aggregator.sketches[metric] = QuantileSketch.from_centroids(
+                [tuple(centroid) for centroid in sketch["centroids"]],
+                count=sketch["count"],
+                total=sketch["total"],
+                min_value=sketch["min"],
+                max_value=sketch["max"],
+                compression=state["compression"],
+            )
+
+        return aggregator
+
+    def _get_sketch(self, metric: str) -> QuantileSketch:
+        sketch = self.sketches.get(metric)
+        if sketch is None:
+            sketch = self.sketches[metric] = QuantileSketch(self.compression)
+
+        return sketch
@@ -0,0 +1,49 @@
+from pydantic import BaseModel
+
+
+class MetricDistribution(BaseModel):
+    """
+    Attributes
+    ----------
+    count : int
+        Number of pages measured
+    mean : float
+    min : float
+    p50 : float
+        Median, approximated
+    p90 : float
+        90th percentile, approximated
+    max : float
+    """
+
+    count: int = 0
+    mean: float = 0
+    min: float = 0
+    p50: float = 0
+    p90: float = 0
+    max: float = 0
+
+
+class SiteStatistics(BaseModel):
+    """
+    Attributes
+    ----------
+    pages : dict[str, int]
+        Number of pages aggregated, per analysis kind
+    metrics : dict[str, MetricDistribution]
+        Distribution over the pages of each metric (score, size, nodes,
+        performance...)
+    grades : dict[str, int]
+        Number of pages per ecoindex grade, A to G
+    category_bytes : dict[str, float]
+        Bytes downloaded by all the pages, per category of resource
+        (MimetypeAggregation field)
+    category_share : dict[str, float]
+        Share of the bytes downloaded per category of resource, 0 to 1
+    """
+
+    pages: dict[str, int] = {}
+    metrics: dict[str, MetricDistribution] = {}
+    grades: dict[str, int] = {}
+    category_bytes: dict[str, float] = {}
+    category_share: dict[str, float] = {}
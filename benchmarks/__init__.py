@@ -0,0 +1,5 @@
+"""
+Offline benchmarks of the analyses, run against a local fixture web server.
+
+Usage: python -m benchmarks.run --help
+"""
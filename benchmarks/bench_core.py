@@ -0,0 +1,644 @@
+"""
+Benchmarks of the analyses: pure computations on synthetic data, and browser
+analyses against the fixture server.
+"""
+
+import asyncio
+import gc
+import io
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import tracemalloc
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+from app.adapter.logger.mylogger import MyJSONFormatter
+from app.adapter.logger.setup_logging import start_queue_listener
+from app.core.browser.processes import get_chromium_rss_kb
+from app.core.browser.profiles import (
+    DEFAULT_LAUNCH_PROFILE,
+    LAUNCH_PROFILES,
+    launch_browser,
+)
+from app.core.constants import LOGGING_CONFIG_PATH
+from app.core.eco_index import async_playwright
+from app.core.eco_index.computation import compute_ecoindex
+from app.core.eco_index.mime_categories import (
+    DEFAULT_CATEGORY,
+    get_mime_category,
+    get_resource_category,
+)
+from app.core.eco_index.requests_store import Requests, RequestsMode
+from app.core.eco_index.schemas import (
+    PageMetrics,
+    Result,
+    ScreenShot,
+    WebPage,
+    parse_url,
+)
+from app.core.eco_index.scraper import EcoindexScraper
+from app.core.eco_index.screenshots import (
+    SCREENSHOT_JPEG_QUALITY,
+    convert_screenshot_to_webp,
+    save_screenshot_as_webp,
+)
+from app.core.insight.schemas import InsightContent
+from app.core.inspect_network.count_requests import InspectNetWork
+from app.core.inspect_network.schemas import NetworkRequest
+from app.usecase.excel_completion.actions import create_excel_from_reports
+from app.usecase.excel_completion.files_infos import TEMPLATE_PATH
+from app.usecase.excel_completion.schemas import PageReport
+from app.usecase.run_diff.diff import diff_runs
+from app.usecase.site_statistics.aggregator import SiteAggregator
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.harness import BenchmarkResult, measure
+
+# Fixture pages of the browser benchmarks: (name, page parameters)
+FIXTURE_PAGES = (
+    ("light", {"nodes": 100, "requests": 10, "asset_kb": 5, "lazy": 0}),
+    ("heavy", {"nodes": 3000, "requests": 80, "asset_kb": 50, "lazy": 20}),
+)
+
+MIME_TYPES = (
+    "text/html",
+    "text/css",
+    "application/javascript",
+    "image/png",
+    "image/webp",
+    "image/svg+xml",
+    "font/woff2",
+    "application/json",
+    "video/mp4",
+)
+
+
+def make_mime_types(count: int, seed: int = 0) -> list[tuple[str, str]]:
+    """(mime type, url) of count resources, as varied as real HAR entries."""
+    rng = random.Random(seed)
+    variants = [
+        *MIME_TYPES,
+        *(f"{mime_type}; charset=utf-8" for mime_type in MIME_TYPES),
+        "Text/HTML; charset=UTF-8",
+        "application/x-javascript",
+        "application/vnd.ms-fontobject",
+        "application/octet-stream",
+        "",
+    ]
+    extensions = ("js", "css", "woff2", "png", "svg", "mp4", "json")
+
+    return [
+        (rng.choice(variants), f"https://example.com/{i}.{rng.choice(extensions)}")
+        for i in range(count)
+    ]
+
+
+def make_har(entries_count: int, seed: int = 0) -> dict:
+    """HAR log of entries_count requests of random mime types and sizes."""
+    rng = random.Random(seed)
+    entries = [
+        {
+            "request": {"url": f"https://example.com/asset/{i}"},
+            "response": {
+                "status": 200,
+                "content": {"mimeType": rng.choice(MIME_TYPES)},
+                "_transferSize": rng.randint(200, 200_000),
+            },
+        }
+        for i in range(entries_count)
+    ]
+
+    return {"log": {"entries": entries}}
+
+
+def make_report(i: int) -> PageReport:
+    url = f"https://example.com/page/{i}"
+
+    return PageReport(
+        url=url,
+        eco_index=Result(
+            url=url,
+            size=1500.5,
+            nodes=800,
+            requests=60,
+            grade="D",
+            score=42,
+            ges=2.16,
+            water=3.24,
+        ),
+        insight=InsightContent(
+            performance=80,
+            accessibility=95,
+            best_practices=100,
+            seo=90,
+            first_contentful_paint=1200,
+            largest_contentful_paint=2500,
+            total_blocking_time=150,
+            cumulative_layout_shift=0.02,
+            speed_index=1800,
+        ),
+        network=NetworkRequest(total=60, js=20, css=4),
+    )
+
+
+def bench_compute_ecoindex(iterations: int) -> BenchmarkResult:
+    rng = random.Random(0)
+    metrics = [
+        (rng.randint(0, 5000), rng.uniform(0, 10_000), rng.randint(0, 300))
+        for _ in range(1000)
+    ]
+
+    async def compute_all() -> None:
+        for nodes, size, requests in metrics:
+            await compute_ecoindex(nodes=nodes, size=size, requests=requests)
+
+    return measure("compute_ecoindex", compute_all, iterations, metrics=len(metrics))
+
+
+def bench_mime_categories(
+    iterations: int, count: int, cached: bool = True
+) -> BenchmarkResult:
+    resources = make_mime_types(count)
+    # Without the memoization, each call goes through the tables
+    get_category = get_mime_category if cached else get_mime_category.__wrapped__
+
+    def classify_all() -> None:
+        for mime_type, url in resources:
+            category = get_category(mime_type)
+            if category == DEFAULT_CATEGORY:
+                get_resource_category(mime_type, url)
+
+    return measure(
+        f"mime_categories[{'cached' if cached else 'uncached'}]",
+        classify_all,
+        iterations,
+        resources=count,
+    )
+
+
+def get_retained_bytes(func: Callable[[], object]) -> int:
+    """Memory allocated by func and still held once it returned."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return retained
+
+
+def bench_rescoring(iterations: int, rows_count: int) -> BenchmarkResult:
+    """
+    Score again rows_count stored page metrics of 500 distinct pages, and export
+    them as JSON rows with their host and path.
+    """
+    rng = random.Random(0)
+    rows = [
+        (
+            f"https://example.com/page/{rng.randrange(500)}",
+            PageMetrics(
+                nodes=rng.randint(0, 5000),
+                size=rng.uniform(0, 10_000),
+                requests=rng.randint(0, 300),
+            ),
+        )
+        for _ in range(rows_count)
+    ]
+    date = datetime(2024, 1, 1)
+
+    async def rescore_all() -> None:
+        for url, page_metrics in rows:
+            ecoindex = await compute_ecoindex(
+                nodes=page_metrics.nodes,
+                size=page_metrics.size,
+                requests=page_metrics.requests,
+            )
+            result = Result.from_analysis(
+                WebPage(url=url), page_metrics, ecoindex, date
+            )
+            row = result.model_dump(mode="json")
+            row["host"], row["path"] = result.get_url_host(), result.get_url_path()
+
+    return measure(
+        f"rescoring[{rows_count}]",
+        rescore_all,
+        iterations,
+        setup=parse_url.cache_clear,
+        rows=rows_count,
+    )
+
+
+def bench_har_parsing(
+    iterations: int, entries_count: int, mode: RequestsMode = "all"
+) -> BenchmarkResult:
+    scraper = EcoindexScraper(url="https://example.com")
+    Path(scraper.har_temp_file_path).write_text(
+        json.dumps(make_har(entries_count)), encoding="utf-8"
+    )
+
+    def setup() -> None:
+        scraper.all_requests = Requests(mode)
+
+    def parse() -> None:
+        setup()
+        asyncio.run(scraper.get_requests_from_har_file())
+
+    name = f"get_requests_from_har_file[{entries_count}]"
+    if mode != "all":
+        name = f"get_requests_from_har_file[{entries_count} {mode}]"
+
+    try:
+        result = measure(
+            name,
+            scraper.get_requests_from_har_file,
+            iterations,
+            setup=setup,
+            entries=entries_count,
+            mode=mode,
+        )
+        # Memory kept by the requests of the page, once the HAR is released
+        result.metrics = {
+            "bytes_per_request": get_retained_bytes(parse) / entries_count
+        }
+        return result
+    finally:
+        scraper.remove_har_file()
+
+
+def make_result_lines(count: int, seed: int = 0) -> list[str]:
+    """JSONL lines of a batch of count eco_index analyses."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        score = rng.uniform(0, 100)
+        item = {
+            "url": f"https://example.com/page/{i}",
+            "kind": "eco_index",
+            "status": "ok",
+            "duration": rng.uniform(1, 10),
+            "result": {
+                "width": 1920,
+                "height": 1080,
+                "url": f"https://example.com/page/{i}",
+                "size": rng.uniform(0, 10_000),
+                "nodes": rng.randint(0, 5000),
+                "requests": rng.randint(0, 300),
+                "grade": "ABCDEFG"[min(6, int((100 - score) / 15))],
+                "score": score,
+                "ges": rng.uniform(1, 3),
+                "water": rng.uniform(1, 5),
+                "date": "2024-01-01T00:00:00",
+                "page_type": None,
+            },
+            "error": None,
+            "timings": {"goto": 1.5, "load_state": 0.5, "har_parsing": 0.01},
+        }
+        lines.append(json.dumps(item))
+
+    return lines
+
+
+def bench_run_diff(iterations: int, count: int) -> BenchmarkResult:
+    """Compare two runs of count pages, one page in ten having changed."""
+    baseline = make_result_lines(count)
+    current = [
+        line if i % 10 else new_line
+        for i, (line, new_line) in enumerate(
+            zip(baseline, make_result_lines(count, seed=1), strict=True)
+        )
+    ]
+
+    return measure(
+        f"run_diff[{count}]",
+        lambda: diff_runs(baseline, current),
+        iterations,
+        pages=count,
+    )
+
+
+def bench_site_statistics(iterations: int, count: int) -> BenchmarkResult:
+    """Aggregate the eco_index results of count pages, by 4 merged workers."""
+    results = [json.loads(line)["result"] for line in make_result_lines(count)]
+    for result in results:
+        result["categories"] = {
+            "image": {"total_count": 10, "total_size": result["size"] * 600},
+            "javascript": {"total_count": 5, "total_size": result["size"] * 400},
+        }
+
+    def aggregate() -> None:
+        parts = [SiteAggregator() for _ in range(4)]
+        for i, result in enumerate(results):
+            parts[i % 4].add("eco_index", result)
+        for part in parts[1:]:
+            parts[0].merge(part)
+        parts[0].get_statistics()
+
+    return measure(f"site_statistics[{count}]", aggregate, iterations, pages=count)
+
+
+def make_screenshot(image_format: str) -> bytes:
+    """A 1920x1080 screenshot like capture, encoded in image_format."""
+    image = Image.effect_mandelbrot((1920, 1080), (-2, -1.2, 1, 1.2), 100)
+    buffer = io.BytesIO()
+    image.convert("RGB").save(
+        buffer, format=image_format, quality=SCREENSHOT_JPEG_QUALITY
+    )
+
+    return buffer.getvalue()
+
+
+def bench_screenshot_png_file(iterations: int) -> BenchmarkResult:
+    # Disk round trip: full resolution PNG written, read back, converted, removed
+    png = make_screenshot("png")
+    screenshot = ScreenShot(id="benchmark-png", folder=tempfile.gettempdir())
+
+    def setup() -> None:
+        Path(screenshot.get_png()).write_bytes(png)
+
+    try:
+        return measure(
+            "screenshot[png_file]",
+            lambda: convert_screenshot_to_webp(screenshot),
+            iterations,
+            setup=setup,
+        )
+    finally:
+        Path(screenshot.get_webp()).unlink(missing_ok=True)
+
+
+def bench_screenshot_in_memory(iterations: int, concurrency: int) -> BenchmarkResult:
+    """concurrency screenshots converted at once, as in a batch run."""
+    jpeg = make_screenshot("jpeg")
+    screenshots = [
+        ScreenShot(id=f"benchmark-{i}", folder=tempfile.gettempdir())
+        for i in range(concurrency)
+    ]
+
+    async def convert_all() -> None:
+        await asyncio.gather(
+            *(save_screenshot_as_webp(jpeg, screenshot) for screenshot in screenshots)
+        )
+
+    try:
+        return measure(
+            f"screenshot[in_memory x{concurrency}]",
+            convert_all,
+            iterations,
+            concurrency=concurrency,
+        )
+    finally:
+        for screenshot in screenshots:
+            Path(screenshot.get_webp()).unlink(missing_ok=True)
+
+
+def get_json_formatter() -> MyJSONFormatter:
+    config = json.loads(LOGGING_CONFIG_PATH.read_text(encoding="utf-8"))
+
+    return MyJSONFormatter(fmt_keys=config["formatters"]["json"]["fmt_keys"])
+
+
+def bench_json_formatter(iterations: int, records_count: int) -> BenchmarkResult:
+    formatter = get_json_formatter()
+    records = [
+        logging.LogRecord(
+            "benchmark",
+            logging.INFO,
+            __file__,
+            i,
+            "Analyse de la page %s ...",
+            (f"https://example.com/page/{i}",),
+            None,
+        )
+        for i in range(records_count)
+    ]
+
+    def format_all() -> None:
+        for record in records:
+            formatter.format(record)
+
+    return measure(
+        "logging[json_formatter]", format_all, iterations, records=records_count
+    )
+
+
+def bench_logging_calls(
+    iterations: int, records_count: int, use_queue: bool
+) -> BenchmarkResult:
+    """Time spent in logger.info by the logging thread, with a JSON file handler."""
+    output_path = Path(tempfile.gettempdir()) / "benchmark-ecodesign-log.jsonl"
+    handler = logging.FileHandler(output_path, encoding="utf-8")
+    handler.setFormatter(get_json_formatter())
+    logger = logging.getLogger(f"benchmark.{'queue' if use_queue else 'direct'}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    listener = start_queue_listener(logger) if use_queue else None
+
+    def log_all() -> None:
+        for i in range(records_count):
+            logger.info("Analyse de la page %s ...", i)
+
+    try:
+        return measure(
+            f"logging[{'queue' if use_queue else 'direct'}_file_handler]",
+            log_all,
+            iterations,
+            records=records_count,
+        )
+    finally:
+        if listener is not None:
+            listener.stop()
+        for logger_handler in list(logger.handlers):
+            logger.removeHandler(logger_handler)
+        handler.close()
+        output_path.unlink(missing_ok=True)
+
+
+def bench_excel(iterations: int, pages_count: int) -> BenchmarkResult:
+    reports = [make_report(i) for i in range(pages_count)]
+    output_path = Path(tempfile.gettempdir()) / "benchmark-ecodesign.xlsx"
+
+    def create_excel() -> None:
+        create_excel_from_reports(TEMPLATE_PATH, str(output_path), reports)
+
+    try:
+        return measure(
+            "create_excel_from_reports", create_excel, iterations, pages=pages_count
+        )
+    finally:
+        output_path.unlink(missing_ok=True)
+
+
+def bench_startup(
+    iterations: int, server: FixtureServer, profile: str
+) -> BenchmarkResult:
+    """
+    Time from launching chromium with the profile to the end of the first
+    navigation, and memory of the browser then. The ecoindex measured on the
+    heavy fixture page is kept in the metrics, to check that the profile does
+    not change it.
+    """
+    light_url = server.page_url(**FIXTURE_PAGES[0][1])
+    heavy_url = server.page_url(**FIXTURE_PAGES[-1][1])
+    rss_kb: list[int] = []
+
+    async def first_navigation() -> None:
+        async with async_playwright() as p:
+            browser = await launch_browser(p, profile)
+            try:
+                page = await browser.new_page()
+                await page.goto(light_url)
+                rss_kb.append(await asyncio.to_thread(get_chromium_rss_kb, os.getpid()))
+            finally:
+                await browser.close()
+
+    result = measure(
+        f"startup[{profile}]", first_navigation, iterations, profile=profile
+    )
+
+    eco_index = asyncio.run(
+        EcoindexScraper(
+            url=heavy_url,
+            wait_before_scroll=0,
+            wait_after_scroll=0.2,
+            launch_profile=profile,
+        ).get_page_analysis()
+    )
+    result.metrics = {
+        "chromium_rss_kb": statistics.median(rss_kb),
+        "ecoindex_size": eco_index.size,
+        "ecoindex_nodes": eco_index.nodes,
+        "ecoindex_requests": eco_index.requests,
+    }
+
+    return result
+
+
+def get_ecoindex_differences(results: list[BenchmarkResult]) -> list[str]:
+    """Ecoindex metrics of the startup benchmarks differing from the default."""
+    startups = {
+        result.params["profile"]: result.metrics
+        for result in results
+        if result.name.startswith("startup[")
+    }
+    reference = startups.get(DEFAULT_LAUNCH_PROFILE)
+    if reference is None:
+        return []
+
+    return [
+        f"{profile} {metric}: {metrics.get(metric)} instead of {value}"
+        for profile, metrics in startups.items()
+        for metric, value in reference.items()
+        if metric.startswith("ecoindex_") and metrics.get(metric) != value
+    ]
+
+
+async def get_chromium_error() -> str | None:
+    """Why chromium cannot be launched, None if it can."""
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch()
+            await browser.close()
+    except Exception as e:
+        return f"{type(e).__name__}: {str(e).splitlines()[0]}"
+
+    return None
+
+
+def bench_eco_index(
+    iterations: int, server: FixtureServer, name: str, page: dict
+) -> BenchmarkResult:
+    url = server.page_url(**page)
+
+    async def analyse() -> None:
+        await EcoindexScraper(
+            url=url, wait_before_scroll=0, wait_after_scroll=0.2
+        ).get_page_analysis()
+
+    return measure(f"eco_index[{name}]", analyse, iterations, **page)
+
+
+def bench_network(
+    iterations: int, server: FixtureServer, name: str, page: dict
+) -> BenchmarkResult:
+    url = server.page_url(**page)
+
+    def analyse() -> None:
+        InspectNetWork(url=url).get_result()
+
+    return measure(f"network[{name}]", analyse, iterations, **page)
+
+
+Benchmarks = Iterator[tuple[str, Callable[[], BenchmarkResult]]]
+
+
+def get_core_benchmarks(iterations: int) -> Benchmarks:
+    """Yield (name, benchmark) of the benchmarks running without a browser."""
+    yield "compute_ecoindex", lambda: bench_compute_ecoindex(iterations)
+    for count in (100, 1000):
+        yield (
+            f"get_requests_from_har_file[{count}]",
+            lambda count=count: bench_har_parsing(iterations, count),
+        )
+    for mode in ("no_urls", "summary"):
+        yield (
+            f"get_requests_from_har_file[1000 {mode}]",
+            lambda mode=mode: bench_har_parsing(iterations, 1000, mode),
+        )
+    yield "create_excel_from_reports", lambda: bench_excel(iterations, 20)
+    yield "rescoring[10000]", lambda: bench_rescoring(iterations, 10_000)
+    yield "run_diff[100000]", lambda: bench_run_diff(iterations, 100_000)
+    yield (
+        "site_statistics[100000]",
+        lambda: bench_site_statistics(iterations, 100_000),
+    )
+    for cached in (True, False):
+        yield (
+            f"mime_categories[{'cached' if cached else 'uncached'}]",
+            lambda cached=cached: bench_mime_categories(iterations, 1_000_000, cached),
+        )
+    yield "screenshot[png_file]", lambda: bench_screenshot_png_file(iterations)
+    yield "logging[json_formatter]", lambda: bench_json_formatter(iterations, 10_000)
+    for use_queue in (False, True):
+        yield (
+            f"logging[{'queue' if use_queue else 'direct'}_file_handler]",
+            lambda use_queue=use_queue: bench_logging_calls(
+                iterations, 10_000, use_queue
+            ),
+        )
+    for concurrency in (1, 4):
+        yield (
+            f"screenshot[in_memory x{concurrency}]",
+            lambda concurrency=concurrency: bench_screenshot_in_memory(
+                iterations, concurrency
+            ),
+        )
+
+
+def get_browser_benchmarks(iterations: int, server: FixtureServer) -> Benchmarks:
+    """Yield (name, benchmark) of the analyses of the fixture pages."""
+    for name, page in FIXTURE_PAGES:
+        yield (
+            f"eco_index[{name}]",
+            lambda name=name, page=page: bench_eco_index(
+                iterations, server, name, page
+            ),
+        )
+        yield (
+            f"network[{name}]",
+            lambda name=name, page=page: bench_network(iterations, server, name, page),
+        )
+    for profile in LAUNCH_PROFILES:
+        yield (
+            f"startup[{profile}]",
+            lambda profile=profile: bench_startup(iterations, server, profile),
+        )
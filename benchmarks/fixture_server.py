@@ -0,0 +1,137 @@
+"""
+Local HTTP server generating pages of controlled weight, to benchmark the
+analyses without network access.
+
+A page is described by its query string:
+
+- nodes : number of <div> in the DOM
+- requests : number of assets (js, css and images in turn)
+- asset_kb : weight of each asset, in KB
+- lazy : number of extra nodes appended when the page is scrolled, plus as many
+  lazy loaded images
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+ASSET_TYPES = (
+    ("js", "application/javascript"),
+    ("css", "text/css"),
+    ("png", "image/png"),
+)
+
+# Smallest valid PNG, padded to the requested weight
+PNG_HEADER = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6300010000000500010d0a2db40000"
+    "000049454e44ae426082"
+)
+
+
+def render_page(nodes: int, requests: int, asset_kb: int, lazy: int) -> str:
+    assets = []
+    for i in range(requests):
+        extension, _ = ASSET_TYPES[i % len(ASSET_TYPES)]
+        src = f"/asset/{i}.{extension}?kb={asset_kb}"
+        if extension == "js":
+            assets.append(f'<script src="{src}"></script>')
+        elif extension == "css":
+            assets.append(f'<link rel="stylesheet" href="{src}">')
+        else:
+            assets.append(f'<img src="{src}" alt="">')
+
+    lazy_images = "".join(
+        f'<img loading="lazy" src="/asset/lazy-{i}.png?kb={asset_kb}" alt="">'
+        for i in range(lazy)
+    )
+    lazy_script = (
+        "<script>window.addEventListener('scroll', () => {"
+        f"for (let i = 0; i < {lazy}; i++) "
+        "document.body.appendChild(document.createElement('p'));"
+        "}, { once: true });</script>"
+    )
+
+    return (
+        "<!DOCTYPE html><html><head><title>fixture</title></head><body>"
+        + "".join(assets)
+        + "<div>x</div>" * nodes
+        + '<div style="height: 3000px"></div>'
+        + lazy_images
+        + (lazy_script if lazy else "")
+        + "</body></html>"
+    )
+
+
+def render_asset(path: str, asset_kb: int) -> tuple[str, bytes]:
+    extension = path.rsplit(".", 1)[-1]
+    content_type = dict(ASSET_TYPES).get(extension, "application/octet-stream")
+    size = asset_kb * 1000
+
+    if extension == "png":
+        return content_type, PNG_HEADER + b"\0" * max(0, size - len(PNG_HEADER))
+
+    return content_type, b"/*" + b" " * max(0, size - 4) + b"*/"
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {key: int(values[0]) for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/page":
+            body = render_page(
+                nodes=query.get("nodes", 100),
+                requests=query.get("requests", 10),
+                asset_kb=query.get("asset_kb", 10),
+                lazy=query.get("lazy", 0),
+            ).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+        elif url.path.startswith("/asset/"):
+            content_type, body = render_asset(url.path, query.get("kb", 10))
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=3600")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_url(
+        self, nodes: int = 100, requests: int = 10, asset_kb: int = 10, lazy: int = 0
+    ) -> str:
+        query = urlencode(
+            {"nodes": nodes, "requests": requests, "asset_kb": asset_kb, "lazy": lazy}
+        )
+        return f"{self.base_url}/page?{query}"
+
+
+@contextmanager
+def fixture_server(host: str = "127.0.0.1", port: int = 0) -> Iterator[FixtureServer]:
+    """Serve fixture pages in a background thread, on a free port by default."""
+    server = FixtureServer((host, port), FixtureRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,171 @@
+"""
+Measure the throughput and the memory of a benchmarked function, and compare
+the results of two runs.
+"""
+
+import asyncio
+import inspect
+import json
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from app.core.statistics import percentile
+
+RESULTS_FOLDER = Path(__file__).parent / "results"
+
+
+class BenchmarkResult(BaseModel):
+    """
+    Attributes
+    ----------
+    name : str
+        Name of the benchmark
+    params : dict
+        Parameters of the benchmark (fixture page, number of entries...)
+    iterations : int
+        Number of timed runs
+    total, mean, p50, p95 : float
+        Durations of the runs. Unit : s
+    ops_per_s : float
+        Runs per second
+    cpu_mean : float
+        CPU time of the process (all threads) per run. Unit : s
+    peak_memory_kb : float
+        Peak of the python memory allocated by one run. Unit : KB
+    metrics : dict[str, float]
+        Other measures specific to the benchmark (chromium memory, ecoindex...)
+    """
+
+    name: str
+    params: dict = {}
+    iterations: int
+    total: float
+    mean: float
+    p50: float
+    p95: float
+    ops_per_s: float
+    cpu_mean: float = 0
+    peak_memory_kb: float
+    metrics: dict[str, float] = {}
+
+
+class BenchmarkReport(BaseModel):
+    created_at: datetime = Field(default_factory=datetime.now)
+    python: str = Field(default_factory=platform.python_version)
+    results: list[BenchmarkResult] = []
+    skipped: dict[str, str] = {}
+
+
+def measure(
+    name: str,
+    func: Callable,
+    iterations: int = 10,
+    setup: Callable[[], None] | None = None,
+    **params,
+) -> BenchmarkResult:
+    """
+    Time iterations runs of func, sync or async, after an untimed warm up run.
+
+    setup, if given, is called before each run and is not timed. The memory peak
+    is measured on a separate run, tracemalloc slowing down the timed ones.
+    """
+    loop = asyncio.new_event_loop()
+
+    def run_once() -> float:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        if inspect.isawaitable(result):
+            loop.run_until_complete(result)
+        return time.perf_counter() - start
+
+    try:
+        run_once()
+        cpu_start = time.process_time()
+        durations = [run_once() for _ in range(iterations)]
+        cpu_total = time.process_time() - cpu_start
+
+        tracemalloc.start()
+        try:
+            run_once()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        loop.close()
+
+    total = sum(durations)
+
+    return BenchmarkResult(
+        name=name,
+        params=params,
+        iterations=iterations,
+        total=total,
+        mean=total / iterations,
+        p50=percentile(durations, 50),
+        p95=percentile(durations, 95),
+        ops_per_s=iterations / total if total else 0,
+        cpu_mean=cpu_total / iterations,
+        peak_memory_kb=peak / 1000,
+    )
+
+
+def save_report(report: BenchmarkReport, path: Path | str | None = None) -> Path:
+    if path is None:
+        RESULTS_FOLDER.mkdir(exist_ok=True)
+        path = RESULTS_FOLDER / f"{report.created_at:%Y-%m-%d-%H-%M-%S}.json"
+
+    path = Path(path)
+    path.write_text(report.model_dump_json(indent=2), encoding="utf-8")
+
+    return path
+
+
+def load_report(path: Path | str) -> BenchmarkReport:
+    return BenchmarkReport(**json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+class Regression(BaseModel):
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    ratio: float
+
+
+def compare_reports(
+    baseline: BenchmarkReport, current: BenchmarkReport, threshold: float = 0.2
+) -> list[Regression]:
+    """
+    List the benchmarks whose mean duration or memory peak grew by more than
+    threshold (0.2 = +20%) since the baseline.
+    """
+    baseline_results = {result.name: result for result in baseline.results}
+    regressions = []
+
+    for result in current.results:
+        previous = baseline_results.get(result.name)
+        if previous is None:
+            continue
+
+        for metric in ("mean", "peak_memory_kb"):
+            before, after = getattr(previous, metric), getattr(result, metric)
+            if before > 0 and after / before > 1 + threshold:
+                regressions.append(
+                    Regression(
+                        name=result.name,
+                        metric=metric,
+                        baseline=before,
+                        current=after,
+                        ratio=after / before,
+                    )
+                )
+
+    return regressions
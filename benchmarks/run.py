@@ -0,0 +1,86 @@
+"""
+Run the benchmark suite offline and save its results, optionally compared to a
+previous run.
+
+    python -m benchmarks.run --iterations 10 --compare benchmarks/results/base.json
+"""
+
+import asyncio
+
+import typer
+
+from benchmarks.bench_core import (
+    get_browser_benchmarks,
+    get_chromium_error,
+    get_core_benchmarks,
+    get_ecoindex_differences,
+)
+from benchmarks.fixture_server import fixture_server
+from benchmarks.harness import (
+    BenchmarkReport,
+    compare_reports,
+    load_report,
+    save_report,
+)
+
+app = typer.Typer()
+
+
+@app.command()
+def run(
+    iterations: int = typer.Option(10, help="Timed runs of each benchmark"),
+    only: str = typer.Option("", help="Run only the benchmarks containing this"),
+    browser: bool = typer.Option(True, help="Run the chromium benchmarks"),
+    output: str | None = typer.Option(None, help="Results file, default in results/"),
+    compare: str | None = typer.Option(None, help="Previous results to compare to"),
+    threshold: float = typer.Option(0.2, help="Tolerated slowdown, 0.2 = +20%"),
+):
+    report = BenchmarkReport()
+
+    with fixture_server() as server:
+        benchmarks = list(get_core_benchmarks(iterations))
+        browser_benchmarks = list(get_browser_benchmarks(iterations, server))
+        chromium_error = (
+            asyncio.run(get_chromium_error()) if browser else "--no-browser"
+        )
+        if chromium_error is None:
+            benchmarks += browser_benchmarks
+        else:
+            for name, _ in browser_benchmarks:
+                report.skipped[name] = chromium_error
+
+        for name, benchmark in benchmarks:
+            if only not in name:
+                continue
+            result = benchmark()
+            report.results.append(result)
+            typer.echo(
+                f"{name}: mean {result.mean * 1000:.2f} ms, p95 {result.p95 * 1000:.2f}"
+                f" ms, {result.ops_per_s:.1f} ops/s, cpu {result.cpu_mean * 1000:.2f} ms,"
+                f" peak {result.peak_memory_kb:.0f} KB"
+            )
+            for metric, value in result.metrics.items():
+                typer.echo(f"    {metric}: {value:g}")
+
+    for difference in get_ecoindex_differences(report.results):
+        typer.secho(f"Ecoindex différent : {difference}", fg=typer.colors.YELLOW)
+
+    for name, reason in report.skipped.items():
+        typer.echo(f"{name}: ignoré ({reason})")
+
+    typer.echo(f"Résultats : {save_report(report, output)}")
+
+    if compare is not None:
+        regressions = compare_reports(load_report(compare), report, threshold)
+        for regression in regressions:
+            typer.secho(
+                f"{regression.name} {regression.metric}: {regression.baseline:.4g}"
+                f" -> {regression.current:.4g} (x{regression.ratio:.2f})",
+                fg=typer.colors.RED,
+            )
+        if regressions:
+            raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
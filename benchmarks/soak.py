@@ -0,0 +1,285 @@
+"""
+Endurance run: drive many analyses against the fixture pages while sampling the
+resources of the process, and fail when one of them keeps growing.
+
+    python -m benchmarks.soak --analyses 20000 --concurrency 4 --samples soak.jsonl
+
+Sampled resources (Linux, read from /proc):
+
+- python_rss_kb : resident memory of this process
+- chromium_processes, chromium_rss_kb : chromium processes descending from this
+  process, and their resident memory
+- open_fds : file descriptors opened by this process
+- temp_files, temp_kb : files of the temporary directory (HAR files, playwright
+  artifacts...)
+"""
+
+import asyncio
+import itertools
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import typer
+from pydantic import BaseModel
+
+from app.core.browser.pool import BrowserPool
+from app.core.browser.processes import (
+    PROC,
+    get_descendants,
+    is_chromium,
+    read_rss_kb,
+)
+from app.usecase.batch_analysis.analysers import analyse_eco_index, analyse_network
+from app.usecase.batch_analysis.runner import BatchStats, run_batch
+from app.usecase.batch_analysis.schemas import Analyser, AnalysisKind
+from benchmarks.bench_core import FIXTURE_PAGES
+from benchmarks.fixture_server import fixture_server
+
+
+class ResourceSample(BaseModel):
+    elapsed: float
+    analyses: int
+    python_rss_kb: int
+    chromium_processes: int
+    chromium_rss_kb: int
+    open_fds: int
+    temp_files: int
+    temp_kb: int
+
+
+class TrendLimit(BaseModel):
+    """
+    Largest growth tolerated over the run for a resource: max_growth in absolute
+    value, or max_ratio of the starting value, whichever is greater.
+    """
+
+    metric: str
+    max_growth: float
+    max_ratio: float = 0
+
+
+class Trend(BaseModel):
+    """
+    Attributes
+    ----------
+    metric : str
+        Sampled resource
+    start, end : float
+        Values of the linear fit of the samples at the start and end of the run
+    growth : float
+        end - start
+    limit : float
+        Largest growth tolerated
+    """
+
+    metric: str
+    start: float
+    end: float
+    growth: float
+    limit: float
+
+    @property
+    def is_leaking(self) -> bool:
+        return self.growth > self.limit
+
+
+DEFAULT_LIMITS = (
+    TrendLimit(metric="python_rss_kb", max_growth=50_000, max_ratio=0.2),
+    TrendLimit(metric="chromium_processes", max_growth=2),
+    TrendLimit(metric="chromium_rss_kb", max_growth=200_000, max_ratio=0.2),
+    TrendLimit(metric="open_fds", max_growth=10),
+    TrendLimit(metric="temp_files", max_growth=5),
+    TrendLimit(metric="temp_kb", max_growth=10_000),
+)
+
+
+def get_directory_usage(path: Path | str) -> tuple[int, int]:
+    """(files count, total size in KB) of a directory tree."""
+    files, size = 0, 0
+    for root, _, names in os.walk(path, onerror=lambda e: None):
+        for name in names:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+            files += 1
+
+    return files, size // 1024
+
+
+def sample_resources(elapsed: float = 0, analyses: int = 0) -> ResourceSample:
+    chromium_rss_kb, chromium_processes = 0, 0
+    for pid, name in get_descendants(os.getpid()).items():
+        if not is_chromium(name):
+            continue
+        try:
+            chromium_rss_kb += read_rss_kb(pid)
+        except OSError:
+            continue
+        chromium_processes += 1
+
+    temp_files, temp_kb = get_directory_usage(tempfile.gettempdir())
+
+    return ResourceSample(
+        elapsed=elapsed,
+        analyses=analyses,
+        python_rss_kb=read_rss_kb("self"),
+        chromium_processes=chromium_processes,
+        chromium_rss_kb=chromium_rss_kb,
+        open_fds=len(os.listdir(PROC / "self" / "fd")),
+        temp_files=temp_files,
+        temp_kb=temp_kb,
+    )
+
+
+def get_trends(
+    samples: list[ResourceSample],
+    limits: Iterable[TrendLimit] = DEFAULT_LIMITS,
+    warmup: float = 0.1,
+) -> list[Trend]:
+    """
+    Fit a line through the samples of each resource, skipping the first warmup
+    fraction of the run (browsers launch, caches fill), and compare its growth
+    to the limit.
+    """
+    samples = samples[int(len(samples) * warmup) :]
+    if len(samples) < 2:
+        return []
+
+    times = [sample.elapsed for sample in samples]
+    first, last = times[0], times[-1]
+    trends = []
+
+    for limit in limits:
+        values = [getattr(sample, limit.metric) for sample in samples]
+        if len(set(values)) == 1:
+            slope, intercept = 0.0, float(values[0])
+        else:
+            slope, intercept = statistics.linear_regression(times, values)
+        start, end = intercept + slope * first, intercept + slope * last
+        trends.append(
+            Trend(
+                metric=limit.metric,
+                start=start,
+                end=end,
+                growth=end - start,
+                limit=max(limit.max_growth, limit.max_ratio * start),
+            )
+        )
+
+    return trends
+
+
+async def sample_periodically(
+    interval: float,
+    stats: BatchStats,
+    on_sample: Callable[[ResourceSample], None],
+) -> None:
+    """Sample the resources every interval seconds, until cancelled."""
+    start = time.perf_counter()
+    while True:
+        elapsed = time.perf_counter() - start
+        analyses = stats.succeeded + stats.failed
+        on_sample(await asyncio.to_thread(sample_resources, elapsed, analyses))
+        await asyncio.sleep(interval)
+
+
+async def soak(
+    urls: list[str],
+    analyses: int,
+    kind: AnalysisKind,
+    concurrency: int,
+    browsers: int,
+    interval: float,
+    on_sample: Callable[[ResourceSample], None],
+) -> BatchStats:
+    """
+    Analyse the urls in turn until analyses are done, with browsers warm
+    browsers (0 to launch a browser per analysis).
+    """
+    analyse = analyse_eco_index if kind == "eco_index" else analyse_network
+    stats = BatchStats()
+    pool = BrowserPool(size=browsers) if browsers else None
+
+    async def analyse_with_pool(url: str) -> dict:
+        async with pool.acquire() as browser:
+            return await analyse(url, browser)
+
+    analyser: Analyser = analyse_with_pool if pool else analyse
+
+    if pool is not None:
+        await pool.start()
+    sampler = asyncio.create_task(sample_periodically(interval, stats, on_sample))
+    try:
+        todo = itertools.islice(itertools.cycle(urls), analyses)
+        async for item in run_batch(todo, analyser, kind, concurrency):
+            stats.add(item)
+    finally:
+        sampler.cancel()
+        await asyncio.gather(sampler, return_exceptions=True)
+        if pool is not None:
+            await pool.stop()
+
+    return stats
+
+
+app = typer.Typer()
+
+
+@app.command()
+def run(
+    analyses: int = typer.Option(20_000, help="Analyses to run"),
+    kind: str = typer.Option("eco_index", help="eco_index or network"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c"),
+    browsers: int = typer.Option(2, help="Warm browsers, 0 for one per analysis"),
+    interval: float = typer.Option(10, help="Seconds between two samples"),
+    samples: str | None = typer.Option(None, help="Write the samples to a JSONL"),
+    warmup: float = typer.Option(0.1, help="Fraction of the run ignored"),
+):
+    if kind not in ("eco_index", "network"):
+        raise typer.BadParameter("kind must be eco_index or network")
+
+    collected: list[ResourceSample] = []
+    samples_file = open(samples, "w", encoding="utf-8") if samples else None
+
+    def on_sample(sample: ResourceSample) -> None:
+        collected.append(sample)
+        if samples_file is not None:
+            samples_file.write(sample.model_dump_json() + "\n")
+            samples_file.flush()
+        typer.echo(sample.model_dump_json(), err=True)
+
+    try:
+        with fixture_server() as server:
+            # A missing page makes the analyses fail half way, which must not
+            # leak anything either
+            urls = [server.page_url(**page) for _, page in FIXTURE_PAGES]
+            urls.append(f"{server.base_url}/missing")
+            stats = asyncio.run(
+                soak(urls, analyses, kind, concurrency, browsers, interval, on_sample)
+            )
+    finally:
+        if samples_file is not None:
+            samples_file.close()
+
+    typer.echo(stats.get_summary().model_dump_json())
+
+    leaking = False
+    for trend in get_trends(collected, warmup=warmup):
+        typer.echo(
+            f"{trend.metric}: {trend.start:.0f} -> {trend.end:.0f}"
+            f" (growth {trend.growth:+.0f}, limit {trend.limit:.0f})"
+        )
+        leaking = leaking or trend.is_leaking
+
+    if leaking:
+        typer.secho("Resources keep growing", fg=typer.colors.RED)
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,226 @@
+"""
+Tests for the files adapter/logger/mylogger.py and adapter/logger/setup_logging.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import datetime as dt
+import json
+import logging
+
+from app.adapter.logger import mylogger
+from app.adapter.logger.mylogger import MyJSONFormatter, RateLimitFilter, log_context
+from app.adapter.logger.setup_logging import start_queue_listener
+from app.core.constants import LOGGING_CONFIG_PATH
+
+FMT_KEYS = {"level": "levelname", "message": "message", "line": "lineno"}
+
+
+def make_record(created: float = 1_700_000_000.25) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "test", logging.INFO, __file__, 12, "Analyse de la page %s", ("a",), None
+    )
+    record.created = created
+    record.url = "https://a.fr"
+
+    return record
+
+
+def test_json_formatter_outputs_fmt_keys_timestamp_and_extras():
+    """
+    Test that the JSON holds the fmt keys, the UTC timestamp and the extra fields.
+    """
+
+    # When
+    formatter = MyJSONFormatter(fmt_keys=FMT_KEYS)
+
+    # Then
+    result = json.loads(formatter.format(make_record()))
+
+    # Expected
+    excepted_result = {
+        "level": "INFO",
+        "message": "Analyse de la page a",
+        "line": 12,
+        "timestamp": "2023-11-14T22:13:20.250000+00:00",
+        "url": "https://a.fr",
+    }
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_json_formatter_output_does_not_depend_on_orjson(monkeypatch):
+    """
+    Test that the json module gives the same line as orjson, and encodes the
+    records orjson refuses, like an integer over 64 bits.
+    """
+
+    # When
+    formatter = MyJSONFormatter(fmt_keys=FMT_KEYS)
+    record = make_record()
+    record.url = "https://a.fr/déjà-vu"
+    big_record = make_record()
+    big_record.size = 2**70
+
+    # Then
+    result = [formatter.format(record), formatter.format(big_record)]
+    monkeypatch.setattr(mylogger, "orjson", None)
+    stdlib_result = [formatter.format(record), formatter.format(big_record)]
+
+    # Expected
+    excepted_result = stdlib_result
+
+    # Assert
+    assert result == excepted_result
+    assert '"url":"https://a.fr/déjà-vu"' in result[0]
+    assert json.loads(result[1])["size"] == 2**70
+
+
+def test_json_formatter_timestamp_matches_isoformat():
+    """
+    Test that the cached timestamp is the isoformat of the record date.
+    """
+
+    # When
+    formatter = MyJSONFormatter()
+    created_values = [1_700_000_000, 1_700_000_000.000001, 1_700_000_001.999999]
+
+    # Then
+    result = [
+        json.loads(formatter.format(make_record(created)))["timestamp"]
+        for created in created_values
+    ]
+
+    # Expected
+    excepted_result = [
+        dt.datetime.fromtimestamp(created, tz=dt.timezone.utc).isoformat()
+        for created in created_values
+    ]
+
+    # Assert
+    assert result == excepted_result
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def test_queue_listener_delivers_resolved_records():
+    """
+    Test that the handlers behind the queue get the message and the traceback.
+    """
+
+    # When
+    logger = logging.getLogger("test_queue_listener")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    listener = start_queue_listener(logger)
+
+    # Then
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Page %s en erreur", "a")
+    listener.stop()
+    logger.handlers.clear()
+    record = handler.records[0]
+
+    # Assert
+    assert record.getMessage() == "Page a en erreur"
+    assert "ValueError: boom" in record.exc_text
+
+
+def test_json_formatter_adds_the_log_context_fields():
+    """
+    Test that the fields of the log context are added, the record ones winning.
+    """
+
+    # When
+    formatter = MyJSONFormatter(fmt_keys=FMT_KEYS)
+
+    # Then
+    with log_context(url="https://b.fr", job_id="42"):
+        result = json.loads(formatter.format(make_record()))
+    outside = json.loads(formatter.format(make_record()))
+
+    # Assert
+    assert (result["url"], result["job_id"]) == ("https://a.fr", "42")
+    assert "job_id" not in outside
+
+
+def test_queue_listener_keeps_the_log_context_of_the_logging_task():
+    """
+    Test that the context fields survive the switch to the listener thread.
+    """
+
+    # When
+    logger = logging.getLogger("test_queue_context")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = ListHandler()
+    logger.addHandler(handler)
+    listener = start_queue_listener(logger)
+
+    # Then
+    with log_context(url="https://a.fr"):
+        logger.info("Analyse de la page")
+    listener.stop()
+    logger.handlers.clear()
+
+    # Assert
+    assert handler.records[0].url == "https://a.fr"
+
+
+def test_rate_limit_filter_collapses_repeated_records_into_a_count():
+    """
+    Test that records beyond the rate are dropped and counted, errors kept.
+    """
+
+    # When
+    rate_limit = RateLimitFilter(rate=2, interval=60)
+    warnings = [make_record() for _ in range(5)]
+    error = make_record()
+    error.levelno = logging.ERROR
+
+    # Then
+    result = [rate_limit.filter(record) for record in warnings]
+    rate_limit.interval = 0
+    next_record = make_record()
+    rate_limit.filter(next_record)
+
+    # Expected
+    excepted_result = [True, True, False, False, False]
+
+    # Assert
+    assert result == excepted_result
+    assert rate_limit.filter(error) is True
+    assert next_record.suppressed == 3
+
+
+def test_rate_limit_filter_only_applies_to_stderr():
+    """
+    Test that the JSON log, the audit trail, keeps every record: only stderr
+    is rate limited.
+    """
+
+    # When
+    config = json.loads(LOGGING_CONFIG_PATH.read_text())
+
+    # Then
+    result = {
+        name: handler.get("filters", []) for name, handler in config["handlers"].items()
+    }
+
+    # Expected
+    excepted_result = {"stderr": ["rate_limit"], "file_json": []}
+
+    # Assert
+    assert result == excepted_result
@@ -0,0 +1,63 @@
+"""
+Tests for the files benchmarks/harness.py and benchmarks/fixture_server.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import requests
+
+from benchmarks.fixture_server import fixture_server
+from benchmarks.harness import BenchmarkReport, compare_reports, measure
+
+
+def test_fixture_server_serves_pages_of_the_requested_weight():
+    """
+    Test that the fixture pages hold the requested nodes and assets.
+    """
+
+    # When
+    with fixture_server() as server:
+        page = requests.get(server.page_url(nodes=50, requests=3, asset_kb=2))
+        image = requests.get(f"{server.base_url}/asset/2.png?kb=2")
+
+    # Then
+    result = (page.text.count("<div>x</div>"), page.text.count("/asset/"))
+
+    # Expected
+    excepted_result = (50, 3)
+
+    # Assert
+    assert result == excepted_result
+    assert image.headers["Content-Type"] == "image/png"
+    assert len(image.content) == 2000
+
+
+def test_compare_reports_flags_slowdowns_beyond_threshold():
+    """
+    Test that only the benchmarks slower than the threshold are reported.
+    """
+
+    # When
+    fast = measure("fast", lambda: None, iterations=2)
+    baseline = BenchmarkReport(
+        results=[fast, fast.model_copy(update={"name": "stable"})]
+    )
+    current = BenchmarkReport(
+        results=[
+            fast.model_copy(update={"mean": fast.mean * 2}),
+            fast.model_copy(update={"name": "stable", "mean": fast.mean * 1.1}),
+        ]
+    )
+
+    # Then
+    result = [
+        (regression.name, regression.metric)
+        for regression in compare_reports(baseline, current, threshold=0.2)
+    ]
+
+    # Expected
+    excepted_result = [("fast", "mean")]
+
+    # Assert
+    assert result == excepted_result
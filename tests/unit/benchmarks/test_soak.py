@@ -0,0 +1,62 @@
+"""
+Tests for the file benchmarks/soak.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from benchmarks.soak import ResourceSample, TrendLimit, get_trends, sample_resources
+
+
+def make_samples(open_fds: list[int]) -> list[ResourceSample]:
+    return [
+        ResourceSample(
+            elapsed=i,
+            analyses=i * 10,
+            python_rss_kb=80_000,
+            chromium_processes=4,
+            chromium_rss_kb=300_000,
+            open_fds=fds,
+            temp_files=10,
+            temp_kb=100,
+        )
+        for i, fds in enumerate(open_fds)
+    ]
+
+
+def test_get_trends_flags_a_steady_growth():
+    """
+    Test that a resource growing at each sample is leaking, not a stable one.
+    """
+
+    # When
+    samples = make_samples([100, 20, 24, 28, 32, 36, 40, 44, 48, 52, 56])
+    limits = [
+        TrendLimit(metric="open_fds", max_growth=10),
+        TrendLimit(metric="chromium_processes", max_growth=2),
+    ]
+
+    # Then
+    result = {
+        trend.metric: (round(trend.growth), trend.is_leaking)
+        for trend in get_trends(samples, limits, warmup=0.1)
+    }
+
+    # Expected
+    excepted_result = {"open_fds": (36, True), "chromium_processes": (0, False)}
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_sample_resources_reads_the_current_process():
+    """
+    Test that the sample holds the memory and descriptors of the tests process.
+    """
+
+    # Then
+    result = sample_resources()
+
+    # Assert
+    assert result.python_rss_kb > 0
+    assert result.open_fds > 0
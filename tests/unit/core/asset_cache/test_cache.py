@@ -0,0 +1,178 @@
+"""
+Tests for the file core/asset_cache/cache.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.core.asset_cache.cache import AssetCache, AssetCacheSession
+from app.core.eco_index.scraper import EcoindexScraper
+
+PAGE_URL = "https://a.fr/"
+SCRIPT_URL = "https://a.fr/app.js"
+SCRIPT_BODY = b"console.log(1)" * 100
+
+# Sizes recorded in the HAR: the script downloaded gzipped by the browser, or
+# served decoded from the cache
+PAGE_SIZE, SCRIPT_SIZE, ROUTED_SCRIPT_SIZE = 5000, 420, 1480
+
+
+class FakeRoute:
+    """Route of a request, the browser downloading it when continued."""
+
+    def __init__(self, url: str, resource_type: str = "script") -> None:
+        self.request = SimpleNamespace(
+            url=url, method="GET", resource_type=resource_type
+        )
+        self.fulfilled: dict | None = None
+        self.continued = False
+
+    async def continue_(self) -> None:
+        self.continued = True
+
+    async def fulfill(self, **kwargs) -> None:
+        self.fulfilled = kwargs
+
+
+def make_response(url: str = SCRIPT_URL) -> SimpleNamespace:
+    async def body() -> bytes:
+        return SCRIPT_BODY
+
+    return SimpleNamespace(
+        url=url,
+        status=200,
+        headers={"Content-Encoding": "gzip", "Content-Type": "text/javascript"},
+        body=body,
+    )
+
+
+def load_page(session: AssetCacheSession) -> FakeRoute:
+    """Route the script of the page, answered by the server when continued."""
+    route = FakeRoute(SCRIPT_URL)
+    asyncio.run(session.handle_route(route))
+    if route.continued:
+        asyncio.run(session.handle_response(make_response()))
+
+    return route
+
+
+def write_har(path, script_size: int) -> str:
+    entries = [
+        {
+            "request": {"url": url},
+            "response": {
+                "status": 200,
+                "_transferSize": size,
+                "content": {"mimeType": mime_type},
+            },
+        }
+        for url, size, mime_type in (
+            (PAGE_URL, PAGE_SIZE, "text/html"),
+            (SCRIPT_URL, script_size, "text/javascript"),
+        )
+    ]
+    path.write_text(json.dumps({"log": {"entries": entries}}))
+
+    return str(path)
+
+
+def test_sessions_serve_repeated_assets_from_disk_with_their_cold_size(tmp_path):
+    """
+    Test that a second page gets the asset from the cache, measured at the
+    transfer size of its first download read in the HAR, and that documents
+    are not cached.
+    """
+
+    # When
+    cache = AssetCache(tmp_path)
+    first_page, second_page = cache.open_session(), cache.open_session()
+    document_route = FakeRoute(PAGE_URL, resource_type="document")
+
+    # Then
+    first_route = load_page(first_page)
+    first_size = first_page.get_transfer_size(SCRIPT_URL, SCRIPT_SIZE)
+    asyncio.run(first_page.store_new_assets())
+    second_route = load_page(second_page)
+    asyncio.run(second_page.handle_route(document_route))
+
+    # Assert
+    assert first_route.continued
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second_page.get_transfer_size(SCRIPT_URL, ROUTED_SCRIPT_SIZE) == first_size
+    assert second_route.fulfilled["body"] == SCRIPT_BODY
+    assert "content-encoding" not in second_route.fulfilled["headers"]
+    assert document_route.continued
+
+
+def test_page_size_is_the_same_with_and_without_the_cache(tmp_path):
+    """
+    Test that a page served from the cache is measured at the size of the same
+    page without cache, whatever the size of the routed responses in the HAR.
+    """
+
+    # When
+    cache = AssetCache(tmp_path / "cache")
+
+    def get_page_size(session: AssetCacheSession | None, script_size: int) -> float:
+        scraper = EcoindexScraper(PAGE_URL)
+        scraper.har_temp_file_path = write_har(tmp_path / "page.har", script_size)
+        scraper.asset_cache_session = session
+        if session is not None:
+            load_page(session)
+        asyncio.run(scraper.get_requests_from_har_file())
+        return scraper.all_requests.total_size
+
+    # Then
+    without_cache = get_page_size(None, SCRIPT_SIZE)
+    first_download = get_page_size(cache.open_session(), SCRIPT_SIZE)
+    from_cache = get_page_size(cache.open_session(), ROUTED_SCRIPT_SIZE)
+
+    # Assert
+    assert cache.hits == 1
+    assert without_cache == first_download == from_cache == PAGE_SIZE + SCRIPT_SIZE
+
+
+def test_new_assets_are_stored_once_the_har_is_read(tmp_path):
+    """
+    Test that reading the transfer sizes writes nothing to the disk, the new
+    assets being stored together by store_new_assets.
+    """
+
+    # When
+    cache = AssetCache(tmp_path)
+    session = cache.open_session()
+    load_page(session)
+
+    # Then
+    session.get_transfer_size(SCRIPT_URL, SCRIPT_SIZE)
+    before = cache.load(SCRIPT_URL)
+    asyncio.run(session.store_new_assets())
+    result = cache.load(SCRIPT_URL)
+
+    # Assert
+    assert before is None
+    assert result is not None
+    assert result[0].transfer_size == SCRIPT_SIZE
+
+
+def test_load_ignores_expired_entries(tmp_path):
+    """
+    Test that an entry older than max_age is downloaded again.
+    """
+
+    # When
+    cache = AssetCache(tmp_path, max_age=0)
+    session = cache.open_session()
+    load_page(session)
+    session.get_transfer_size(SCRIPT_URL, SCRIPT_SIZE)
+    asyncio.run(session.store_new_assets())
+
+    # Then
+    result = cache.load(SCRIPT_URL)
+
+    # Assert
+    assert result is None
@@ -0,0 +1,189 @@
+"""
+Tests for the file core/browser/pool.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+import os
+
+from app.core.browser import processes
+from app.core.browser.pool import BrowserPool, get_recycle_reason, has_memory_for_page
+from app.core.browser.schemas import RecyclePolicy
+
+POLICY = RecyclePolicy(
+    max_pages=3, max_rss_kb=1000, page_memory_kb=300, memory_reserve_kb=200
+)
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.connected = True
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def close(self) -> None:
+        self.connected = False
+
+
+class FakeBrowserPool(BrowserPool):
+    """Pool lending fake browsers, without playwright nor memory follow-up."""
+
+    async def start(self) -> None:
+        self._follows_memory = False
+        for _ in range(self.size):
+            browser = await self._launch()
+            self._browsers.append(browser)
+            self._idle.put_nowait(browser)
+
+    async def _launch(self) -> FakeBrowser:
+        return FakeBrowser()
+
+
+class FailingBrowserPool(FakeBrowserPool):
+    """Pool whose launches after the start fail `failures` times."""
+
+    def __init__(self, failures: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.launches = 0
+
+    async def _launch(self) -> FakeBrowser:
+        self.launches += 1
+        if self.launches > self.size and self.failures:
+            self.failures -= 1
+            raise RuntimeError("chromium crashed at launch")
+        return FakeBrowser()
+
+
+def test_get_recycle_reason():
+    """
+    Test that a browser is replaced when disconnected, too big or too used.
+    """
+
+    # Then
+    result = [
+        get_recycle_reason(False, 1, 10, POLICY),
+        get_recycle_reason(True, 1, 1000, POLICY),
+        get_recycle_reason(True, 3, 10, POLICY),
+        get_recycle_reason(True, 2, None, POLICY),
+    ]
+
+    # Expected
+    excepted_result = ["disconnected", "memory", "pages", None]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_has_memory_for_page_keeps_the_reserve():
+    """
+    Test that a page needs its memory plus the reserve to start.
+    """
+
+    # Assert
+    assert has_memory_for_page(500, POLICY)
+    assert not has_memory_for_page(499, POLICY)
+
+
+def test_browser_pool_recycles_browsers_after_max_pages():
+    """
+    Test that a browser is replaced after max_pages pages and counted.
+    """
+
+    # When
+    pool = FakeBrowserPool(size=1, policy=RecyclePolicy(max_pages=2))
+
+    async def use_pool() -> list[FakeBrowser]:
+        await pool.start()
+        browsers = []
+        for _ in range(3):
+            async with pool.acquire() as browser:
+                browsers.append(browser)
+        return browsers
+
+    # Then
+    first, second, third = asyncio.run(use_pool())
+
+    # Assert
+    assert first is second
+    assert third is not first
+    assert not first.is_connected()
+    assert pool.stats.pages == 3
+    assert pool.stats.recycled == {"pages": 1}
+
+
+def test_browser_pool_keeps_its_slot_when_a_relaunch_fails():
+    """
+    Test that a browser which cannot be replaced leaves an empty slot, launched
+    by the next acquire, instead of blocking a pool of one browser forever.
+    """
+
+    # When
+    policy = RecyclePolicy(max_pages=1, launch_attempts=2, launch_retry_delay=0)
+    pool = FailingBrowserPool(failures=4, size=1, policy=policy)
+
+    async def use_browser() -> FakeBrowser:
+        async with pool.acquire() as browser:
+            return browser
+
+    async def use_pool() -> list[FakeBrowser | str]:
+        await pool.start()
+        browsers: list[FakeBrowser | str] = []
+        for _ in range(3):
+            try:
+                browsers.append(await asyncio.wait_for(use_browser(), 1))
+            except RuntimeError as e:
+                browsers.append(str(e))
+        return browsers
+
+    # Then
+    first, second, third = asyncio.run(use_pool())
+
+    # Assert
+    assert isinstance(first, FakeBrowser)
+    assert second == "No browser could be launched"
+    assert isinstance(third, FakeBrowser)
+    assert pool.launches == 7
+    assert len(pool._browsers) == 1
+    assert pool._idle.qsize() == 1
+
+
+def test_browser_pool_gives_back_the_browser_of_a_cancelled_wait():
+    """
+    Test that a browser taken by an acquire cancelled while waiting for memory
+    goes back to the idle browsers.
+    """
+
+    # When
+    pool = FakeBrowserPool(size=1)
+
+    async def use_pool() -> FakeBrowser:
+        await pool.start()
+        pool._wait_for_memory = lambda: asyncio.sleep(10)
+        waiting = asyncio.create_task(pool.acquire().__aenter__())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        return pool._idle.get_nowait()
+
+    # Then
+    result = asyncio.run(use_pool())
+
+    # Assert
+    assert result is pool._browsers[0]
+
+
+def test_get_tree_rss_kb_counts_the_process_itself():
+    """
+    Test that the memory of a process tree includes the process.
+    """
+
+    # Then
+    result = processes.get_tree_rss_kb(os.getpid())
+
+    # Assert
+    assert result >= processes.read_rss_kb(os.getpid()) > 0
+    assert processes.get_available_memory_kb() > 0
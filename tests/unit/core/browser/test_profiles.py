@@ -0,0 +1,107 @@
+"""
+Tests for the file core/browser/profiles.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import pytest
+
+from app.core.browser.profiles import (
+    get_launch_options,
+    get_launch_profile,
+    launch_sync_browser,
+)
+from app.core.browser.schemas import LaunchProfile
+
+
+def test_get_launch_options_of_the_default_profile():
+    """
+    Test that the default profile keeps the playwright launch arguments.
+    """
+
+    # Then
+    result = get_launch_options(get_launch_profile("default"))
+
+    # Expected
+    excepted_result = {"headless": True, "args": []}
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_get_launch_options_translates_the_toggles():
+    """
+    Test that the toggles disable the GPU or re-enable what playwright disables.
+    """
+
+    # When
+    profile = LaunchProfile(
+        name="test", gpu=False, background_networking=True, args=["--mute-audio"]
+    )
+
+    # Then
+    result = get_launch_options(profile, headless=False)
+
+    # Expected
+    excepted_result = {
+        "headless": False,
+        "args": ["--mute-audio", "--disable-gpu"],
+        "ignore_default_args": ["--disable-background-networking"],
+    }
+
+    # Assert
+    assert result == excepted_result
+
+
+class FakeSyncPlaywright:
+    """Sync playwright recording the launches and the pages opened."""
+
+    def __init__(self) -> None:
+        self.chromium = self
+        self.calls: list[str] = []
+
+    def launch(self, **options) -> "FakeSyncPlaywright":
+        self.calls.append("launch")
+        return self
+
+    def new_page(self) -> "FakeSyncPlaywright":
+        self.calls.append("new_page")
+        return self
+
+    def goto(self, url: str) -> None:
+        self.calls.append(url)
+
+    def close(self) -> None:
+        self.calls.append("close")
+
+
+def test_launch_sync_browser_warms_up_like_launch_browser():
+    """
+    Test that the sync launch opens and closes a blank page only for the
+    profiles with warm_up.
+    """
+
+    # When
+    default, lean = FakeSyncPlaywright(), FakeSyncPlaywright()
+
+    # Then
+    launch_sync_browser(default, "default")
+    launch_sync_browser(lean, "lean")
+
+    # Expected
+    excepted_result = ["launch", "new_page", "about:blank", "close"]
+
+    # Assert
+    assert default.calls == ["launch"]
+    assert lean.calls == excepted_result
+
+
+def test_get_launch_profile_refuses_unknown_names():
+    """
+    Test that an unknown profile name is refused.
+    """
+
+    # Assert
+    with pytest.raises(ValueError):
+        get_launch_profile("unknown")
@@ -0,0 +1,67 @@
+"""
+Tests for the file core/change_detection/fingerprint.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from app.core.change_detection.fingerprint import get_content_hash
+
+PAGE = """
+    <html><head>
+        <meta name="csrf-token" content="{token}">
+        <script nonce="{nonce}" src="/app.js"></script>
+        <script nonce="{nonce}">{script}</script>
+        <link rel="stylesheet" href="style.css">
+    </head><body>
+        <p>{text} Mis à jour le {date}</p>
+        <img src="a.jpg" srcset="{srcset}">
+    </body></html>
+"""
+
+DEFAULTS = {
+    "token": "t0k3n",
+    "nonce": "abc",
+    "script": "init();",
+    "text": "Bonjour",
+    "date": "2024-05-02 10:00",
+    "srcset": "b.jpg 2x",
+}
+
+
+def get_page_hash(**changes: str) -> str:
+    return get_content_hash(PAGE.format(**{**DEFAULTS, **changes}))
+
+
+def test_get_content_hash_ignores_nonces_tokens_and_dates():
+    """
+    Test that a page re-rendered with another nonce, CSRF token and date keeps
+    its hash.
+    """
+
+    # Then
+    result = get_page_hash(token="x9", nonce="xyz", date="2024-05-02 10:05")
+
+    # Expected
+    excepted_result = get_page_hash()
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_get_content_hash_changes_with_the_content():
+    """
+    Test that a change of the text, of an inline script or of the assets
+    changes the hash.
+    """
+
+    # Then
+    result = [
+        get_page_hash(text="Bonjour à tous"),
+        get_page_hash(script="init(); track();"),
+        get_page_hash(srcset="b.jpg 480w, c.jpg 1080w"),
+    ]
+
+    # Assert
+    assert get_page_hash() not in result
+    assert len(set(result)) == 3
@@ -0,0 +1,66 @@
+"""
+Tests for the file core/discovery/crawler.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from app.core.discovery.crawler import LinkCrawler, extract_links
+
+
+def test_extract_links_resolves_hrefs():
+    """
+    Test that links are resolved against the page (or its <base>), keeping
+    their trailing slash but not their fragment, and that non http(s) links are
+    dropped.
+    """
+
+    # When
+    html = """
+        <a href="/a/#top">a</a>
+        <a href="b">b</a>
+        <a href="mailto:contact@site.fr">mail</a>
+        <base href="https://site.fr/blog/">
+        <a href="c">c</a>
+    """
+
+    # Then
+    result = extract_links("https://site.fr/page/", html)
+
+    # Expected
+    excepted_result = [
+        "https://site.fr/a/",
+        "https://site.fr/blog/b",
+        "https://site.fr/blog/c",
+    ]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_link_crawler_dedupes_on_canonical_urls_and_yields_them_as_linked():
+    """
+    Test that a page linked with and without its trailing slash is crawled
+    once, under its linked url, and that other origins are left out.
+    """
+
+    # When
+    links = {
+        "https://site.fr": ["https://site.fr/", "https://site.fr/a/", "/b"],
+        "https://site.fr/a/": ["https://site.fr/a", "https://other.fr/"],
+        "https://site.fr/b": [],
+    }
+    crawler = LinkCrawler("https://site.fr", max_depth=2)
+    crawler.get_page_links = lambda url: [
+        link if link.startswith("http") else f"https://site.fr{link}"
+        for link in links[url]
+    ]
+
+    # Then
+    result = list(crawler.crawl())
+
+    # Expected
+    excepted_result = ["https://site.fr", "https://site.fr/a/", "https://site.fr/b"]
+
+    # Assert
+    assert result == excepted_result
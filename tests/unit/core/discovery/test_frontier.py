@@ -0,0 +1,145 @@
+"""
+Tests for the file core/discovery/frontier.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+from collections.abc import Iterator
+
+from app.core.discovery.frontier import UrlFrontier, normalize_url
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalize_url_returns_url_canonical_url_and_host():
+    """
+    Test that urls are validated as WebPage and canonicalized, the url to fetch
+    keeping its trailing slash.
+    """
+
+    # Assert
+    assert normalize_url("HTTPS://Site.fr/page/#top") == (
+        "https://site.fr/page/#top",
+        "https://site.fr/page",
+        "site.fr",
+    )
+    assert normalize_url("ftp://site.fr/file") is None
+
+
+def test_add_dedupes_equivalent_urls():
+    """
+    Test that urls differing by trailing slash or fragment are queued once, as
+    first written.
+    """
+
+    # When
+    frontier = UrlFrontier()
+
+    # Then
+    added = frontier.extend(
+        ["https://a.fr/page/", "https://a.fr/page", "https://a.fr/page#x", "nope"]
+    )
+
+    # Assert
+    assert added == 1
+    assert frontier.get_nowait() == ("https://a.fr/page/", None)
+    assert frontier.duplicates == 2
+    assert frontier.invalids == 1
+
+
+def test_get_nowait_interleaves_hosts_and_keeps_limits():
+    """
+    Test that hosts are served in round robin, within their concurrency and
+    delay limits.
+    """
+
+    # When
+    clock = FakeClock()
+    frontier = UrlFrontier(per_host_concurrency=1, per_host_delay=2, clock=clock)
+    frontier.extend(["https://a.fr/1", "https://a.fr/2", "https://b.fr/1"])
+
+    # Then
+    first, _ = frontier.get_nowait()
+    second, _ = frontier.get_nowait()
+    blocked, wait_while_busy = frontier.get_nowait()
+    frontier.release(first)
+    delayed, wait_for_delay = frontier.get_nowait()
+    clock.now = 2
+    third, _ = frontier.get_nowait()
+
+    # Assert
+    assert (first, second) == ("https://a.fr/1", "https://b.fr/1")
+    assert (blocked, wait_while_busy) == (None, None)
+    assert (delayed, wait_for_delay) == (None, 2)
+    assert third == "https://a.fr/2"
+
+
+def test_feed_streams_an_endless_source_with_bounded_waiting_urls():
+    """
+    Test that urls are handed out while an endless source is read, the source
+    being read only while few urls wait.
+    """
+
+    # When
+    read = []
+
+    def endless_urls() -> Iterator[str]:
+        while True:
+            read.append(len(read))
+            yield f"https://a.fr/page-{len(read)}"
+
+    frontier = UrlFrontier(per_host_concurrency=1, per_host_delay=0)
+
+    async def take(count: int) -> list[str]:
+        feeder = frontier.feed(endless_urls(), chunk_size=2, max_waiting=5)
+        urls = []
+        for _ in range(count):
+            url = await frontier.get()
+            frontier.release(url)
+            urls.append(url)
+        feeder.cancel()
+        await asyncio.gather(feeder, return_exceptions=True)
+        return urls
+
+    # Then
+    result = asyncio.run(take(20))
+
+    # Assert
+    assert result[:2] == ["https://a.fr/page-1", "https://a.fr/page-2"]
+    assert len(result) == 20
+    assert len(frontier) <= 6
+    assert len(read) <= 20 + 6 + 2
+
+
+def test_get_ends_once_the_feed_is_exhausted():
+    """
+    Test that get waits for the feed, then returns None once its urls are
+    handed out.
+    """
+
+    # When
+    frontier = UrlFrontier(per_host_delay=0)
+
+    async def take_all() -> list[str | None]:
+        feeder = frontier.feed(["https://a.fr/1", "https://b.fr/2", "https://a.fr/1"])
+        urls = [await frontier.get() for _ in range(3)]
+        await feeder
+        return urls
+
+    # Then
+    result = asyncio.run(take_all())
+
+    # Expected
+    excepted_result = ["https://a.fr/1", "https://b.fr/2", None]
+
+    # Assert
+    assert result == excepted_result
+    assert frontier.duplicates == 1
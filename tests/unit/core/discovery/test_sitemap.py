@@ -0,0 +1,90 @@
+"""
+Tests for the file core/discovery/sitemap.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import gzip
+import tracemalloc
+from collections.abc import Iterator
+
+from app.core.discovery.sitemap import parse_sitemap
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://site.fr/a</loc><lastmod>2024-01-01</lastmod></url>
+  <url><loc> https://site.fr/b </loc></url>
+</urlset>"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://site.fr/sitemap-1.xml.gz</loc></sitemap>
+</sitemapindex>"""
+
+
+def _chunked(content: bytes, size: int = 7) -> list[bytes]:
+    return [content[i : i + size] for i in range(0, len(content), size)]
+
+
+def test_parse_sitemap_streams_urls_of_a_urlset():
+    """
+    Test that page urls are read even when tags are split across chunks.
+    """
+
+    # Then
+    result = list(parse_sitemap(_chunked(URLSET)))
+
+    # Expected
+    excepted_result = [("url", "https://site.fr/a"), ("url", "https://site.fr/b")]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_parse_sitemap_reads_gzipped_sitemap_index():
+    """
+    Test that a gzipped sitemap index yields its child sitemaps.
+    """
+
+    # Then
+    result = list(parse_sitemap(_chunked(gzip.compress(SITEMAP_INDEX))))
+
+    # Expected
+    excepted_result = [("sitemap", "https://site.fr/sitemap-1.xml.gz")]
+
+    # Assert
+    assert result == excepted_result
+
+
+def _generate_urlset(count: int) -> Iterator[bytes]:
+    yield URLSET.split(b"<url>", 1)[0]
+    for start in range(0, count, 1000):
+        yield "".join(
+            f"<url><loc>https://site.fr/page-{i}</loc></url>"
+            for i in range(start, start + 1000)
+        ).encode()
+    yield b"</urlset>"
+
+
+def test_parse_sitemap_memory_does_not_grow_with_the_urls():
+    """
+    Test that the peak memory of the parsing of a sitemap of 50 000 urls stays
+    close to the one of 5 000 urls, the read elements being dropped.
+    """
+
+    # When
+    def get_peak_memory(count: int) -> int:
+        tracemalloc.start()
+        try:
+            parsed = sum(1 for _ in parse_sitemap(_generate_urlset(count)))
+            assert parsed == count
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Then
+    small, large = get_peak_memory(5_000), get_peak_memory(50_000)
+
+    # Assert
+    assert large < 2 * small
@@ -0,0 +1,53 @@
+"""
+Tests for the file core/discovery/urls.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from app.core.discovery.urls import canonicalize_url, is_same_origin
+
+
+def test_canonicalize_url_merges_equivalent_urls():
+    """
+    Test that case, default port, fragment and trailing slash differences
+    give the same canonical url.
+    """
+
+    # When
+    urls = [
+        "HTTPS://Www.Site.fr:443/page/#top",
+        "https://www.site.fr/page",
+        "/page/",
+    ]
+
+    # Then
+    result = {canonicalize_url(url, "https://www.site.fr/") for url in urls}
+
+    # Expected
+    excepted_result = {"https://www.site.fr/page"}
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_canonicalize_url_keeps_root_slash_and_rejects_other_schemes():
+    """
+    Test that the root path is kept and non http(s) urls are rejected.
+    """
+
+    # Assert
+    assert canonicalize_url("https://site.fr") == "https://site.fr/"
+    assert canonicalize_url("mailto:contact@site.fr") is None
+    assert canonicalize_url("http://site.fr:notaport/") is None
+
+
+def test_is_same_origin():
+    """
+    Test that urls are compared on scheme, host and port.
+    """
+
+    # Assert
+    assert is_same_origin("https://site.fr/a", "https://site.fr/b?c=d")
+    assert not is_same_origin("https://site.fr/a", "http://site.fr/a")
+    assert not is_same_origin("https://site.fr/a", "https://cdn.site.fr/a")
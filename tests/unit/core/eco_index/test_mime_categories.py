@@ -0,0 +1,68 @@
+"""
+Tests for the file core/eco_index/mime_categories.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from app.core.eco_index.mime_categories import (
+    get_extension_category,
+    get_mime_category,
+    get_resource_category,
+)
+
+
+def test_get_mime_category():
+    """
+    Test the exact, prefix and keyword rules, whatever the case and parameters.
+    """
+
+    # When
+    mime_types = [
+        "Text/HTML; charset=UTF-8",
+        "image/svg+xml",
+        "application/x-javascript",
+        "application/vnd.ms-fontobject",
+        "font/woff2",
+        "video/mp4",
+        "application/json",
+    ]
+
+    # Then
+    result = [get_mime_category(mime_type) for mime_type in mime_types]
+
+    # Expected
+    excepted_result = ["html", "image", "javascript", "font", "font", "video", "other"]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_get_resource_category_falls_back_on_the_extension():
+    """
+    Test that a generic mime type is classified from the url extension, and only
+    a generic one.
+    """
+
+    # Then
+    result = [
+        get_resource_category("application/octet-stream", "https://a.fr/f.woff2?v=2"),
+        get_resource_category("", "https://a.fr/app.js#main"),
+        get_resource_category("application/json", "https://a.fr/data.js"),
+        get_resource_category("application/octet-stream"),
+    ]
+
+    # Expected
+    excepted_result = ["font", "javascript", "other", "other"]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_get_extension_category_without_extension():
+    """
+    Test that a url without extension in its last segment is not classified.
+    """
+
+    # Assert
+    assert get_extension_category("https://a.fr/v1.2/download") == "other"
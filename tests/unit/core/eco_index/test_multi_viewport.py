@@ -0,0 +1,167 @@
+"""
+Tests for the file core/eco_index/multi_viewport.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+import json
+from collections import Counter
+
+import pytest
+
+from app.core.eco_index.computation import compute_ecoindex
+from app.core.eco_index.multi_viewport import MultiViewportScraper
+from app.core.eco_index.schemas import Result, WindowSize
+
+DESKTOP = WindowSize(width=1920, height=1080)
+TABLET = WindowSize(width=820, height=1180)
+MOBILE = WindowSize(width=390, height=844)
+SMALL = WindowSize(width=320, height=568)
+
+
+async def make_result(window_size: WindowSize) -> Result:
+    ecoindex = await compute_ecoindex(nodes=300, size=500.0, requests=20)
+
+    return Result(
+        **ecoindex.model_dump(),
+        **window_size.model_dump(),
+        size=500.0,
+        nodes=300,
+        requests=20,
+        url="http://localhost",
+    )
+
+
+class FakeMultiViewportScraper(MultiViewportScraper):
+    """
+    Scraper whose loads are recorded instead of run, the resize to MOBILE
+    making new requests.
+    """
+
+    loads: list[int] = []
+
+    async def get_page_analysis(self) -> Result:
+        self.loads.append(self.window_size.width)
+        for i, window_size in enumerate(self.window_sizes[1:], start=1):
+            if window_size == MOBILE:
+                break
+            self.resized_nodes[i] = 100
+        return await make_result(self.window_size)
+
+
+def test_multi_viewport_scraper_needs_a_window_size():
+    """
+    Test that a scraper without any window size is refused.
+    """
+
+    # Assert
+    with pytest.raises(ValueError):
+        MultiViewportScraper("http://localhost", [])
+
+
+def test_multi_viewport_scraper_sets_the_viewport_of_the_first_size():
+    """
+    Test that the context is created at the first window size, as viewport too.
+    """
+
+    # When
+    scraper = MultiViewportScraper("http://localhost", [MOBILE, DESKTOP])
+
+    # Then
+    result = scraper.get_context_options()
+
+    # Expected
+    excepted_result = {"width": 390, "height": 844}
+
+    # Assert
+    assert result["viewport"] == excepted_result
+    assert result["screen"] == excepted_result
+
+
+def test_get_resized_result_shares_the_requests_of_the_first_load():
+    """
+    Test that a viewport measured by resizing keeps the size and requests of the
+    first load, with its own nodes count and window size.
+    """
+
+    # When
+    scraper = MultiViewportScraper("http://localhost", [DESKTOP, MOBILE])
+    scraper.resized_nodes[1] = 120
+    first = asyncio.run(make_result(DESKTOP))
+
+    # Then
+    result = asyncio.run(scraper._get_resized_result(first, 1))
+
+    # Expected
+    excepted_score = asyncio.run(
+        compute_ecoindex(nodes=120, size=500.0, requests=20)
+    ).score
+
+    # Assert
+    assert (result.width, result.height) == (390, 844)
+    assert (result.size, result.requests, result.nodes) == (500.0, 20, 120)
+    assert result.score == excepted_score
+
+
+def test_multi_viewport_scraper_loads_again_once_from_a_requesting_viewport():
+    """
+    Test that the page is loaded again once from the first viewport whose
+    resize made new requests, the next viewports being resized from it.
+    """
+
+    # When
+    scraper = FakeMultiViewportScraper(
+        "http://localhost", [DESKTOP, TABLET, MOBILE, SMALL]
+    )
+    FakeMultiViewportScraper.loads = []
+
+    # Then
+    result = asyncio.run(scraper._analyse_viewports())
+
+    # Expected
+    excepted_result = [1920, 820, 390, 320]
+
+    # Assert
+    assert [page.width for page in result] == excepted_result
+    assert FakeMultiViewportScraper.loads == [1920, 390]
+
+
+def test_get_requests_from_har_file_leaves_out_the_late_requests(tmp_path):
+    """
+    Test that the requests made after the page was measured, the last entries
+    of their url, are not counted in the page.
+    """
+
+    # When
+    def make_entry(url: str, size: int) -> dict:
+        return {
+            "request": {"url": url},
+            "response": {
+                "status": 200,
+                "_transferSize": size,
+                "content": {"mimeType": "application/javascript"},
+            },
+        }
+
+    har_path = tmp_path / "page.har"
+    entries = [
+        make_entry("http://localhost/", 1000),
+        make_entry("http://localhost/app.js", 300),
+        make_entry("http://localhost/lazy.js", 50),
+        make_entry("http://localhost/app.js", 200),
+    ]
+    har_path.write_text(json.dumps({"log": {"entries": entries}}))
+    scraper = MultiViewportScraper("http://localhost", [DESKTOP, MOBILE])
+    scraper.har_temp_file_path = str(har_path)
+    scraper.late_requests = Counter(
+        {"http://localhost/app.js": 1, "http://localhost/lazy.js": 1}
+    )
+
+    # Then
+    asyncio.run(scraper.get_requests_from_har_file())
+
+    # Assert
+    assert scraper.all_requests.total_count == 2
+    assert scraper.all_requests.total_size == 1300
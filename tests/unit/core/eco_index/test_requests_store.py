@@ -0,0 +1,74 @@
+"""
+Tests for the file core/eco_index/requests_store.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from app.core.eco_index.requests_store import Requests
+from app.core.eco_index.schemas import RequestItem
+
+
+def add_requests(requests: Requests) -> None:
+    requests.add("https://a.fr/", "text/html", "html", 200, 1000)
+    requests.add("https://a.fr/a.js", "text/javascript", "javascript", 200, 300)
+    requests.add("https://a.fr/b.js", "text/javascript", "javascript", 404, 200)
+
+
+def test_requests_items_are_rebuilt_from_the_columns():
+    """
+    Test that the stored requests are given back as RequestItem, in order.
+    """
+
+    # When
+    requests = Requests()
+    add_requests(requests)
+
+    # Then
+    result = requests.items[1:]
+
+    # Expected
+    excepted_result = [
+        RequestItem(
+            url="https://a.fr/a.js",
+            mime_type="text/javascript",
+            category="javascript",
+            status=200,
+            size=300,
+        ),
+        RequestItem(
+            url="https://a.fr/b.js",
+            mime_type="text/javascript",
+            category="javascript",
+            status=404,
+            size=200,
+        ),
+    ]
+
+    # Assert
+    assert result == excepted_result
+    assert (requests.total_count, requests.total_size) == (3, 1500)
+
+
+def test_requests_aggregation_is_the_same_in_every_mode():
+    """
+    Test that the totals by category do not depend on what is kept.
+    """
+
+    # When
+    all_requests, without_urls, summary = (
+        Requests(),
+        Requests("no_urls"),
+        Requests("summary"),
+    )
+    for requests in (all_requests, without_urls, summary):
+        add_requests(requests)
+
+    # Then
+    result = summary.aggregation
+
+    # Assert
+    assert result == all_requests.aggregation == without_urls.aggregation
+    assert (result.javascript.total_count, result.javascript.total_size) == (2, 500)
+    assert summary.items == []
+    assert [item.url for item in without_urls.items] == ["", "", ""]
@@ -0,0 +1,53 @@
+"""
+Tests for the file core/eco_index/schemas.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from datetime import datetime
+
+from app.core.eco_index.schemas import Ecoindex, PageMetrics, Result, WebPage
+
+
+def test_result_from_analysis_is_the_validated_result():
+    """
+    Test that a result assembled from its parts equals the one validated from
+    scratch.
+    """
+
+    # When
+    date = datetime(2024, 1, 1)
+    page = WebPage(url="https://www.Example.com/fr", width=390, height=844)
+    page_metrics = PageMetrics(size=500.0, nodes=300, requests=20)
+    ecoindex = Ecoindex(grade="C", score=50, ges=2.0, water=3.0)
+
+    # Then
+    result = Result.from_analysis(page, page_metrics, ecoindex, date)
+
+    # Expected
+    excepted_result = Result(
+        **ecoindex.model_dump(),
+        **page_metrics.model_dump(),
+        width=390,
+        height=844,
+        url="https://www.Example.com/fr",
+        date=date,
+    )
+
+    # Assert
+    assert result == excepted_result
+    assert result.model_dump_json() == excepted_result.model_dump_json()
+
+
+def test_web_page_url_components():
+    """
+    Test the host and path of a page url.
+    """
+
+    # When
+    page = WebPage(url="https://www.Example.com/fr/page?q=1")
+
+    # Assert
+    assert page.get_url_host() == "www.example.com"
+    assert page.get_url_path() == "/fr/page"
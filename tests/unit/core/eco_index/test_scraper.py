@@ -0,0 +1,29 @@
+"""
+Tests for the file core/eco_index/scraper.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from app.core.eco_index.schemas import WindowSize
+from app.core.eco_index.scraper import EcoindexScraper
+
+
+def test_get_context_options_keeps_the_default_viewport():
+    """
+    Test that a single page analysis only sets the screen, the page rendering
+    at the default viewport of playwright as before, so that its ecoindex does
+    not change.
+    """
+
+    # When
+    scraper = EcoindexScraper(
+        "http://localhost", window_size=WindowSize(width=390, height=844)
+    )
+
+    # Then
+    result = scraper.get_context_options()
+
+    # Assert
+    assert "viewport" not in result
+    assert result["screen"] == {"width": 390, "height": 844}
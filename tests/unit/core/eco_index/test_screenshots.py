@@ -0,0 +1,63 @@
+"""
+Tests for the file core/eco_index/screenshots.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+import io
+
+from PIL import Image
+
+from app.core.eco_index.schemas import ScreenShot
+from app.core.eco_index.screenshots import (
+    get_screenshot_webp,
+    save_screenshot_as_webp,
+)
+
+
+def test_save_screenshot_as_webp_writes_a_resized_webp(tmp_path):
+    """
+    Test that an in memory capture is written as a WebP of the screenshot size.
+    """
+
+    # When
+    buffer = io.BytesIO()
+    Image.new("RGB", (1920, 1080), "green").save(buffer, format="jpeg")
+    screenshot = ScreenShot(id="page", folder=str(tmp_path))
+
+    # Then
+    asyncio.run(save_screenshot_as_webp(buffer.getvalue(), screenshot))
+    with Image.open(screenshot.get_webp()) as image:
+        result = (image.format, image.size)
+
+    # Expected
+    excepted_result = ("WEBP", (1422, 800))
+
+    # Assert
+    assert result == excepted_result
+    assert not (tmp_path / "page.png").exists()
+
+
+def test_get_screenshot_webp_converts_in_memory(tmp_path):
+    """
+    Test that a capture is converted in memory to the WebP bytes written to
+    the screenshot file.
+    """
+
+    # When
+    buffer = io.BytesIO()
+    Image.new("RGB", (390, 844), "green").save(buffer, format="jpeg")
+    screenshot = ScreenShot(id="page", folder=str(tmp_path))
+    asyncio.run(save_screenshot_as_webp(buffer.getvalue(), screenshot))
+
+    # Then
+    result = asyncio.run(get_screenshot_webp(buffer.getvalue()))
+
+    # Expected
+    with open(screenshot.get_webp(), "rb") as f:
+        excepted_result = f.read()
+
+    # Assert
+    assert result == excepted_result
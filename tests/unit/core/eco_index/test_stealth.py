@@ -0,0 +1,45 @@
+"""
+Tests for the file core/eco_index/stealth.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+from app.core.eco_index.stealth import (
+    BUNDLE_SEPARATOR,
+    StealthConfig,
+    get_stealth_bundle,
+)
+
+
+def test_get_stealth_bundle_contains_all_enabled_scripts():
+    """
+    Test that the bundle is the concatenation of the enabled scripts.
+    """
+
+    # When
+    config = StealthConfig(webdriver=False)
+
+    # Then
+    result = get_stealth_bundle(config)
+
+    # Expected
+    excepted_result = BUNDLE_SEPARATOR.join(config.enabled_scripts)
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_get_stealth_bundle_is_memoized_per_config_value():
+    """
+    Test that equal configs share the same bundle and different configs do not.
+    """
+
+    # When
+    first = get_stealth_bundle(StealthConfig())
+    second = get_stealth_bundle()
+    other = get_stealth_bundle(StealthConfig(webdriver=False))
+
+    # Assert
+    assert first is second
+    assert other != first
@@ -0,0 +1,76 @@
+"""
+Tests for the file core/instrumentation/timings.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+import json
+
+from app.core.instrumentation.timings import (
+    TimingsAggregator,
+    collect_timings,
+    timed_phase,
+)
+
+
+def test_timed_phase_is_collected_across_threads_and_accumulated():
+    """
+    Test that phases timed in the event loop and in to_thread workers land in
+    the collector of the analysis, repeated phases being summed.
+    """
+
+    # When
+    def blocking_call():
+        with timed_phase("thread"):
+            pass
+
+    async def analysis():
+        with collect_timings() as timings:
+            with timed_phase("loop"):
+                await asyncio.sleep(0)
+            with timed_phase("loop"):
+                await asyncio.sleep(0)
+            await asyncio.to_thread(blocking_call)
+        return timings
+
+    # Then
+    timings = asyncio.run(analysis())
+
+    # Assert
+    assert set(timings.durations) == {"loop", "thread"}
+    assert all(duration >= 0 for duration in timings.durations.values())
+
+
+def test_timed_phase_without_collector_does_nothing():
+    """
+    Test that timing a phase outside collect_timings is harmless.
+    """
+
+    # Assert
+    with timed_phase("orphan"):
+        pass
+
+
+def test_aggregator_exports_percentiles():
+    """
+    Test that the aggregator computes the percentiles of each phase and renders
+    them as JSON and as a Prometheus summary.
+    """
+
+    # When
+    aggregator = TimingsAggregator()
+    for duration in (1, 2, 3, 4, 5):
+        aggregator.add({"goto": duration})
+
+    # Then
+    statistics = json.loads(aggregator.to_json())
+    prometheus = aggregator.to_prometheus()
+
+    # Assert
+    assert statistics["goto"]["count"] == 5
+    assert statistics["goto"]["p50"] == 3
+    median = 'ecodesign_phase_duration_seconds{phase="goto",quantile="0.5"} 3'
+    assert median in prometheus
+    assert 'ecodesign_phase_duration_seconds_count{phase="goto"} 5' in prometheus
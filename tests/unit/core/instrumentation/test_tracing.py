@@ -0,0 +1,66 @@
+"""
+Tests for the file core/instrumentation/tracing.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import json
+
+import pytest
+
+from app.core.instrumentation.timings import timed_phase
+from app.core.instrumentation.tracing import span, tracing
+
+
+def test_tracing_writes_nested_spans_as_chrome_trace(tmp_path):
+    """
+    Test that spans and timed phases are written as complete events, children
+    sharing the lane of their parent.
+    """
+
+    # When
+    trace_path = tmp_path / "trace.json"
+    with tracing(trace_path):
+        with span("run"):
+            with span("analysis", own_lane=True, url="https://a.fr") as span_args:
+                with timed_phase("eco_index.goto"):
+                    pass
+                span_args["status"] = "ok"
+
+    # Then
+    events = json.loads(trace_path.read_text(encoding="utf-8"))
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+
+    # Assert
+    assert set(spans) == {"run", "analysis", "eco_index.goto"}
+    assert spans["analysis"]["args"] == {"url": "https://a.fr", "status": "ok"}
+    assert spans["eco_index.goto"]["tid"] == spans["analysis"]["tid"] != 0
+    assert spans["run"]["tid"] == 0
+
+
+def test_span_marks_errors(tmp_path):
+    """
+    Test that an exception escaping a span is recorded on it.
+    """
+
+    # When
+    trace_path = tmp_path / "trace.json"
+    with pytest.raises(RuntimeError), tracing(trace_path), span("analysis"):
+        raise RuntimeError("boom")
+
+    # Then
+    events = json.loads(trace_path.read_text(encoding="utf-8"))
+
+    # Assert
+    assert events[-1]["args"] == {"status": "error", "error": "RuntimeError: boom"}
+
+
+def test_span_without_tracer_yields_its_args():
+    """
+    Test that spans are harmless when nothing is traced.
+    """
+
+    # Assert
+    with span("analysis", url="https://a.fr") as span_args:
+        assert span_args == {"url": "https://a.fr"}
@@ -0,0 +1,80 @@
+"""
+Tests for the file core/screenshot_store/store.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import io
+from datetime import datetime
+
+from PIL import Image, ImageDraw
+
+from app.core.screenshot_store.store import ScreenshotStore
+
+
+def make_capture(dot: bool = False, box_x: int = 100) -> bytes:
+    image = Image.new("RGB", (1422, 800), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 1422, 120), fill="navy")
+    draw.rectangle((box_x, 200, box_x + 600, 700), fill="orange")
+    if dot:
+        draw.point((1000, 400), fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="webp")
+
+    return buffer.getvalue()
+
+
+def test_add_reuses_identical_and_near_identical_images(tmp_path):
+    """
+    Test that a capture differing by a pixel is stored once, a new layout is not.
+    """
+
+    # When
+    with ScreenshotStore(tmp_path) as store:
+        first = store.add("https://a.fr", make_capture(), datetime(2024, 1, 1))
+        same = store.add("https://b.fr", make_capture(), datetime(2024, 1, 1))
+        near = store.add("https://a.fr", make_capture(dot=True), datetime(2024, 1, 2))
+        other = store.add("https://a.fr", make_capture(box_x=700), datetime(2024, 1, 3))
+
+        # Then
+        result = [
+            (capture.blob_id == first.blob_id, capture.is_duplicate)
+            for capture in (same, near, other)
+        ]
+        blobs = list((tmp_path / "blobs").rglob("*.webp"))
+        history = [capture.date.day for capture in store.get_history("https://a.fr")]
+
+    # Expected
+    excepted_result = [(True, True), (True, True), (False, False)]
+
+    # Assert
+    assert result == excepted_result
+    assert len(blobs) == 2
+    assert history == [1, 2, 3]
+
+
+def test_get_visual_changes_compares_the_two_last_captures(tmp_path):
+    """
+    Test that only the pages whose last capture changed are reported.
+    """
+
+    # When
+    with ScreenshotStore(tmp_path) as store:
+        for day, box_x in ((1, 100), (2, 100), (3, 700)):
+            store.add("https://a.fr", make_capture(box_x=box_x), datetime(2024, 1, day))
+        for day in (1, 2):
+            store.add("https://b.fr", make_capture(), datetime(2024, 1, day))
+        store.add("https://c.fr", make_capture(box_x=400), datetime(2024, 1, 1))
+
+        # Then
+        result = [change.url for change in store.get_visual_changes()]
+        filtered = list(store.get_visual_changes(["https://b.fr"]))
+
+    # Expected
+    excepted_result = ["https://a.fr"]
+
+    # Assert
+    assert result == excepted_result
+    assert filtered == []
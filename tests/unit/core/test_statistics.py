@@ -0,0 +1,77 @@
+"""
+Tests for the file core/statistics.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import random
+
+import pytest
+
+from app.core.statistics import QuantileSketch, percentile
+
+
+def test_percentile_interpolates_between_values():
+    """
+    Test that percentile interpolates linearly between the two nearest values.
+    """
+
+    # When
+    values = [4, 1, 3, 2]
+
+    # Then
+    result = percentile(values, 50)
+
+    # Expected
+    excepted_result = 2.5
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_percentile_of_empty_values_is_zero():
+    """
+    Test that percentile returns 0 when there is no value.
+    """
+
+    # Assert
+    assert percentile([], 95) == 0
+
+
+def test_percentile_rejects_out_of_range_q():
+    """
+    Test that percentile raises when q is not between 0 and 100.
+    """
+
+    # Assert
+    with pytest.raises(ValueError):
+        percentile([1, 2], 101)
+
+
+def test_quantile_sketch_merged_parts_approximate_the_percentiles():
+    """
+    Test that sketches filled by several workers then merged give the median
+    and the 90th percentile of the whole stream within 1 %.
+    """
+
+    # When
+    rng = random.Random(0)
+    values = [rng.lognormvariate(7, 1) for _ in range(50_000)]
+    parts = [QuantileSketch(200) for _ in range(4)]
+    for i, value in enumerate(values):
+        parts[i % 4].add(value)
+    sketch = parts[0]
+    for part in parts[1:]:
+        sketch.merge(part)
+
+    # Then
+    result = [sketch.quantile(0.5), sketch.quantile(0.9)]
+
+    # Expected
+    excepted_result = [percentile(values, 50), percentile(values, 90)]
+
+    # Assert
+    assert result == pytest.approx(excepted_result, rel=0.01)
+    assert sketch.count == len(values)
+    assert len(sketch.get_centroids()) <= 200
@@ -0,0 +1,118 @@
+"""
+Tests for the file usecase/analysis_service/service.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.adapter.exception.app_exception import JobNotFoundError, ServiceBusyError
+from app.usecase.analysis_service import service as service_module
+from app.usecase.analysis_service.schemas import JobRequest
+from app.usecase.analysis_service.service import AnalysisService
+
+
+class FakePool:
+    size = 1
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield "warm-browser"
+
+
+@pytest.fixture
+def fake_analysers(monkeypatch):
+    async def analyse_eco_index(url, browser=None):
+        await asyncio.sleep(0.01)
+        if url.endswith("fail"):
+            raise RuntimeError("boom")
+        return {"url": url, "browser": browser}
+
+    async def analyse_network(url, browser=None):
+        return {"total": 3}
+
+    async def analyse_insight(url, strategy="mobile"):
+        return {"strategy": strategy}
+
+    monkeypatch.setattr(service_module, "analyse_eco_index", analyse_eco_index)
+    monkeypatch.setattr(service_module, "analyse_network", analyse_network)
+    monkeypatch.setattr(service_module, "analyse_insight", analyse_insight)
+
+
+def test_combined_job_runs_every_analysis_on_a_warm_browser(fake_analysers):
+    """
+    Test that a combined job returns the three analyses, browser based ones
+    running on a browser of the pool.
+    """
+
+    # When
+    async def run():
+        service = AnalysisService(FakePool())
+        job = service.submit(JobRequest(url="https://a.fr"))
+        return await service.wait(job.id)
+
+    # Then
+    job = asyncio.run(run())
+
+    # Assert
+    assert job.status == "done"
+    assert job.result == {
+        "eco_index": {"url": "https://a.fr", "browser": "warm-browser"},
+        "network": {"total": 3},
+        "insight": {"strategy": "mobile"},
+    }
+
+
+def test_failed_job_keeps_its_error(fake_analysers):
+    """
+    Test that an exception during the analysis is stored on the job.
+    """
+
+    # When
+    async def run():
+        service = AnalysisService(FakePool())
+        job = service.submit(JobRequest(url="https://a.fr/fail", kind="eco_index"))
+        return await service.wait(job.id)
+
+    # Then
+    job = asyncio.run(run())
+
+    # Assert
+    assert job.status == "error"
+    assert job.error == "RuntimeError: boom"
+
+
+def test_submit_refuses_jobs_beyond_max_pending(fake_analysers):
+    """
+    Test that the queue is bounded.
+    """
+
+    # When
+    async def run():
+        service = AnalysisService(FakePool(), max_pending=1)
+        service.submit(JobRequest(url="https://a.fr", kind="eco_index"))
+        service.submit(JobRequest(url="https://b.fr", kind="eco_index"))
+
+    # Assert
+    with pytest.raises(ServiceBusyError):
+        asyncio.run(run())
+
+
+def test_get_unknown_job_raises():
+    """
+    Test that asking for an unknown job raises JobNotFoundError.
+    """
+
+    # Assert
+    with pytest.raises(JobNotFoundError):
+        AnalysisService(FakePool()).get("unknown")
@@ -0,0 +1,76 @@
+"""
+Tests for the file usecase/batch_analysis/analysers.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+
+import requests
+
+from app.core.change_detection.store import ResultStore
+from app.usecase.batch_analysis.analysers import reuse_unchanged
+
+
+class FakeSession:
+    """Serve a page with an ETag, answering 304 to a matching If-None-Match."""
+
+    def __init__(self) -> None:
+        self.etag = '"v1"'
+
+    def get(self, url: str, headers: dict, timeout: float) -> requests.Response:
+        response = requests.Response()
+        response.url = url
+        response.headers["ETag"] = self.etag
+        if headers.get("If-None-Match") == self.etag:
+            response.status_code = 304
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.headers["Content-Type"] = "text/html"
+            response._content = (
+                f"<script nonce={self.etag}></script><p>page</p>".encode()
+            )
+
+        return response
+
+
+def test_reuse_unchanged_analyses_only_changed_pages(tmp_path):
+    """
+    Test that an unchanged page reuses its stored result and that a new ETag
+    with the same content, but another nonce, is still an unchanged page.
+    """
+
+    # When
+    analysed = []
+
+    async def analyser(url: str) -> dict:
+        analysed.append(url)
+        return {"score": len(analysed)}
+
+    session = FakeSession()
+    url = "https://site.fr/"
+
+    async def run() -> list[dict]:
+        with ResultStore(tmp_path / "results.sqlite") as store:
+            analyse = reuse_unchanged(analyser, "eco_index", store, session)
+            results = [await analyse(url), await analyse(url)]
+            session.etag = '"v2"'
+            results.append(await analyse(url))
+
+        return results
+
+    # Then
+    result = asyncio.run(run())
+
+    # Expected
+    excepted_result = [
+        {"score": 1, "reused": False},
+        {"score": 1, "reused": True},
+        {"score": 1, "reused": True},
+    ]
+
+    # Assert
+    assert result == excepted_result
+    assert analysed == [url]
@@ -0,0 +1,107 @@
+"""
+Tests for the file usecase/batch_analysis/runner.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+
+from app.core.discovery.frontier import UrlFrontier
+from app.usecase.batch_analysis.runner import (
+    BatchStats,
+    read_urls,
+    run_batch,
+    run_frontier_batch,
+)
+
+
+def test_read_urls_skips_blank_and_comment_lines(tmp_path):
+    """
+    Test that read_urls yields one stripped url per meaningful line.
+    """
+
+    # When
+    source = tmp_path / "urls.txt"
+    source.write_text("https://a.fr\n\n# comment\n  https://b.fr  \n", encoding="utf-8")
+
+    # Then
+    result = list(read_urls(str(source)))
+
+    # Expected
+    excepted_result = ["https://a.fr", "https://b.fr"]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_run_batch_bounds_concurrency_and_reports_errors():
+    """
+    Test that run_batch never exceeds the concurrency and turns exceptions
+    into error items.
+    """
+
+    # When
+    in_flight = 0
+    max_in_flight = 0
+
+    async def analyser(url: str) -> dict:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if url.endswith("fail"):
+            raise RuntimeError("boom")
+        return {"url": url}
+
+    urls = [f"https://site.fr/{i}" for i in range(10)] + ["https://site.fr/fail"]
+
+    async def collect():
+        stats = BatchStats()
+        items = []
+        async for item in run_batch(urls, analyser, "eco_index", concurrency=3):
+            stats.add(item)
+            items.append(item)
+        return items, stats.get_summary()
+
+    # Then
+    items, summary = asyncio.run(collect())
+
+    # Assert
+    assert max_in_flight == 3
+    assert sorted(item.url for item in items) == sorted(urls)
+    assert summary.total == 11
+    assert summary.failed == 1
+    assert [item.error for item in items if item.status == "error"] == [
+        "RuntimeError: boom"
+    ]
+
+
+def test_run_frontier_batch_analyses_each_url_once():
+    """
+    Test that run_frontier_batch analyses every deduplicated url of the
+    frontier and releases them.
+    """
+
+    # When
+    frontier = UrlFrontier(per_host_concurrency=1, per_host_delay=0)
+    frontier.extend(["https://a.fr/1", "https://a.fr/1/", "https://b.fr/1"])
+
+    async def analyser(url: str) -> dict:
+        await asyncio.sleep(0)
+        return {}
+
+    async def collect():
+        return [
+            item.url
+            async for item in run_frontier_batch(
+                frontier, analyser, "network", concurrency=4
+            )
+        ]
+
+    # Then
+    result = asyncio.run(collect())
+
+    # Assert
+    assert sorted(result) == ["https://a.fr/1", "https://b.fr/1"]
@@ -0,0 +1,72 @@
+"""
+Tests for the file usecase/excel_completion/actions.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import openpyxl
+
+from app.usecase.excel_completion.actions import fill_synthese_sheet
+from app.usecase.site_statistics.schemas import MetricDistribution, SiteStatistics
+
+
+def test_fill_synthese_sheet_writes_the_rows_in_the_units_of_the_page_sheets():
+    """
+    Test that the median and p90 of each metric go to their row, the size in MB
+    and the Lighthouse timings in s as on the page sheets, followed by the
+    grades and the share of the bytes per type of resource.
+    """
+
+    # When
+    def distribution(p50: float, p90: float) -> MetricDistribution:
+        return MetricDistribution(count=4, p50=p50, p90=p90)
+
+    statistics = SiteStatistics(
+        pages={"eco_index": 4, "insight": 3},
+        metrics={
+            "ges": distribution(2.1, 2.8),
+            "size": distribution(1234.567, 2500),
+            "nodes": distribution(600, 900),
+            "first_contentful_paint": distribution(1500, 3250),
+            "total_blocking_time": distribution(120, 480),
+            "js": distribution(12, 20),
+            "score": distribution(55.5, 71),
+        },
+        grades={"B": 1, "C": 3},
+        category_share={"image": 0.625, "script": 0.375},
+    )
+    sheet = openpyxl.Workbook().active
+
+    # Then
+    fill_synthese_sheet(sheet, statistics)
+    result = {
+        row: (sheet[f"A{row}"].value, sheet[f"B{row}"].value, sheet[f"C{row}"].value)
+        for row in (16, 17, 18, 19, 20, 24, 25, 30, 33, 35, 36, 37)
+    }
+
+    # Expected
+    excepted_result = {
+        16: (None, "Médiane", "P90"),
+        17: (None, 2.1, 2.8),
+        18: (None, 1.23, 2.5),
+        19: (None, 600, 900),
+        20: (None, None, None),
+        24: (None, 1.5, 3.25),
+        25: (None, 0.12, 0.48),
+        30: (None, 12, 20),
+        33: ("Score Ecoindex", 55.5, 71),
+        35: ("Notes Ecoindex", "Pages", None),
+        36: ("B", 1, None),
+        37: ("C", 3, None),
+    }
+
+    # Assert
+    assert result == excepted_result
+    assert sheet["B3"].value == "4 écrans diagnostiqués"
+    assert [sheet[f"D{row}"].value for row in (35, 36, 37)] == [
+        "Type de ressource",
+        "image",
+        "script",
+    ]
+    assert [sheet[f"E{row}"].value for row in (36, 37)] == ["62%", "38%"]
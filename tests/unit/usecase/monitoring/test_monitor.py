@@ -0,0 +1,132 @@
+"""
+Tests for the files usecase/monitoring/monitor.py and usecase/monitoring/schemas.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.statistics import BUFFER_FACTOR
+from app.usecase.batch_analysis.schemas import Analyser, BatchItem
+from app.usecase.monitoring.monitor import Monitor, get_first_runs
+from app.usecase.monitoring.schemas import MonitorConfig, MonitorGroup, MonitorRecord
+
+
+class FakeMonitor(Monitor):
+    """Monitor whose analyses return at once, without browser."""
+
+    def get_analyser(self, group: MonitorGroup) -> Analyser:
+        async def analyse(url: str) -> dict:
+            return {"group": group.name}
+
+        return analyse
+
+
+def test_get_first_runs_spreads_the_urls_over_the_interval():
+    """
+    Test that the urls of a group are evenly spaced over its interval, the
+    second group being shifted from the first.
+    """
+
+    # When
+    groups = [
+        MonitorGroup(name="home", kind="eco_index", interval=60, urls=["a", "b"]),
+        MonitorGroup(name="blog", kind="network", interval=30, urls=["c", "d", "e"]),
+    ]
+
+    # Then
+    result = get_first_runs(groups, start=100)
+
+    # Expected
+    excepted_result = [
+        (100, 0, 0),
+        (130, 0, 1),
+        (105, 1, 0),
+        (115, 1, 1),
+        (125, 1, 2),
+    ]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_monitor_runs_each_url_at_its_interval():
+    """
+    Test that during a run of 2.25 intervals, the first url is analysed 3 times
+    and the second, half an interval later, 2 times.
+    """
+
+    # When
+    config = MonitorConfig(
+        groups=[
+            MonitorGroup(name="home", kind="eco_index", interval=0.2, urls=["a", "b"])
+        ]
+    )
+    records: list[MonitorRecord] = []
+    monitor = FakeMonitor(config, records.append)
+
+    # Then
+    asyncio.run(monitor.run(duration=0.45))
+    result = [record.item.url for record in records]
+
+    # Expected
+    excepted_result = ["a", "b", "a", "b", "a"]
+
+    # Assert
+    assert result == excepted_result
+    assert monitor.stats["home"].succeeded == 5
+
+
+def test_monitor_stats_stay_bounded_over_many_cycles():
+    """
+    Test that the statistics of a group keep a bounded number of samples,
+    however many analyses the monitor makes.
+    """
+
+    # When
+    config = MonitorConfig(
+        groups=[MonitorGroup(name="home", kind="eco_index", interval=60, urls=["a"])]
+    )
+    monitor = FakeMonitor(config, lambda record: None)
+    stats = monitor.stats["home"]
+    item = BatchItem(url="a", kind="eco_index", status="ok", duration=1.5)
+
+    def get_stored_samples() -> int:
+        latencies = stats.latencies
+        return len(latencies._buffer) + len(latencies._means)
+
+    # Then
+    stored = []
+    for _ in range(10):
+        for _ in range(5_000):
+            stats.add(item)
+        stored.append(get_stored_samples())
+    summary = stats.get_summary()
+
+    # Expected
+    excepted_result = (BUFFER_FACTOR + 1) * stats.latencies.compression
+
+    # Assert
+    assert max(stored) <= excepted_result
+    assert stats.durations == []
+    assert (summary.total, summary.succeeded) == (50_000, 50_000)
+    assert summary.latency_mean == summary.latency_p95 == 1.5
+
+
+def test_monitor_config_refuses_duplicate_group_names():
+    """
+    Test that two groups of a same name, whose statistics would merge, are
+    refused.
+    """
+
+    # When
+    group = {"name": "home", "kind": "eco_index", "interval": 60, "urls": ["a"]}
+
+    # Assert
+    MonitorConfig(groups=[group, {**group, "name": "blog"}])
+    with pytest.raises(ValidationError, match="repeated: \\['home'\\]"):
+        MonitorConfig(groups=[group, {**group, "kind": "network"}])
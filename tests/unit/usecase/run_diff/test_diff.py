@@ -0,0 +1,98 @@
+"""
+Tests for the file usecase/run_diff/diff.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import json
+
+from app.usecase.run_diff.diff import diff_runs
+
+
+def _line(url: str, grade: str, score: float, size: float, wrap: bool = False) -> str:
+    item = {
+        "url": url,
+        "kind": "eco_index",
+        "status": "ok",
+        "duration": 1,
+        "result": {
+            "grade": grade,
+            "score": score,
+            "size": size,
+            "nodes": 500,
+            "requests": 40,
+        },
+    }
+    if wrap:
+        item = {"group": "home", "date": "2024-01-01T00:00:00", "item": item}
+
+    return json.dumps(item)
+
+
+def test_diff_runs_joins_on_normalized_urls_and_ranks_regressions():
+    """
+    Test that pages are joined whatever the form of their url, and that the
+    page losing a grade comes before the page only growing.
+    """
+
+    # When
+    baseline = [
+        _line("https://site.fr/a/", "B", 70, 1000),
+        _line("https://site.fr/b", "C", 55, 2000),
+        _line("https://site.fr/removed", "C", 55, 2000),
+    ]
+    current = [
+        _line("https://site.fr/b", "C", 54, 4000, wrap=True),
+        _line("https://SITE.fr/a#top", "D", 45, 1100),
+        _line("https://site.fr/added", "C", 55, 2000),
+    ]
+
+    # Then
+    report = diff_runs(baseline, current)
+    result = [(page.url, page.grade_after, set(page.changes)) for page in report.worst]
+
+    # Expected
+    excepted_result = [
+        ("https://site.fr/a", "D", {"score", "size"}),
+        ("https://site.fr/b", "C", {"size"}),
+    ]
+
+    # Assert
+    assert result == excepted_result
+    assert (report.compared, report.added, report.removed) == (2, 1, 1)
+    assert report.grade_drops == 1
+
+
+def test_diff_runs_skips_malformed_lines_and_counts_failed_pages():
+    """
+    Test that a truncated line is skipped and counted, and that a page whose
+    analysis failed is failed, not removed, unless a later result compares it.
+    """
+
+    # When
+    baseline = [
+        _line("https://site.fr/a", "B", 70, 1000),
+        _line("https://site.fr/b", "B", 70, 1000),
+        _line("https://site.fr/c", "B", 70, 1000),
+        _line("https://site.fr/d", "B", 70, 1000),
+    ]
+    failed = {"url": "https://site.fr/b", "kind": "eco_index", "status": "error"}
+    retried = {**failed, "url": "https://site.fr/c"}
+    current = [
+        _line("https://site.fr/a", "B", 70, 1000),
+        json.dumps(failed),
+        json.dumps(retried),
+        _line("https://site.fr/c", "B", 70, 1000),
+        _line("https://site.fr/e", "B", 70, 1000)[:40],
+    ]
+
+    # Then
+    report = diff_runs(baseline, current)
+    result = (report.compared, report.failed, report.removed, report.malformed)
+
+    # Expected
+    excepted_result = (2, 1, 1, 1)
+
+    # Assert
+    assert result == excepted_result
@@ -0,0 +1,234 @@
+"""
+Tests for the file usecase/sampling/planner.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import asyncio
+import statistics
+from collections import Counter
+
+from app.usecase.sampling.planner import (
+    FEW_SAMPLES,
+    SamplingPlan,
+    get_stratum_key,
+    run_sampling,
+)
+
+SITE_URLS = [f"https://example.com/blog/article-{i}" for i in range(600)] + [
+    f"https://example.com/shop/product-{i}" for i in range(400)
+]
+
+
+def get_score(url: str) -> float:
+    """Blog pages score around 80, shop pages around 30."""
+    offset = int(url.rsplit("-", 1)[1]) % 11 - 5
+    return (80 if "/blog/" in url else 30) + offset
+
+
+async def analyse(url: str) -> dict:
+    return {"score": get_score(url)}
+
+
+def test_get_stratum_key_groups_similar_pages():
+    """
+    Test that the pages of a same section and template share a stratum, apart
+    from the home page, the listings and the other sections.
+    """
+
+    # When
+    urls = [
+        "https://example.com/",
+        "https://example.com/blog/article-1",
+        "https://example.com/blog/article-2",
+        "https://example.com/blog/page/2",
+        "https://example.com/shop/product-1",
+        "https://example.com/contact",
+    ]
+
+    # Then
+    result = [get_stratum_key(url) for url in urls]
+
+    # Expected
+    excepted_result = [
+        "example.com/|0|home",
+        "example.com/blog|2|detail",
+        "example.com/blog|2|detail",
+        "example.com/blog|3|listing",
+        "example.com/shop|2|detail",
+        "example.com/|1|page",
+    ]
+
+    # Assert
+    assert result == excepted_result
+
+
+def test_sampling_plan_merges_the_smallest_strata():
+    """
+    Test that beyond max_strata, the smallest strata are merged into one, all
+    the distinct urls being kept.
+    """
+
+    # When
+    urls = SITE_URLS[:10] + [f"https://example.com/section-{i}/a" for i in range(5)]
+
+    # Then
+    plan = SamplingPlan(urls + urls, "eco_index", seed=0, max_strata=3)
+
+    # Expected
+    excepted_result = {"example.com/blog|2|detail": 10, "other": 4}
+
+    # Assert
+    assert plan.population == 15
+    assert len(plan.strata) == 3
+    assert {
+        key: len(urls) for key, urls in plan.strata.items() if len(urls) != 1
+    } == excepted_result
+
+
+def test_run_sampling_stops_once_the_interval_is_tight_enough():
+    """
+    Test that the sampling stops well before the budget once the score is known
+    within ± 1, the interval holding the true mean of the site.
+    """
+
+    # When
+    plan = SamplingPlan(SITE_URLS, "eco_index", seed=1)
+
+    # Then
+    result = asyncio.run(
+        run_sampling(
+            plan, analyse, budget=1000, margin=1, round_size=20, per_host_delay=0
+        )
+    )
+
+    # Expected
+    excepted_result = statistics.fmean(get_score(url) for url in SITE_URLS)
+
+    # Assert
+    score = result.metrics["score"]
+    assert score.margin <= 1
+    assert score.low <= excepted_result <= score.high
+    assert result.sampled < 200
+    assert result.rounds == result.sampled // 20 + (result.sampled % 20 > 0)
+    assert {stratum.key: stratum.size for stratum in result.strata} == {
+        "example.com/blog|2|detail": 600,
+        "example.com/shop|2|detail": 400,
+    }
+
+
+def test_run_sampling_is_exact_when_the_whole_site_is_analysed():
+    """
+    Test that a budget covering the site analyses every page once and gives the
+    exact mean, with no margin.
+    """
+
+    # When
+    urls = SITE_URLS[:30]
+
+    # Then
+    result = asyncio.run(
+        run_sampling(
+            SamplingPlan(urls, "eco_index"),
+            analyse,
+            budget=100,
+            margin=0,
+            round_size=7,
+            per_host_delay=0,
+        )
+    )
+
+    # Expected
+    excepted_result = statistics.fmean(get_score(url) for url in urls)
+
+    # Assert
+    assert result.sampled == 30
+    assert result.rounds == 5
+    assert result.metrics["score"].mean == excepted_result
+    assert result.metrics["score"].margin == 0
+
+
+def test_sampling_plan_counts_the_failed_analyses():
+    """
+    Test that a failed analysis counts as sampled and failed but not in the
+    estimate, nor do the results of urls never drawn.
+    """
+
+    # When
+    plan = SamplingPlan(SITE_URLS[:10], "eco_index", seed=0)
+    urls = plan.draw(3)
+
+    # Then
+    plan.add(urls[0], None)
+    plan.add(urls[1], {"score": 50})
+    plan.add(urls[2], {"score": 70})
+    plan.add("https://example.com/never-drawn", {"score": 0})
+    result = plan.estimate()
+
+    # Expected
+    excepted_result = 60
+
+    # Assert
+    assert (result.sampled, result.failed, result.rounds) == (3, 1, 1)
+    assert result.metrics["score"].mean == excepted_result
+    assert result.metrics["score"].samples == 2
+
+
+def test_run_sampling_does_not_trust_strata_of_equal_values():
+    """
+    Test that strata whose first scores are equal do not stop the sampling with
+    a null margin: their variance is at least the one of all the scores.
+    """
+
+    # When
+    calls: Counter[str] = Counter()
+
+    async def analyse_uneven(url: str) -> dict:
+        section = "blog" if "/blog/" in url else "shop"
+        calls[section] += 1
+        if section == "blog" or calls[section] <= 2:
+            return {"score": 80 if section == "blog" else 20}
+        return {"score": 20 + 60 * (calls[section] % 2)}
+
+    # Then
+    result = asyncio.run(
+        run_sampling(
+            SamplingPlan(SITE_URLS, "eco_index", seed=0),
+            analyse_uneven,
+            budget=100,
+            margin=1,
+            round_size=4,
+            per_host_delay=0,
+        )
+    )
+
+    # Assert
+    shop = next(stratum for stratum in result.strata if "shop" in stratum.key)
+    assert result.sampled >= FEW_SAMPLES
+    assert result.metrics["score"].margin > 1
+    assert shop.sampled > 2
+
+
+def test_sampling_plan_counts_the_strata_not_measured_yet():
+    """
+    Test that a stratum without value widens the interval and keeps the
+    sampling going.
+    """
+
+    # When
+    plan = SamplingPlan(SITE_URLS, "eco_index", seed=0)
+    first, second = plan.draw(2)
+
+    # Then
+    plan.add(first, {"score": 70})
+    plan.add(second, {"score": 90})
+    result = plan.estimate().metrics["score"]
+
+    # Expected
+    excepted_result = 1.96 * (0.6**2 * (1 - 2 / 600) * 200 / 2 + 0.4**2 * 200) ** 0.5
+
+    # Assert
+    assert result.mean == 80
+    assert abs(result.margin - excepted_result) < 0.01
+    assert not plan.has_enough_samples()
@@ -0,0 +1,59 @@
+"""
+Tests for the file usecase/site_statistics/aggregator.py
+
+:author: Alex Traveylan
+:date: 2024
+"""
+
+import json
+
+from app.usecase.site_statistics.aggregator import SiteAggregator
+
+
+def _result(grade: str, score: float, image_size: float) -> dict:
+    return {
+        "grade": grade,
+        "score": score,
+        "size": 1000,
+        "nodes": 500,
+        "requests": 40,
+        "categories": {
+            "image": {"total_count": 4, "total_size": image_size},
+            "javascript": {"total_count": 2, "total_size": 100},
+        },
+    }
+
+
+def test_site_aggregator_merges_partial_aggregates():
+    """
+    Test that aggregates built by two workers, one sent as JSON, merge into
+    the statistics of all the pages.
+    """
+
+    # When
+    first, second = SiteAggregator(), SiteAggregator()
+    first.add("eco_index", _result("B", 70, 300))
+    second.add("eco_index", _result("D", 40, 500))
+    second.add("eco_index", _result("D", 45, 400))
+    merged = SiteAggregator.from_dict(json.loads(json.dumps(first.to_dict())))
+    merged.merge(second)
+
+    # Then
+    statistics = merged.get_statistics()
+    result = (
+        statistics.pages,
+        {grade: count for grade, count in statistics.grades.items() if count},
+        statistics.metrics["score"].p50,
+        statistics.category_share,
+    )
+
+    # Expected
+    excepted_result = (
+        {"eco_index": 3},
+        {"B": 1, "D": 2},
+        45,
+        {"image": 0.8, "javascript": 0.2},
+    )
+
+    # Assert
+    assert result == excepted_result